@@ -0,0 +1 @@
+# Este archivo está vacío, solo se usa para marcar el directorio como un paquete de Python
\ No newline at end of file
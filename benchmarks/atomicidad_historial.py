@@ -0,0 +1,74 @@
+"""
+Verificación de que un lote de periodo inválido no modifica el historial.
+
+Registra un periodo para un portafolio sintético y después intenta agregar lotes
+que deben rechazarse (identificadores repetidos, periodo repetido para una de
+las empresas o anterior al último). Comprueba que cada intento lance ValueError
+y que el resumen del portafolio quede igual. Termina con código 1 si algún caso
+falla.
+
+Uso:
+    python -m benchmarks.atomicidad_historial
+"""
+import sys
+
+from . import corpus
+
+def verificar_atomicidad(num_empresas=50):
+    """
+    Intenta agregar lotes inválidos y comprueba que el historial no cambie.
+    
+    Args:
+        num_empresas (int): Empresas del portafolio sintético
+        
+    Returns:
+        list: Descripción de cada caso que falló (vacía si todos pasan)
+    """
+    import pandas as pd
+    
+    from utils.historial import HistorialCartera
+    
+    portafolio = corpus.empresas(num_empresas)
+    portafolio['id'] = range(num_empresas)
+    cartera = HistorialCartera()
+    cartera.agregar_periodo_lote('2024Q1', portafolio)
+    # Una empresa ya tiene el periodo siguiente: el lote completo de ese periodo
+    # debe rechazarse aunque las demás empresas lo acepten
+    cartera.agregar_periodo(num_empresas - 1, '2024Q2', portafolio.iloc[-1].to_dict())
+    antes = cartera.a_dataframe()
+    
+    # Empresas nuevas antes de la que falla, para comprobar que tampoco se crean
+    nuevas = portafolio.assign(id=portafolio['id'] + num_empresas)
+    repetidas = portafolio.assign(id=[*range(num_empresas - 1), 0])
+    casos = {
+        'identificador repetido': ('2024Q2', repetidas),
+        'periodo repetido en una empresa': ('2024Q2', portafolio),
+        'periodo anterior al último': ('2023Q4', portafolio),
+        'empresas nuevas con periodo repetido': ('2024Q2', pd.concat([nuevas, portafolio.iloc[[-1]]]))
+    }
+    
+    fallos = []
+    for nombre, (periodo, lote) in casos.items():
+        try:
+            cartera.agregar_periodo_lote(periodo, lote)
+        except ValueError:
+            pass
+        else:
+            fallos.append(f"{nombre}: no se lanzó ValueError")
+        despues = cartera.a_dataframe()
+        if not despues.equals(antes):
+            fallos.append(f"{nombre}: el historial cambió ({len(antes)} -> {len(despues)} empresas)")
+            antes = despues
+    return fallos
+
+def main(argv=None):
+    fallos = verificar_atomicidad()
+    for fallo in fallos:
+        print(fallo, file=sys.stderr)
+    if fallos:
+        return 1
+    print("Los lotes inválidos se rechazan sin modificar el historial.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
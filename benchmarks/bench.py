@@ -0,0 +1,234 @@
+"""
+Benchmarks de las rutas críticas: análisis, utilidades NLP y chatbot.
+
+Mide la latencia por llamada (p50/p95/p99) y el rendimiento sobre el corpus fijo
+de benchmarks.corpus, guarda los resultados en JSON y, si se indica una línea
+base, termina con código 1 cuando algún caso empeora más de la tolerancia.
+
+Uso:
+    python -m benchmarks.bench --salida resultados.json
+    python -m benchmarks.bench --guardar-linea-base benchmarks/linea_base.json
+    python -m benchmarks.bench --linea-base benchmarks/linea_base.json --tolerancia 15
+    python -m benchmarks.bench --casos nlp_ --repeticiones 3
+"""
+import argparse
+import datetime
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from . import corpus
+
+# Percentiles de latencia que se reportan
+PERCENTILES = (50, 95, 99)
+
+def medir(funcion, entradas, repeticiones=5, calentamiento=1, elementos_por_llamada=1):
+    """
+    Mide la latencia de una función sobre una lista de entradas.
+    
+    Args:
+        funcion (callable): Función a medir; recibe cada entrada como único argumento
+        entradas (sequence): Entradas de cada llamada
+        repeticiones (int): Veces que se recorre la lista de entradas
+        calentamiento (int): Recorridos previos que no se miden
+        elementos_por_llamada (int): Elementos procesados por llamada (p. ej. filas de un lote)
+        
+    Returns:
+        dict: Llamadas, latencias en milisegundos (media y percentiles) y
+            rendimiento en llamadas y elementos por segundo
+    """
+    for _ in range(calentamiento):
+        for entrada in entradas:
+            funcion(entrada)
+    
+    latencias = []
+    reloj = time.perf_counter_ns
+    for _ in range(repeticiones):
+        for entrada in entradas:
+            inicio = reloj()
+            funcion(entrada)
+            latencias.append(reloj() - inicio)
+    
+    latencias = np.array(latencias, dtype=float) / 1e6
+    total_segundos = latencias.sum() / 1e3
+    resultado = {
+        'llamadas': len(latencias),
+        'media_ms': float(latencias.mean()),
+    }
+    for p, valor in zip(PERCENTILES, np.percentile(latencias, PERCENTILES)):
+        resultado[f'p{p}_ms'] = float(valor)
+    resultado['llamadas_por_segundo'] = len(latencias) / total_segundos if total_segundos > 0 else float('inf')
+    resultado['elementos_por_segundo'] = resultado['llamadas_por_segundo'] * elementos_por_llamada
+    return resultado
+
+def _casos_analisis(tam_lote):
+    from utils.analysis import analizar_empresa, analizar_empresas_lote
+    
+    portafolio = corpus.empresas(tam_lote)
+    empresas = portafolio.head(200).to_dict('records')
+    return [
+        ('analizar_empresa', lambda datos: analizar_empresa(datos, modo_nlp=None), empresas, 1),
+        ('analizar_empresa_nlp', lambda datos: analizar_empresa(datos, modo_nlp='inmediato'), [corpus.EMPRESA], 1),
+        ('analizar_empresas_lote', analizar_empresas_lote, [portafolio], tam_lote)
+    ]
+
+def _casos_nlp():
+    from utils import nlp_utils
+    from utils.embeddings import crear_embedding_fijo, crear_embeddings_lote
+    
+    preguntas = list(corpus.PREGUNTAS)
+    pares = list(zip(preguntas, preguntas[1:] + preguntas[:1]))
+    return [
+        ('nlp_tokenizar_texto', nlp_utils.tokenizar_texto, preguntas, 1),
+        ('nlp_lematizar_texto', nlp_utils.lematizar_texto, preguntas, 1),
+        ('nlp_pos_tagging', nlp_utils.pos_tagging, preguntas, 1),
+        ('nlp_crear_embedding', nlp_utils.crear_embedding, preguntas, 1),
+        ('nlp_crear_embedding_fijo', crear_embedding_fijo, preguntas, 1),
+        ('nlp_crear_embeddings_lote', crear_embeddings_lote, [preguntas], len(preguntas)),
+        ('nlp_similaridad_textos', lambda par: nlp_utils.similaridad_textos(*par), pares, 1),
+        ('nlp_normalizar_texto', nlp_utils.normalizar_texto, preguntas, 1),
+        ('nlp_extraer_keywords', nlp_utils.extraer_keywords, preguntas, 1)
+    ]
+
+def _casos_chatbot():
+    from utils.analysis import analizar_empresa
+    from utils.chatbot import chatbot_response, es_mensaje_no_financiero
+    from utils.nlp_utils import obtener_cache_nlp
+    
+    def sin_cache(mensaje):
+        # Tras el calentamiento todas las preguntas están en la caché NLP; se vacía para medir el análisis completo
+        obtener_cache_nlp().limpiar()
+        return chatbot_response(mensaje)
+    
+    preguntas = list(corpus.PREGUNTAS)
+    datos_empresa = {
+        'datos': corpus.EMPRESA,
+        'resultados': analizar_empresa(corpus.EMPRESA, modo_nlp=None)
+    }
+    return [
+        ('es_mensaje_no_financiero', es_mensaje_no_financiero, preguntas, 1),
+        ('chatbot_response', chatbot_response, preguntas, 1),
+        ('chatbot_response_sin_cache', sin_cache, preguntas, 1),
+        ('chatbot_response_empresa', lambda mensaje: chatbot_response(mensaje, datos_empresa), preguntas, 1)
+    ]
+
+def ejecutar(repeticiones=5, tam_lote=100000, filtro=None, informar=None):
+    """
+    Ejecuta todos los casos de benchmark.
+    
+    Args:
+        repeticiones (int): Recorridos medidos del corpus por caso
+        tam_lote (int): Filas del portafolio de analizar_empresas_lote
+        filtro (str, optional): Solo ejecuta los casos cuyo nombre contiene este texto
+        informar (callable, optional): Recibe una línea de progreso por caso
+        
+    Returns:
+        dict: Metadatos de la ejecución y resultados por caso
+    """
+    # Las respuestas del chatbot eligen textos al azar; se fija la semilla para repetir la misma carga
+    random.seed(0)
+    
+    casos = []
+    for grupo in (_casos_analisis, _casos_nlp, _casos_chatbot):
+        argumentos = (tam_lote,) if grupo is _casos_analisis else ()
+        casos.extend(grupo(*argumentos))
+    
+    resultados = {}
+    for nombre, funcion, entradas, elementos in casos:
+        if filtro and filtro not in nombre:
+            continue
+        # Los lotes grandes se repiten menos para mantener acotada la duración
+        veces = repeticiones if elementos == 1 else max(1, repeticiones // 2)
+        resultados[nombre] = medir(funcion, entradas, veces, elementos_por_llamada=elementos)
+        if informar:
+            r = resultados[nombre]
+            informar(
+                f"{nombre:<28} p50 {r['p50_ms']:9.3f} ms  p95 {r['p95_ms']:9.3f} ms  "
+                f"p99 {r['p99_ms']:9.3f} ms  {r['elementos_por_segundo']:14,.0f} elem/s"
+            )
+    
+    return {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticiones': repeticiones,
+        'tam_lote': tam_lote,
+        'casos': resultados
+    }
+
+def comparar(resultados, linea_base, tolerancia=10.0, metrica='p50_ms'):
+    """
+    Compara una ejecución con la línea base.
+    
+    Args:
+        resultados (dict): Resultado de ejecutar
+        linea_base (dict): Resultado guardado de una ejecución anterior
+        tolerancia (float): Porcentaje máximo de empeoramiento permitido
+        metrica (str): Métrica de latencia a comparar (p. ej. 'p50_ms', 'p95_ms')
+        
+    Returns:
+        list: Regresiones, como diccionarios con 'caso', 'base', 'actual' y 'cambio_pct'
+    """
+    regresiones = []
+    for caso, actual in resultados['casos'].items():
+        base = linea_base.get('casos', {}).get(caso)
+        if not base or not base.get(metrica):
+            continue
+        cambio = 100.0 * (actual[metrica] - base[metrica]) / base[metrica]
+        if cambio > tolerancia:
+            regresiones.append({'caso': caso, 'base': base[metrica], 'actual': actual[metrica], 'cambio_pct': cambio})
+    return regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks de análisis, utilidades NLP y chatbot."
+    )
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--linea-base', help="Archivo JSON de una ejecución anterior con la cual comparar")
+    parser.add_argument('--guardar-linea-base', help="Guarda los resultados como nueva línea base en este archivo")
+    parser.add_argument('--tolerancia', type=float, default=10.0, help="Empeoramiento máximo permitido en %% (por defecto 10)")
+    parser.add_argument('--metrica', default='p50_ms', choices=[f'p{p}_ms' for p in PERCENTILES] + ['media_ms'],
+                        help="Métrica de latencia que se compara con la línea base (por defecto p50_ms)")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Recorridos medidos del corpus por caso (por defecto 5)")
+    parser.add_argument('--tam-lote', type=int, default=100000, help="Filas del benchmark por lotes (por defecto 100000)")
+    parser.add_argument('--casos', help="Solo ejecuta los casos cuyo nombre contiene este texto")
+    args = parser.parse_args(argv)
+    
+    if args.repeticiones <= 0:
+        parser.error("--repeticiones debe ser mayor que 0")
+    if args.tam_lote <= 0:
+        parser.error("--tam-lote debe ser mayor que 0")
+    
+    resultados = ejecutar(args.repeticiones, args.tam_lote, args.casos, informar=lambda texto: print(texto, file=sys.stderr))
+    
+    for ruta in (args.salida, args.guardar_linea_base):
+        if ruta:
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+    
+    if args.linea_base:
+        with open(args.linea_base, encoding='utf-8') as archivo:
+            linea_base = json.load(archivo)
+        if linea_base.get('tam_lote') != resultados['tam_lote']:
+            print(
+                f"Aviso: la línea base usó --tam-lote {linea_base.get('tam_lote')}; "
+                "los casos por lotes no son comparables.",
+                file=sys.stderr
+            )
+        regresiones = comparar(resultados, linea_base, args.tolerancia, args.metrica)
+        for r in regresiones:
+            print(
+                f"REGRESIÓN {r['caso']}: {args.metrica} {r['base']:.3f} -> {r['actual']:.3f} ({r['cambio_pct']:+.1f}%)",
+                file=sys.stderr
+            )
+        if regresiones:
+            return 1
+        print(f"Sin regresiones mayores a {args.tolerancia:g}% en {args.metrica}.", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Corpus fijo para los benchmarks.
+
+Las preguntas cubren todas las categorías del chatbot (endeudamiento,
+rentabilidad, productividad, cartera, liquidez, general) y los mensajes no
+financieros, con longitudes variadas. No se debe modificar sin regenerar la
+línea base, porque los resultados dejarían de ser comparables.
+"""
+import numpy as np
+import pandas as pd
+
+PREGUNTAS = (
+    "¿Cómo está mi endeudamiento?",
+    "¿Es muy alto mi nivel de deuda comparado con otras empresas del sector?",
+    "Quiero reducir el pasivo de la empresa, ¿por dónde empiezo?",
+    "¿Conviene refinanciar los préstamos bancarios este año?",
+    "¿Cuál es el apalancamiento ideal para una empresa de tecnología?",
+    "¿Es buena mi rentabilidad?",
+    "¿Qué puedo hacer para mejorar mi rentabilidad sobre activos?",
+    "Las ganancias bajaron un 20% este trimestre, ¿qué hago?",
+    "¿Cómo aumento el margen de utilidad sin subir precios?",
+    "¿Qué significa el ROA y cómo se calcula?",
+    "¿Cómo está la productividad de mis empleados?",
+    "¿Tengo demasiado personal para el nivel de ingresos que genero?",
+    "¿Cómo puedo mejorar la eficiencia del equipo de ventas?",
+    "¿Cuánto debería producir cada trabajador en el sector comercio?",
+    "¿Cómo está mi rotación de cartera?",
+    "Los clientes están tardando mucho en pagar las facturas",
+    "¿Qué políticas de cobranza me recomiendas para reducir los días de cobro?",
+    "¿Vale la pena usar factoring para las cuentas por cobrar?",
+    "¿Tengo suficiente liquidez para cubrir mis obligaciones?",
+    "¿Cómo mejoro el flujo de caja de la empresa?",
+    "¿Qué tan solvente es mi empresa a corto plazo?",
+    "Necesito efectivo para pagar la nómina del próximo mes",
+    "¿Cuál es el estado general de mi empresa?",
+    "Dame un resumen del análisis financiero",
+    "¿Qué indicador debería mejorar primero?",
+    "¿Cómo afecta la inflación a los costos de la empresa?",
+    "¿Debería invertir en nueva maquinaria o pagar deudas primero?",
+    "Explícame el balance general de forma sencilla",
+    "¿Cuál es la diferencia entre ingreso y ganancia?",
+    "¿Cómo preparo la empresa para solicitar un crédito de inversión?",
+    "Necesito un análisis detallado de la situación financiera de mi empresa, incluyendo "
+    "el endeudamiento, la rentabilidad, la productividad por empleado y la rotación de "
+    "cartera, con recomendaciones concretas para los próximos seis meses.",
+    "hola",
+    "gracias por la ayuda",
+    "adiós",
+    "ayuda",
+    "me siento estresado con el trabajo",
+    "¿qué opinas del partido de fútbol de ayer?",
+    "ok",
+    "Mi familia quiere que venda el negocio",
+    "¿Qué tiempo hará mañana en Bogotá?"
+)
+
+# Preguntas de validación para benchmarks.paridad_backends: no se usan para generar
+# la tabla del backend ligero (ver paridad_backends.textos_vocabulario), así que
+# miden su comportamiento con mensajes que no ha visto
+PREGUNTAS_VALIDACION = (
+    "¿Cuánto pago de intereses por mis obligaciones bancarias?",
+    "Estoy pensando en pedir un leasing para comprar camiones",
+    "¿Mis proveedores me están financiando demasiado?",
+    "¿Cómo negocio mejores tasas con el banco?",
+    "El costo de ventas subió y el margen bruto cayó",
+    "¿Qué es el EBITDA y por qué importa?",
+    "Quisiera saber si mis utilidades netas son razonables",
+    "¿Cuánto facturó cada vendedor el año pasado?",
+    "Contraté tres personas nuevas y no veo más ventas",
+    "¿Conviene tercerizar la contabilidad?",
+    "Varios clientes llevan noventa días sin pagarme",
+    "¿Debo provisionar las deudas incobrables?",
+    "¿Cómo otorgo crédito a clientes nuevos sin arriesgarme?",
+    "No me alcanza la plata para pagar a los proveedores",
+    "¿Qué reservas de efectivo debería mantener?",
+    "Tengo mucho inventario quieto en la bodega",
+    "¿Cómo calculo el capital de trabajo?",
+    "Explícame el estado de resultados paso a paso",
+    "¿Vale la pena abrir una sucursal en Medellín?",
+    "Los impuestos se están comiendo mis ganancias",
+    "¿Cómo reparto dividendos sin afectar la caja?",
+    "Necesito un presupuesto para el segundo semestre",
+    "¿Qué indicadores revisan los inversionistas?",
+    "buenas tardes",
+    "muchas gracias, me sirvió bastante",
+    "¿quién ganó las elecciones?",
+    "estoy cansado y preocupado por el negocio",
+    "¿Me recomiendas vender acciones de la compañía?"
+)
+
+# Empresa de referencia para las respuestas personalizadas y el análisis individual
+EMPRESA = {
+    'nombre': "Comercializadora Andina S.A.S.",
+    'sector': "Comercio",
+    'ganancias': 850000000.0,
+    'empleados': 18,
+    'activos': 5200000000.0,
+    'cartera': 140000000.0,
+    'deudas': 2900000000.0
+}
+
+SECTORES = ("Tecnología", "Comercio", "Manufactura", "Servicios", "Otro")
+
+def empresas(num_empresas, semilla=0):
+    """
+    Genera un portafolio sintético reproducible.
+    
+    Args:
+        num_empresas (int): Número de empresas
+        semilla (int): Semilla del generador aleatorio
+        
+    Returns:
+        pandas.DataFrame: Columnas de entrada de analizar_empresas_lote
+    """
+    generador = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'nombre': [f"Empresa {i}" for i in range(num_empresas)],
+        'sector': generador.choice(SECTORES, num_empresas),
+        'ganancias': generador.normal(8e8, 6e8, num_empresas).round(),
+        'empleados': generador.integers(0, 200, num_empresas),
+        'activos': generador.uniform(0, 1e10, num_empresas).round(),
+        'cartera': generador.uniform(0, 5e8, num_empresas).round(),
+        'deudas': generador.uniform(0, 8e9, num_empresas).round()
+    })
@@ -0,0 +1,130 @@
+"""
+Aceleración real del análisis en paralelo frente al secuencial.
+
+Mide, sobre un portafolio sintético, la puntuación de archivos CSV y Parquet con
+puntuar_archivo (los trabajadores leen sus propios rangos del archivo) y el
+análisis de un DataFrame en memoria con analizar_empresas_paralelo (el proceso
+principal envía los bloques), con 1 proceso y con varios. Comprueba además que
+las salidas en paralelo sean iguales a las secuenciales y termina con código 1
+si difieren.
+
+La aceleración depende de los CPU disponibles: con uno solo, el paralelo solo
+añade costo.
+
+Uso:
+    python -m benchmarks.escalado_paralelo
+    python -m benchmarks.escalado_paralelo --empresas 2000000 --procesos 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from . import corpus
+
+def _leer_salida(ruta):
+    import pandas as pd
+    
+    if ruta.endswith('.csv'):
+        return pd.read_csv(ruta)
+    partes = sorted(os.listdir(ruta))
+    return pd.concat([pd.read_parquet(os.path.join(ruta, parte)) for parte in partes], ignore_index=True)
+
+def medir_archivos(num_empresas, num_procesos, tam_bloque):
+    """
+    Puntúa el mismo portafolio en CSV y Parquet con 1 y con num_procesos procesos.
+    
+    Args:
+        num_empresas (int): Empresas del portafolio sintético
+        num_procesos (int): Procesos de la ejecución en paralelo
+        tam_bloque (int): Filas por bloque
+        
+    Returns:
+        dict: Formato -> segundos con 1 proceso ('secuencial'), con varios
+            ('paralelo') y si las salidas son iguales ('iguales')
+    """
+    from utils.puntuar_cartera import puntuar_archivo
+    
+    portafolio = corpus.empresas(num_empresas)
+    medidas = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for formato in ('csv', 'parquet'):
+            entrada = os.path.join(directorio, f"portafolio.{formato}")
+            if formato == 'csv':
+                portafolio.to_csv(entrada, index=False)
+            else:
+                portafolio.to_parquet(entrada, index=False, row_group_size=max(1, num_empresas // 3))
+            
+            salidas = {}
+            medidas[formato] = {}
+            for modo, procesos in (('secuencial', 1), ('paralelo', num_procesos)):
+                salidas[modo] = os.path.join(directorio, f"salida_{formato}_{modo}" + ('.csv' if formato == 'csv' else ''))
+                resumen = puntuar_archivo(entrada, salidas[modo], tam_bloque, num_procesos=procesos)
+                medidas[formato][modo] = resumen['segundos']
+            medidas[formato]['iguales'] = _leer_salida(salidas['secuencial']).equals(_leer_salida(salidas['paralelo']))
+    return medidas
+
+def medir_memoria(num_empresas, num_procesos, tam_bloque):
+    """
+    Analiza un DataFrame en memoria en el proceso principal y con un pool.
+    
+    Se desactiva el umbral MIN_FILAS_PARALELO para medir siempre el pool.
+    
+    Args:
+        num_empresas (int): Empresas del portafolio sintético
+        num_procesos (int): Procesos del pool
+        tam_bloque (int): Filas por tarea
+        
+    Returns:
+        dict: Segundos 'secuencial' y 'paralelo' y si los resultados son iguales ('iguales')
+    """
+    from utils import paralelo
+    from utils.analysis import analizar_empresas_lote
+    
+    datos = corpus.empresas(num_empresas)
+    inicio = time.perf_counter()
+    esperado = analizar_empresas_lote(datos)
+    secuencial = time.perf_counter() - inicio
+    
+    umbral, paralelo.MIN_FILAS_PARALELO = paralelo.MIN_FILAS_PARALELO, 0
+    try:
+        with paralelo.crear_pool(num_procesos) as pool:
+            # El arranque del pool no se cuenta
+            paralelo.analizar_empresas_paralelo(datos.head(1), pool=pool)
+            inicio = time.perf_counter()
+            obtenido = paralelo.analizar_empresas_paralelo(datos, tam_bloque=tam_bloque, pool=pool)
+            en_paralelo = time.perf_counter() - inicio
+    finally:
+        paralelo.MIN_FILAS_PARALELO = umbral
+    return {'secuencial': secuencial, 'paralelo': en_paralelo, 'iguales': esperado.equals(obtenido)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mide la aceleración del análisis en paralelo frente al secuencial."
+    )
+    parser.add_argument('--empresas', type=int, default=500000, help="Empresas del portafolio sintético")
+    parser.add_argument('--procesos', type=int, default=max(2, os.cpu_count() or 1), help="Procesos en paralelo")
+    parser.add_argument('--tam-bloque', type=int, default=50000, help="Filas por bloque")
+    args = parser.parse_args(argv)
+    
+    medidas = medir_archivos(args.empresas, args.procesos, args.tam_bloque)
+    medidas['memoria'] = medir_memoria(args.empresas, args.procesos, args.tam_bloque)
+    
+    print(f"{args.empresas:,} empresas, {args.procesos} procesos, {os.cpu_count()} CPU\n")
+    print(f"{'entrada':<10}{'1 proceso':>12}{'paralelo':>12}{'aceleración':>13}{'iguales':>9}")
+    for entrada, m in medidas.items():
+        aceleracion = m['secuencial'] / m['paralelo'] if m['paralelo'] > 0 else float('inf')
+        print(
+            f"{entrada:<10}{m['secuencial']:>10.2f} s{m['paralelo']:>10.2f} s"
+            f"{aceleracion:>12.2f}x{'sí' if m['iguales'] else 'NO':>9}"
+        )
+    
+    distintas = [entrada for entrada, m in medidas.items() if not m['iguales']]
+    if distintas:
+        print(f"\nLas salidas en paralelo difieren de las secuenciales: {', '.join(distintas)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Informe de paridad entre los backends NLP.
+
+Analiza los mismos textos con el backend de spaCy y con el ligero y muestra, para
+cada atributo que usa el chatbot (tokens, lemas, etiquetas POS, palabras clave y
+tema asignado), cuántos textos coinciden, el parecido medio de las secuencias y
+ejemplos de las diferencias, junto con la fracción de palabras que están en la
+tabla del backend ligero. Mide también el arranque de cada backend (importar el
+módulo y analizar el primer texto) en un proceso aparte.
+
+Por defecto se evalúan las preguntas de validación del corpus, que no se usan
+para generar la tabla: los textos con que se generó darían una paridad
+optimista. Si alguno de los textos evaluados está entre ellos, se avisa.
+
+Con --regenerar vuelve a generar antes la tabla de lemas del backend ligero a
+partir del vocabulario financiero del chatbot. Si faltan recursos de algún
+backend (spaCy, NLTK punkt o la tabla), termina con código 2 y el comando para
+instalarlos.
+
+Uso:
+    python -m benchmarks.paridad_backends
+    python -m benchmarks.paridad_backends --textos mensajes.txt --json paridad.json
+    python -m benchmarks.paridad_backends --regenerar --vocabulario mensajes_reales.txt
+"""
+import argparse
+import difflib
+import json
+import random
+import re
+import subprocess
+import sys
+
+from . import corpus
+
+ATRIBUTOS = ('tokens', 'lemas', 'pos_tags', 'palabras_clave', 'tema')
+
+# Se ejecuta en un proceso nuevo para medir el arranque sin modelos ya cargados. En
+# Linux se usa VmHWM: ru_maxrss se hereda a través de exec y reflejaría el proceso padre
+_CODIGO_ARRANQUE = """
+import resource, sys, time
+inicio = time.perf_counter()
+from utils import nlp_utils
+nlp_utils.configurar_backend(sys.argv[1])
+documento = nlp_utils.DocumentoAnalizado(sys.argv[2])
+documento.tokens, documento.lemas, documento.keywords()
+segundos = time.perf_counter() - inicio
+try:
+    with open('/proc/self/status') as estado:
+        rss_kb = next(int(linea.split()[1]) for linea in estado if linea.startswith('VmHWM:'))
+except OSError:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(segundos, rss_kb)
+"""
+
+def _textos_fijos():
+    from utils.sectores import REGLAS
+    from utils.temas import TEMAS
+    
+    return list(corpus.PREGUNTAS) + list(TEMAS.values()) + [regla['recomendacion'] for regla in REGLAS]
+
+def textos_vocabulario(semillas=20):
+    """
+    Reúne los textos con el vocabulario financiero del chatbot.
+    
+    Incluye las preguntas del corpus (no las de validación), las descripciones
+    de los temas, las recomendaciones de las reglas de sector y las respuestas
+    del chatbot a cada pregunta (con y sin datos de empresa, con varias
+    semillas para cubrir los mensajes predefinidos).
+    
+    Args:
+        semillas (int): Semillas aleatorias con que se generan las respuestas
+        
+    Returns:
+        list: Textos
+    """
+    from utils.analysis import analizar_empresa
+    from utils.chatbot import chatbot_response
+    
+    textos = _textos_fijos()
+    datos_empresa = {
+        'datos': corpus.EMPRESA,
+        'resultados': analizar_empresa(corpus.EMPRESA, modo_nlp=None)
+    }
+    respuestas = set()
+    for semilla in range(semillas):
+        random.seed(semilla)
+        for pregunta in corpus.PREGUNTAS:
+            respuestas.add(chatbot_response(pregunta))
+            respuestas.add(chatbot_response(pregunta, datos_empresa))
+    return textos + sorted(respuestas)
+
+def _analizar(textos):
+    from utils.nlp_utils import DocumentoAnalizado
+    from utils.temas import IndiceTemas
+    
+    indice = IndiceTemas.construir()
+    resultados = []
+    for texto in textos:
+        documento = DocumentoAnalizado(texto)
+        resultados.append({
+            'tokens': documento.tokens,
+            'lemas': documento.lemas,
+            'pos_tags': documento.pos_tags,
+            'palabras_clave': documento.keywords(None),
+            'tema': indice.clasificar(documento)[0]
+        })
+    return resultados
+
+def cobertura_tabla(textos):
+    """
+    Calcula la fracción de palabras de los textos que están en la tabla del backend ligero.
+    
+    Args:
+        textos (iterable): Textos
+        
+    Returns:
+        float: Palabras (tokens alfabéticos) con entrada en la tabla, entre 0 y 1
+    """
+    from utils.nlp_utils import RUTA_RECURSOS_LIGERO, BackendLigero
+    
+    with open(RUTA_RECURSOS_LIGERO, encoding='utf-8') as archivo:
+        formas = json.load(archivo)['lemas']
+    backend = BackendLigero()
+    palabras = [p for texto in textos for p in backend.tokenizar(texto.lower()) if p.isalpha()]
+    return sum(p in formas for p in palabras) / len(palabras) if palabras else 0.0
+
+def verificar_backends(nombres):
+    """
+    Comprueba que estén instalados los recursos de varios backends NLP.
+    
+    Args:
+        nombres (iterable): Nombres de backends en BACKENDS_NLP
+        
+    Raises:
+        RuntimeError: Si falta algún recurso, con el comando para instalarlo
+    """
+    from utils.nlp_utils import BACKENDS_NLP
+    
+    for nombre in nombres:
+        BACKENDS_NLP[nombre]().verificar_recursos()
+
+def _parecido(a, b):
+    if not isinstance(a, list):
+        return float(a == b)
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+def comparar_backends(textos, referencia='spacy', alternativo='ligero'):
+    """
+    Compara los atributos de cada texto calculados con dos backends.
+    
+    Args:
+        textos (sequence): Textos a analizar
+        referencia (str): Backend de referencia
+        alternativo (str): Backend a comparar con la referencia
+        
+    Returns:
+        dict: 'resumen' (atributo -> textos iguales y parecido medio entre 0 y 1)
+            y 'diferencias' (diccionarios con 'texto', 'atributo', referencia y alternativo)
+    """
+    from utils.nlp_utils import configurar_backend
+    
+    analisis = {}
+    for nombre in (referencia, alternativo):
+        configurar_backend(nombre)
+        analisis[nombre] = _analizar(textos)
+    
+    resumen = {atributo: {'iguales': 0, 'parecido': 0.0} for atributo in ATRIBUTOS}
+    diferencias = []
+    for texto, esperado, obtenido in zip(textos, analisis[referencia], analisis[alternativo]):
+        for atributo in ATRIBUTOS:
+            a, b = esperado[atributo], obtenido[atributo]
+            resumen[atributo]['parecido'] += _parecido(a, b) / len(textos)
+            if a == b:
+                resumen[atributo]['iguales'] += 1
+            else:
+                diferencias.append({'texto': texto, 'atributo': atributo, referencia: a, alternativo: b})
+    return {'resumen': resumen, 'diferencias': diferencias}
+
+def medir_arranque(backend, texto=corpus.PREGUNTAS[0]):
+    """
+    Mide el arranque de un backend en un proceso nuevo.
+    
+    Args:
+        backend (str): Nombre del backend
+        texto (str): Primer texto a analizar
+        
+    Returns:
+        dict: 'segundos' (importar y analizar el primer texto) y 'rss_mb'
+            (memoria residente máxima), o 'error' si el proceso falló
+    """
+    proceso = subprocess.run(
+        [sys.executable, '-c', _CODIGO_ARRANQUE, backend, texto],
+        capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        # Línea de la excepción y la siguiente con texto (NLTK pone el mensaje
+        # entre líneas de asteriscos, debajo de 'LookupError:')
+        lineas = [linea.strip() for linea in proceso.stderr.splitlines() if linea.strip('* \t')]
+        errores = [i for i, linea in enumerate(lineas) if re.match(r'[\w.]+(Error|Exception)\b', linea)]
+        if not errores:
+            return {'error': f"código {proceso.returncode}"}
+        return {'error': ' '.join(lineas[errores[-1]:errores[-1] + 2])}
+    segundos, rss_kb = proceso.stdout.split()
+    return {'segundos': float(segundos), 'rss_mb': int(rss_kb) / 1024}
+
+def _leer_textos(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        return [linea.strip() for linea in archivo if linea.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compara los resultados del backend NLP ligero con los del backend de spaCy."
+    )
+    parser.add_argument('--textos', help="Archivo con un texto por línea (por defecto, las preguntas de validación del corpus)")
+    parser.add_argument('--regenerar', action='store_true', help="Regenerar antes la tabla del backend ligero")
+    parser.add_argument('--vocabulario', help="Archivo con textos adicionales (uno por línea) para --regenerar")
+    parser.add_argument('--ejemplos', type=int, default=5, help="Diferencias a mostrar por atributo")
+    parser.add_argument('--json', help="Guardar el resumen y todas las diferencias en este archivo")
+    args = parser.parse_args(argv)
+    
+    textos = _leer_textos(args.textos) if args.textos else list(corpus.PREGUNTAS_VALIDACION)
+    vocabulario = _leer_textos(args.vocabulario) if args.vocabulario else []
+    
+    # spaCy (con NLTK punkt) analiza los textos de referencia y genera la tabla; la
+    # tabla del backend ligero se comprueba después de regenerarla
+    try:
+        verificar_backends(['spacy'])
+        if args.regenerar:
+            from utils.nlp_utils import RUTA_RECURSOS_LIGERO, configurar_backend, generar_recursos_ligero
+            
+            configurar_backend('spacy')
+            formas = generar_recursos_ligero(textos_vocabulario() + vocabulario)
+            print(f"Tabla del backend ligero regenerada: {formas} formas en {RUTA_RECURSOS_LIGERO}")
+        verificar_backends(['ligero'])
+    except RuntimeError as error:
+        print(f"No se pueden comparar los backends: {error}", file=sys.stderr)
+        return 2
+    
+    # Los textos de la tabla dan una paridad optimista; las respuestas del chatbot
+    # no se comparan porque generarlas requiere spaCy
+    generacion = {texto.lower() for texto in _textos_fijos() + vocabulario}
+    repetidos = [texto for texto in textos if texto.lower() in generacion]
+    
+    informe = comparar_backends(textos)
+    informe['cobertura_tabla'] = cobertura_tabla(textos)
+    informe['textos_de_la_tabla'] = len(repetidos)
+    informe['arranque'] = {backend: medir_arranque(backend) for backend in ('spacy', 'ligero')}
+    
+    if repetidos:
+        print(
+            f"AVISO: {len(repetidos)} de {len(textos)} textos evaluados se usaron para generar la tabla "
+            "del backend ligero; la paridad es optimista. Usa textos no vistos (por defecto, "
+            "corpus.PREGUNTAS_VALIDACION).\n",
+            file=sys.stderr
+        )
+    print(f"Backend ligero frente a spacy en {len(textos)} textos\n")
+    print(f"{'atributo':<16}{'textos iguales':>18}{'parecido medio':>17}")
+    for atributo, r in informe['resumen'].items():
+        iguales = f"{r['iguales']}/{len(textos)} ({r['iguales'] / len(textos):.0%})"
+        print(f"{atributo:<16}{iguales:>18}{r['parecido']:>17.3f}")
+    print(f"\nPalabras con entrada en la tabla del backend ligero: {informe['cobertura_tabla']:.0%}")
+    print("\nArranque (importar y analizar el primer texto):")
+    for backend, medida in informe['arranque'].items():
+        if 'error' in medida:
+            print(f"  {backend}: no disponible ({medida['error']})")
+        else:
+            print(f"  {backend}: {medida['segundos']:.2f} s, {medida['rss_mb']:.0f} MB de RSS máximo")
+    
+    for atributo in ATRIBUTOS:
+        ejemplos = [d for d in informe['diferencias'] if d['atributo'] == atributo][:args.ejemplos]
+        if ejemplos:
+            print(f"\nDiferencias en {atributo}:")
+        for d in ejemplos:
+            print(f"  {d['texto']!r}\n    spacy:  {d['spacy']}\n    ligero: {d['ligero']}")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(informe, archivo, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Verificación de paridad de los perfiles de spaCy.
+
+Compara, sobre las preguntas fijas de benchmarks.corpus, los resultados de cada
+atributo de DocumentoAnalizado calculados con el perfil que declara y con el
+pipeline completo. Termina con código 1 si alguno difiere y con código 2 si
+faltan recursos NLP.
+
+Con --ampliado agrega textos largos: respuestas del chatbot, descripciones de
+temas, recomendaciones y reportes de empresas sintéticas.
+
+Uso:
+    python -m benchmarks.paridad_perfiles
+    python -m benchmarks.paridad_perfiles --ampliado
+    python -m benchmarks.paridad_perfiles --textos mensajes.txt
+"""
+import argparse
+import sys
+
+from . import corpus
+
+def _lemas(doc):
+    return [token.lemma_ for token in doc]
+
+def _pos_tags(doc):
+    return [(token.text, token.pos_) for token in doc]
+
+def _palabras_clave(doc):
+    return [token.text for token in doc if not token.is_stop and token.is_alpha]
+
+# Atributo comparado -> (perfil que usa DocumentoAnalizado, extractor sobre el Doc)
+COMPARACIONES = {
+    'lemas': ('lemas_pos', _lemas),
+    'pos_tags': ('lemas_pos', _pos_tags),
+    'keywords': ('tokenizador', _palabras_clave)
+}
+
+def textos_ampliados(num_reportes=20):
+    """
+    Reúne textos largos para la verificación ampliada.
+    
+    Args:
+        num_reportes (int): Empresas sintéticas cuyos reportes se incluyen
+        
+    Returns:
+        list: Respuestas del chatbot, descripciones de temas, recomendaciones y
+            reportes, sin repetidos ni las preguntas del corpus
+    """
+    from utils.analysis import analizar_empresas_lote
+    from utils.reportes import generar_mensajes_lote
+    from .paridad_backends import textos_vocabulario
+    
+    resultados = analizar_empresas_lote(corpus.empresas(num_reportes))
+    reportes = [mensaje for _, _, mensaje in generar_mensajes_lote(resultados)]
+    preguntas = set(corpus.PREGUNTAS)
+    return [texto for texto in dict.fromkeys(textos_vocabulario() + reportes) if texto not in preguntas]
+
+def verificar_paridad(textos):
+    """
+    Compara los resultados de cada perfil con los del pipeline completo.
+    
+    Args:
+        textos (iterable): Textos a analizar
+        
+    Returns:
+        list: Diferencias, como diccionarios con 'texto', 'atributo', 'perfil',
+            'completo' y 'resultado_perfil'
+    """
+    from utils.nlp_utils import obtener_nlp
+    
+    completo = obtener_nlp('completo')
+    diferencias = []
+    for texto in textos:
+        doc_completo = completo(texto.lower())
+        for atributo, (perfil, extraer) in COMPARACIONES.items():
+            esperado = extraer(doc_completo)
+            obtenido = extraer(obtener_nlp(perfil)(texto.lower()))
+            if obtenido != esperado:
+                diferencias.append({
+                    'texto': texto,
+                    'atributo': atributo,
+                    'perfil': perfil,
+                    'completo': esperado,
+                    'resultado_perfil': obtenido
+                })
+    return diferencias
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Verifica que los perfiles de spaCy den los mismos resultados que el pipeline completo."
+    )
+    parser.add_argument('--textos', help="Archivo con un texto por línea (por defecto, las preguntas del corpus)")
+    parser.add_argument('--ampliado', action='store_true', help="Agregar respuestas del chatbot, temas y reportes")
+    args = parser.parse_args(argv)
+    
+    if args.textos:
+        with open(args.textos, encoding='utf-8') as archivo:
+            textos = [linea.strip() for linea in archivo if linea.strip()]
+    else:
+        textos = list(corpus.PREGUNTAS) + list(corpus.PREGUNTAS_VALIDACION)
+    if args.ampliado:
+        from utils.nlp_utils import obtener_backend
+        from .paridad_backends import verificar_backends
+        
+        # Las respuestas del chatbot se generan con el backend configurado
+        try:
+            verificar_backends({'spacy', obtener_backend().nombre})
+        except RuntimeError as error:
+            print(f"No se pueden reunir los textos de --ampliado: {error}", file=sys.stderr)
+            return 2
+        textos += textos_ampliados()
+    
+    diferencias = verificar_paridad(textos)
+    for d in diferencias:
+        print(
+            f"DIFERENCIA {d['atributo']} ({d['perfil']}): {d['texto']!r}\n"
+            f"  completo: {d['completo']}\n"
+            f"  perfil:   {d['resultado_perfil']}",
+            file=sys.stderr
+        )
+    if diferencias:
+        return 1
+    print(f"Sin diferencias en {len(textos)} textos.", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
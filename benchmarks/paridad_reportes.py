@@ -0,0 +1,82 @@
+"""
+Verificación de los reportes por archivo con entradas CSV y Parquet.
+
+Escribe el mismo portafolio sintético en CSV y en Parquet, genera un reporte por
+empresa desde cada uno con bloques pequeños y compara los archivos resultantes.
+Termina con código 1 si difieren en número, nombre o contenido.
+
+Uso:
+    python -m benchmarks.paridad_reportes
+    python -m benchmarks.paridad_reportes --empresas 2500 --tam-bloque 100
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from . import corpus
+
+def _leer_reportes(directorio):
+    reportes = {}
+    for nombre in os.listdir(directorio):
+        with open(os.path.join(directorio, nombre), encoding='utf-8') as archivo:
+            reportes[nombre] = archivo.read()
+    return reportes
+
+def verificar_paridad(num_empresas=25, tam_bloque=10):
+    """
+    Genera los reportes por archivo desde CSV y desde Parquet y los compara.
+    
+    Args:
+        num_empresas (int): Empresas del portafolio sintético
+        tam_bloque (int): Filas por bloque (menor que num_empresas para cubrir varios bloques)
+        
+    Returns:
+        dict: Reportes por formato de entrada ('csv', 'parquet'), como diccionarios
+            nombre de archivo -> contenido
+    """
+    from utils.reportes import generar_reportes_archivo
+    
+    portafolio = corpus.empresas(num_empresas)
+    reportes = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        entradas = {
+            'csv': os.path.join(directorio, 'portafolio.csv'),
+            'parquet': os.path.join(directorio, 'portafolio.parquet')
+        }
+        portafolio.to_csv(entradas['csv'], index=False)
+        portafolio.to_parquet(entradas['parquet'], index=False)
+        for formato, entrada in entradas.items():
+            salida = os.path.join(directorio, f"reportes_{formato}")
+            generar_reportes_archivo(entrada, salida, 'archivos', tam_bloque)
+            reportes[formato] = _leer_reportes(salida)
+    return reportes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Verifica que los reportes por archivo sean iguales con entrada CSV y Parquet."
+    )
+    parser.add_argument('--empresas', type=int, default=25, help="Empresas del portafolio sintético")
+    parser.add_argument('--tam-bloque', type=int, default=10, help="Filas por bloque")
+    args = parser.parse_args(argv)
+    
+    reportes = verificar_paridad(args.empresas, args.tam_bloque)
+    csv, parquet = reportes['csv'], reportes['parquet']
+    print(f"CSV: {len(csv)} archivos; Parquet: {len(parquet)} archivos", file=sys.stderr)
+    if len(csv) != args.empresas or csv != parquet:
+        solo_csv = sorted(set(csv) - set(parquet))
+        solo_parquet = sorted(set(parquet) - set(csv))
+        distintos = sorted(n for n in set(csv) & set(parquet) if csv[n] != parquet[n])
+        print(
+            f"DIFERENCIA: se esperaban {args.empresas} archivos iguales\n"
+            f"  solo en CSV: {solo_csv[:5]}\n"
+            f"  solo en Parquet: {solo_parquet[:5]}\n"
+            f"  contenido distinto: {distintos[:5]}",
+            file=sys.stderr
+        )
+        return 1
+    print(f"Sin diferencias en {args.empresas} empresas.", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
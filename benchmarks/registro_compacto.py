@@ -0,0 +1,109 @@
+"""
+Verificación de los resultados compactos con un registro de sectores grande.
+
+Construye un registro con más sectores de los que caben en uint8 y más reglas de
+las que caben en una máscara uint16, analiza un portafolio sintético con
+analizar_lote_compacto y comprueba que cada fila reconstruida sea igual al
+resultado de analizar_empresa. Termina con código 1 si alguna difiere.
+
+Uso:
+    python -m benchmarks.registro_compacto
+    python -m benchmarks.registro_compacto --sectores 70000 --reglas 20
+"""
+import argparse
+import sys
+
+from . import corpus
+
+def registro_grande(num_sectores=300, num_reglas=17, semilla=0):
+    """
+    Crea un registro sintético con num_sectores sectores y num_reglas reglas.
+    
+    Args:
+        num_sectores (int): Sectores, incluido el sector por defecto 'otro'
+        num_reglas (int): Reglas, repartidas entre los indicadores existentes
+        semilla (int): Semilla de los límites
+        
+    Returns:
+        RegistroSectores: Registro
+    """
+    import numpy as np
+    
+    from utils.sectores import PERFILES_SECTOR, REGLAS, RegistroSectores
+    
+    aleatorio = np.random.default_rng(semilla)
+    reglas = [
+        {
+            'indicador': f'regla_{i}',
+            'valor': REGLAS[i % len(REGLAS)]['valor'],
+            'sentido': REGLAS[i % len(REGLAS)]['sentido'],
+            'etiquetas': ['cumple', 'no cumple'],
+            'recomendacion': f"Recomendación {i}."
+        }
+        for i in range(num_reglas)
+    ]
+    # Límites alrededor de los del sector por defecto para que las reglas fallen
+    # unas veces sí y otras no
+    base = {regla['valor']: PERFILES_SECTOR['otro'][regla['indicador']] for regla in REGLAS}
+    perfiles = {}
+    for j in range(num_sectores):
+        nombre = 'otro' if j == num_sectores - 1 else f'sector_{j}'
+        perfiles[nombre] = {
+            regla['indicador']: base[regla['valor']] * aleatorio.uniform(0.5, 1.5) for regla in reglas
+        }
+    return RegistroSectores(perfiles, reglas)
+
+def verificar_registro(num_sectores=300, num_reglas=17, num_empresas=2000):
+    """
+    Compara los resultados compactos con los de analizar_empresa en un registro grande.
+    
+    Args:
+        num_sectores (int): Sectores del registro
+        num_reglas (int): Reglas del registro
+        num_empresas (int): Empresas del portafolio sintético
+        
+    Returns:
+        int: Filas cuyo resultado reconstruido difiere
+    """
+    import numpy as np
+    
+    from utils.analysis import analizar_empresa
+    from utils.compacto import analizar_lote_compacto, estructurado_a_dicts
+    from utils.sectores import configurar_registro, obtener_registro
+    
+    anterior = obtener_registro()
+    registro = registro_grande(num_sectores, num_reglas)
+    configurar_registro(registro)
+    try:
+        portafolio = corpus.empresas(num_empresas)
+        portafolio['sector'] = np.random.default_rng(1).choice(registro.sectores, num_empresas)
+        compactos = analizar_lote_compacto(portafolio)
+        empresas = portafolio.to_dict('records')
+        diferentes = 0
+        for datos, obtenido in zip(empresas, estructurado_a_dicts(compactos, sectores=portafolio['sector'])):
+            esperado = analizar_empresa(datos, modo_nlp=None)
+            esperado.pop('nlp_ejemplo', None)
+            obtenido['nombre'] = esperado['nombre']
+            diferentes += obtenido != esperado
+        return diferentes
+    finally:
+        configurar_registro(anterior)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Verifica los resultados compactos con un registro de sectores grande."
+    )
+    parser.add_argument('--sectores', type=int, default=300, help="Sectores del registro")
+    parser.add_argument('--reglas', type=int, default=17, help="Reglas del registro")
+    parser.add_argument('--empresas', type=int, default=2000, help="Empresas del portafolio sintético")
+    args = parser.parse_args(argv)
+    
+    diferentes = verificar_registro(args.sectores, args.reglas, args.empresas)
+    if diferentes:
+        print(f"{diferentes} de {args.empresas} resultados compactos difieren de analizar_empresa.", file=sys.stderr)
+        return 1
+    print(f"Sin diferencias en {args.empresas} empresas ({args.sectores} sectores, {args.reglas} reglas).")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
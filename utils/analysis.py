@@ -1,6 +1,27 @@
+from collections.abc import Mapping
+
 import numpy as np
 import pandas as pd
-from .nlp_utils import tokenizar_texto, lematizar_texto, pos_tagging, crear_embedding
+from .sectores import obtener_registro
+
+def _estado_general(puntos_positivos):
+    """
+    Traduce el número de indicadores que cumplen en el estado general.
+    
+    Args:
+        puntos_positivos (int): Indicadores que cumplen el límite del sector
+        
+    Returns:
+        str: Estado general de la empresa
+    """
+    if puntos_positivos >= 3:
+        return "Excelente"
+    elif puntos_positivos == 2:
+        return "Bueno"
+    elif puntos_positivos == 1:
+        return "Regular"
+    else:
+        return "Crítico"
 
 def calcular_ratio_endeudamiento(valor_deudas, valor_activos):
     """
@@ -62,16 +83,98 @@ def calcular_rotacion_cartera(valor_cartera, ganancias_anuales):
         return float('inf')
     return (valor_cartera / ganancias_anuales) * 365  # Días de rotación
 
-def analizar_empresa(datos):
+def calcular_nlp_ejemplo(nombre, sector, empleados):
+    """
+    Calcula el ejemplo de procesamiento NLP que acompaña al análisis.
+    
+    Args:
+        nombre (str): Nombre de la empresa
+        sector (str): Sector de la empresa
+        empleados (int): Número de empleados
+        
+    Returns:
+        dict: Tokens, lemas, etiquetas POS, embedding de dimensión fija y su dimensión
+    """
+    # Importación local: el análisis financiero no debe cargar spaCy ni sklearn
+    from .nlp_utils import tokenizar_texto, lematizar_texto, pos_tagging
+    from .embeddings import crear_embedding_fijo
+    
+    # Tokenización para procesamiento NLP de ejemplo
+    tokens_nombre = tokenizar_texto(nombre)
+    lemas_sector = lematizar_texto(sector)
+    pos_tags = pos_tagging(f"{nombre} es una empresa del sector {sector}")
+    
+    # Crear embedding para futuras comparaciones
+    # (dimensión fija, comparable con los de otras empresas y con un AlmacenEmbeddings)
+    embedding = crear_embedding_fijo(f"Empresa {nombre} del sector {sector} con {empleados} empleados")
+    
+    return {
+        'tokens': tokens_nombre,
+        'lemas': lemas_sector,
+        'pos_tags': pos_tags,
+        'embedding': embedding,
+        'embedding_dim': embedding.shape[1]
+    }
+
+class NLPEjemploPerezoso(Mapping):
+    """
+    Ejemplo NLP que solo se calcula la primera vez que se lee una de sus claves.
+    
+    Se comporta como el diccionario devuelto por calcular_nlp_ejemplo.
+    """
+    
+    def __init__(self, nombre, sector, empleados):
+        self._argumentos = (nombre, sector, empleados)
+        self._valores = None
+    
+    def _obtener(self):
+        if self._valores is None:
+            self._valores = calcular_nlp_ejemplo(*self._argumentos)
+        return self._valores
+    
+    @property
+    def calculado(self):
+        """bool: True si el ejemplo ya fue calculado."""
+        return self._valores is not None
+    
+    def __getitem__(self, clave):
+        return self._obtener()[clave]
+    
+    def __iter__(self):
+        return iter(self._obtener())
+    
+    def __len__(self):
+        return len(self._obtener())
+    
+    def __repr__(self):
+        if self._valores is None:
+            return f"NLPEjemploPerezoso{self._argumentos!r}"
+        return repr(self._valores)
+
+# Modos de obtener 'nlp_ejemplo' en analizar_empresa
+MODOS_NLP = ('perezoso', 'inmediato', None)
+
+def _validar_modo_nlp(modo_nlp):
+    if modo_nlp not in MODOS_NLP:
+        raise ValueError(f"Modo NLP no soportado: {modo_nlp!r}. Usa uno de: {', '.join(map(repr, MODOS_NLP))}.")
+
+def analizar_empresa(datos, modo_nlp='perezoso'):
     """
     Realiza un análisis completo de la situación económica de la empresa.
     
     Args:
         datos (dict): Diccionario con datos de la empresa
-        
+        modo_nlp (str, optional): Cómo obtener 'nlp_ejemplo': 'perezoso' (al
+            leerlo por primera vez), 'inmediato' o None para omitirlo
+            
     Returns:
         dict: Resultados del análisis
+        
+    Raises:
+        ValueError: Si modo_nlp no es uno de MODOS_NLP
     """
+    _validar_modo_nlp(modo_nlp)
+    
     # Extraer datos
     nombre = datos['nombre']
     ganancias = float(datos['ganancias'])
@@ -87,88 +190,30 @@ def analizar_empresa(datos):
     productividad = calcular_productividad_empleado(ganancias, empleados)
     rotacion_cartera = calcular_rotacion_cartera(cartera, ganancias)
     
-    # Definir límites según sector (simplificados para este ejemplo)
-    limites = {
-        'tecnologia': {
-            'endeudamiento': 0.6,
-            'rentabilidad': 0.15,
-            'productividad': 100000000,  # 100 millones COP por empleado
-            'rotacion': 60
-        },
-        'comercio': {
-            'endeudamiento': 0.5,
-            'rentabilidad': 0.08,
-            'productividad': 50000000,  # 50 millones COP por empleado
-            'rotacion': 45
-        },
-        'manufactura': {
-            'endeudamiento': 0.55,
-            'rentabilidad': 0.1,
-            'productividad': 70000000,  # 70 millones COP por empleado
-            'rotacion': 50
-        },
-        'servicios': {
-            'endeudamiento': 0.45,
-            'rentabilidad': 0.12,
-            'productividad': 60000000,  # 60 millones COP por empleado
-            'rotacion': 30
-        },
-        'otro': {
-            'endeudamiento': 0.5,
-            'rentabilidad': 0.1,
-            'productividad': 60000000,  # 60 millones COP por empleado
-            'rotacion': 45
-        }
-    }
-    
-    # Si el sector no está en los predefinidos, usar "otro"
-    if sector.lower() not in limites:
-        sector_analisis = 'otro'
-    else:
-        sector_analisis = sector.lower()
-    
-    # Evaluación por indicador
-    evaluacion = {
-        'endeudamiento': 'bueno' if ratio_endeudamiento <= limites[sector_analisis]['endeudamiento'] else 'alto',
-        'rentabilidad': 'buena' if rentabilidad >= limites[sector_analisis]['rentabilidad'] else 'baja',
-        'productividad': 'buena' if productividad >= limites[sector_analisis]['productividad'] else 'baja',
-        'rotacion': 'buena' if rotacion_cartera <= limites[sector_analisis]['rotacion'] else 'alta'
-    }
+    # Evaluación por indicador con los límites del sector ("otro" si no está definido)
+    registro = obtener_registro()
+    evaluacion, cumple = registro.evaluar(sector, {
+        'ratio_endeudamiento': ratio_endeudamiento,
+        'rentabilidad': rentabilidad,
+        'productividad': productividad,
+        'rotacion_cartera': rotacion_cartera
+    })
     
     # Evaluación general
-    puntos_positivos = sum(1 for valor in evaluacion.values() if valor in ['bueno', 'buena'])
-    
-    if puntos_positivos >= 3:
-        estado_general = "Excelente"
-    elif puntos_positivos == 2:
-        estado_general = "Bueno"
-    elif puntos_positivos == 1:
-        estado_general = "Regular"
-    else:
-        estado_general = "Crítico"
+    estado_general = _estado_general(sum(cumple))
     
     # Preparar recomendaciones basadas en puntos débiles
-    recomendaciones = []
-    
-    if evaluacion['endeudamiento'] == 'alto':
-        recomendaciones.append("Reducir el nivel de endeudamiento, considerar reestructuración de deuda.")
+    recomendaciones = [
+        regla['recomendacion'] for regla, ok in zip(registro.reglas, cumple) if not ok
+    ]
     
-    if evaluacion['rentabilidad'] == 'baja':
-        recomendaciones.append("Mejorar la eficiencia operativa y revisar la estructura de costos.")
-    
-    if evaluacion['productividad'] == 'baja':
-        recomendaciones.append("Optimizar procesos y/o implementar programas de capacitación para los empleados.")
-    
-    if evaluacion['rotacion'] == 'alta':
-        recomendaciones.append("Mejorar las políticas de cobro y gestión de cartera.")
-    
-    # Tokenización para procesamiento NLP de ejemplo
-    tokens_nombre = tokenizar_texto(nombre)
-    lemas_sector = lematizar_texto(sector)
-    pos_tags = pos_tagging(f"{nombre} es una empresa del sector {sector}")
-    
-    # Crear embedding para futuras comparaciones
-    embedding = crear_embedding(f"Empresa {nombre} del sector {sector} con {empleados} empleados")
+    # Ejemplo NLP: se omite, se calcula de inmediato o al primer acceso
+    if modo_nlp == 'perezoso':
+        nlp_ejemplo = NLPEjemploPerezoso(nombre, sector, empleados)
+    elif modo_nlp == 'inmediato':
+        nlp_ejemplo = calcular_nlp_ejemplo(nombre, sector, empleados)
+    else:
+        nlp_ejemplo = None
     
     # Resultados completos
     resultados = {
@@ -183,50 +228,162 @@ def analizar_empresa(datos):
         'evaluacion': evaluacion,
         'estado_general': estado_general,
         'recomendaciones': recomendaciones,
-        'nlp_ejemplo': {
-            'tokens': tokens_nombre,
-            'lemas': lemas_sector,
-            'pos_tags': pos_tags,
-            'embedding_dim': len(embedding) if isinstance(embedding, np.ndarray) else 0
-        }
+        'nlp_ejemplo': nlp_ejemplo
     }
     
     return resultados
 
-def generar_mensaje_resultado(resultados):
+def _calcular_indicadores_lote(ganancias, activos, deudas, cartera, empleados):
     """
-    Genera un mensaje personalizado basado en los resultados del análisis.
+    Calcula los cuatro indicadores para arreglos de empresas.
+    
+    Replica exactamente las reglas de los calcular_* (inf / 0 en divisiones por cero).
     
     Args:
-        resultados (dict): Resultados del análisis
+        ganancias, activos, deudas, cartera, empleados (array-like): Columnas de datos
         
     Returns:
-        str: Mensaje personalizado
+        dict: Arreglo de cada indicador, con las claves de analizar_empresa
     """
-    nombre = resultados['nombre']
-    sector = resultados['sector']
-    estado = resultados['estado_general']
+    ganancias = np.asarray(ganancias, dtype=float)
+    activos = np.asarray(activos, dtype=float)
+    deudas = np.asarray(deudas, dtype=float)
+    cartera = np.asarray(cartera, dtype=float)
+    # int() trunca hacia cero en el análisis individual
+    empleados = np.trunc(np.asarray(empleados, dtype=float))
     
-    ind = resultados['indicadores']
-    eval_ind = resultados['evaluacion']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'ratio_endeudamiento': np.where(activos == 0, np.inf, deudas / activos),
+            'rentabilidad': np.where(activos == 0, 0.0, ganancias / activos),
+            'productividad': np.where(empleados == 0, 0.0, ganancias / empleados),
+            'rotacion_cartera': np.where(ganancias == 0, np.inf, (cartera / ganancias) * 365)
+        }
+
+def _calcular_lote(ganancias, activos, deudas, cartera, empleados, codigos_sector, registro=None):
+    """
+    Calcula indicadores y evaluaciones para arreglos de empresas.
     
-    # Crear mensaje base
-    mensaje = f"Análisis económico para {nombre} (Sector: {sector}):\n\n"
+    Args:
+        ganancias, activos, deudas, cartera, empleados (array-like): Columnas de datos
+        codigos_sector (numpy.ndarray): Códigos de sector del registro
+        registro (RegistroSectores, optional): Registro de sectores a usar
+        
+    Returns:
+        dict: 'indicadores', 'cumple' (empresas x reglas), 'puntos' y 'mascara'
+            (bit i activo si la regla i no se cumple)
+    """
+    registro = registro or obtener_registro()
+    indicadores = _calcular_indicadores_lote(ganancias, activos, deudas, cartera, empleados)
+    cumple = registro.cumple_lote(codigos_sector, indicadores)
     
-    # Agregar estado general
-    mensaje += f"Estado económico general: {estado}\n\n"
+    pesos = 1 << np.arange(cumple.shape[1], dtype=np.intp)
+    return {
+        'indicadores': indicadores,
+        'cumple': cumple,
+        'puntos': cumple.sum(axis=1, dtype=np.int8),
+        'mascara': (~cumple).astype(np.intp) @ pesos
+    }
+
+def _estados_por_puntos(num_reglas):
+    """
+    Devuelve un arreglo con el estado general para 0..num_reglas puntos.
     
-    # Detallar indicadores
-    mensaje += "Indicadores analizados:\n"
-    mensaje += f"• Ratio de endeudamiento: {ind['ratio_endeudamiento']:.2f} ({eval_ind['endeudamiento']})\n"
-    mensaje += f"• Rentabilidad sobre activos: {ind['rentabilidad']:.2%} ({eval_ind['rentabilidad']})\n"
-    mensaje += f"• Productividad por empleado: ${ind['productividad']:,.0f} COP ({eval_ind['productividad']})\n"
-    mensaje += f"• Rotación de cartera: {ind['rotacion_cartera']:.1f} días ({eval_ind['rotacion']})\n\n"
+    Args:
+        num_reglas (int): Número de reglas del registro
+        
+    Returns:
+        numpy.ndarray: Estados generales indexados por puntos
+    """
+    return np.array([_estado_general(puntos) for puntos in range(num_reglas + 1)], dtype=object)
+
+def analizar_empresas_lote(datos):
+    """
+    Analiza un portafolio completo de empresas con operaciones vectorizadas.
+    
+    Produce los mismos indicadores, evaluaciones, estado general y recomendaciones
+    que analizar_empresa aplicado fila por fila (sin la sección nlp_ejemplo).
+    
+    Args:
+        datos (pandas.DataFrame | dict): Columnas 'ganancias', 'activos', 'deudas',
+            'cartera', 'empleados' y 'sector' (y opcionalmente 'nombre'), como
+            DataFrame o diccionario de arreglos NumPy
+            
+    Returns:
+        pandas.DataFrame: Una fila por empresa con indicadores, evaluaciones
+            ('evaluacion_<indicador>'), 'estado_general' y 'recomendaciones'
+    """
+    if not isinstance(datos, pd.DataFrame):
+        datos = pd.DataFrame(datos)
+    
+    registro = obtener_registro()
+    lote = _calcular_lote(
+        datos['ganancias'].to_numpy(),
+        datos['activos'].to_numpy(),
+        datos['deudas'].to_numpy(),
+        datos['cartera'].to_numpy(),
+        datos['empleados'].to_numpy(),
+        registro.codigos_lote(datos['sector'].to_numpy()),
+        registro
+    )
     
-    # Agregar recomendaciones
-    if resultados['recomendaciones']:
-        mensaje += "Recomendaciones:\n"
-        for i, rec in enumerate(resultados['recomendaciones'], 1):
-            mensaje += f"{i}. {rec}\n"
+    columnas = {}
+    if 'nombre' in datos:
+        columnas['nombre'] = datos['nombre'].to_numpy()
+    columnas['sector'] = datos['sector'].to_numpy()
+    columnas.update(lote['indicadores'])
+    for i, regla in enumerate(registro.reglas):
+        etiquetas = np.array(regla['etiquetas'][::-1], dtype=object)
+        columnas[f"evaluacion_{regla['indicador']}"] = etiquetas[lote['cumple'][:, i].astype(np.intp)]
+    columnas['estado_general'] = _estados_por_puntos(len(registro.reglas))[lote['puntos']]
+    columnas['recomendaciones'] = registro.recomendaciones_por_mascara[lote['mascara']]
+    
+    return pd.DataFrame(columnas, index=datos.index)
+
+def resultados_lote_a_dicts(resultados_lote):
+    """
+    Convierte el resultado de analizar_empresas_lote al formato de analizar_empresa.
+    
+    Args:
+        resultados_lote (pandas.DataFrame): Resultado de analizar_empresas_lote
+        
+    Returns:
+        list: Lista de diccionarios de resultados (sin 'nlp_ejemplo')
+    """
+    indicadores = obtener_registro().indicadores
+    resultados = []
+    tiene_nombre = 'nombre' in resultados_lote
+    for fila in resultados_lote.to_dict('records'):
+        resultados.append({
+            'nombre': fila['nombre'] if tiene_nombre else None,
+            'sector': fila['sector'],
+            'indicadores': {
+                'ratio_endeudamiento': float(fila['ratio_endeudamiento']),
+                'rentabilidad': float(fila['rentabilidad']),
+                'productividad': float(fila['productividad']),
+                'rotacion_cartera': float(fila['rotacion_cartera'])
+            },
+            'evaluacion': {
+                indicador: fila[f'evaluacion_{indicador}'] for indicador in indicadores
+            },
+            'estado_general': fila['estado_general'],
+            'recomendaciones': list(fila['recomendaciones'])
+        })
+    return resultados
+
+def generar_mensaje_resultado(resultados):
+    """
+    Genera un mensaje personalizado basado en los resultados del análisis.
+    
+    El formato lo define reportes.PLANTILLA_MENSAJE, la misma plantilla de los
+    reportes por lotes.
+    
+    Args:
+        resultados (dict): Resultados del análisis
+        
+    Returns:
+        str: Mensaje personalizado
+    """
+    from .reportes import plantilla_mensaje
     
-    return mensaje
\ No newline at end of file
+    return plantilla_mensaje().mensaje(resultados)
\ No newline at end of file
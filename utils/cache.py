@@ -0,0 +1,227 @@
+"""
+Caché de resultados de analizar_empresa.
+
+La clave es un hash canónico de los datos de entrada y de la versión del registro
+de sectores, de modo que cambiar los límites invalida los resultados guardados.
+Tiene un nivel en memoria con desalojo LRU y un nivel opcional en disco (SQLite)
+que sobrevive a reinicios.
+"""
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from .analysis import NLPEjemploPerezoso, _validar_modo_nlp, analizar_empresa, calcular_nlp_ejemplo
+from .sectores import obtener_registro
+
+# Variables de entorno de la caché compartida del proceso
+VARIABLE_RUTA_DISCO = 'FINANZBOT_CACHE_DISCO'
+VARIABLE_TAMANO = 'FINANZBOT_CACHE_TAMANO'
+
+def clave_analisis(datos, version_registro=None):
+    """
+    Calcula la clave canónica de un análisis.
+    
+    Los valores se normalizan igual que en analizar_empresa (float / int), por lo
+    que 100 y 100.0 producen la misma clave; las claves adicionales se ignoran.
+    
+    Args:
+        datos (dict): Datos de la empresa
+        version_registro (str, optional): Versión del registro de sectores
+        
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    canonico = {
+        'nombre': str(datos['nombre']),
+        'sector': str(datos['sector']),
+        'ganancias': float(datos['ganancias']),
+        'empleados': int(datos['empleados']),
+        'activos': float(datos['activos']),
+        'cartera': float(datos['cartera']),
+        'deudas': float(datos['deudas']),
+        'registro': version_registro or obtener_registro().version
+    }
+    contenido = json.dumps(canonico, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+class CacheAnalisis:
+    """
+    Caché LRU en memoria con nivel opcional en SQLite para analizar_empresa.
+    
+    Los resultados se guardan sin 'nlp_ejemplo'; al recuperarlos se adjunta de
+    nuevo según el modo NLP solicitado. En disco se guardan como JSON (son
+    diccionarios de textos, números y listas). Es segura entre hilos.
+    """
+    
+    def __init__(self, max_elementos=1024, ruta_disco=None):
+        if max_elementos <= 0:
+            raise ValueError("max_elementos debe ser mayor que 0.")
+        self.max_elementos = max_elementos
+        self.ruta_disco = ruta_disco
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self._conexion = None
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        
+        if ruta_disco:
+            self._conexion = sqlite3.connect(ruta_disco, check_same_thread=False)
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS resultados (clave TEXT PRIMARY KEY, valor TEXT NOT NULL)"
+            )
+            self._conexion.commit()
+    
+    def _leer_disco(self, clave):
+        if self._conexion is None:
+            return None
+        fila = self._conexion.execute(
+            "SELECT valor FROM resultados WHERE clave = ?", (clave,)
+        ).fetchone()
+        if not fila:
+            return None
+        try:
+            return json.loads(fila[0])
+        except ValueError:
+            # Filas de versiones anteriores (pickle): se recalculan y se reemplazan
+            return None
+    
+    def _escribir_disco(self, clave, resultado):
+        if self._conexion is None:
+            return
+        self._conexion.execute(
+            "INSERT OR REPLACE INTO resultados (clave, valor) VALUES (?, ?)",
+            (clave, json.dumps(resultado, ensure_ascii=False))
+        )
+        self._conexion.commit()
+    
+    def _guardar_memoria(self, clave, resultado):
+        self._memoria[clave] = resultado
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_elementos:
+            self._memoria.popitem(last=False)
+    
+    def obtener(self, datos, modo_nlp='perezoso'):
+        """
+        Devuelve el análisis de una empresa, calculándolo solo si no está en caché.
+        
+        Args:
+            datos (dict): Datos de la empresa
+            modo_nlp (str, optional): Modo NLP de analizar_empresa
+            
+        Returns:
+            dict: Resultados del análisis (copia independiente de la caché)
+            
+        Raises:
+            ValueError: Si modo_nlp no es uno de analysis.MODOS_NLP
+        """
+        _validar_modo_nlp(modo_nlp)
+        clave = clave_analisis(datos)
+        with self._lock:
+            resultado = self._memoria.get(clave)
+            if resultado is not None:
+                self._memoria.move_to_end(clave)
+                self.aciertos_memoria += 1
+            else:
+                resultado = self._leer_disco(clave)
+                if resultado is not None:
+                    self.aciertos_disco += 1
+                    self._guardar_memoria(clave, resultado)
+        
+        if resultado is None:
+            resultado = analizar_empresa(datos, modo_nlp=None)
+            with self._lock:
+                self.fallos += 1
+                self._guardar_memoria(clave, resultado)
+                self._escribir_disco(clave, resultado)
+        
+        resultado = copy.deepcopy(resultado)
+        empleados = int(datos['empleados'])
+        if modo_nlp == 'perezoso':
+            resultado['nlp_ejemplo'] = NLPEjemploPerezoso(resultado['nombre'], resultado['sector'], empleados)
+        elif modo_nlp == 'inmediato':
+            resultado['nlp_ejemplo'] = calcular_nlp_ejemplo(resultado['nombre'], resultado['sector'], empleados)
+        return resultado
+    
+    def estadisticas(self):
+        """
+        Devuelve los contadores de la caché.
+        
+        Returns:
+            dict: Aciertos (memoria y disco), fallos, tasa de aciertos y tamaños
+        """
+        with self._lock:
+            aciertos = self.aciertos_memoria + self.aciertos_disco
+            consultas = aciertos + self.fallos
+            en_disco = 0
+            if self._conexion is not None:
+                en_disco = self._conexion.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+            return {
+                'aciertos_memoria': self.aciertos_memoria,
+                'aciertos_disco': self.aciertos_disco,
+                'fallos': self.fallos,
+                'tasa_aciertos': aciertos / consultas if consultas else 0.0,
+                'en_memoria': len(self._memoria),
+                'en_disco': en_disco,
+                'max_elementos': self.max_elementos
+            }
+    
+    def limpiar(self, disco=False):
+        """
+        Vacía la caché en memoria (y el nivel en disco si se indica) y reinicia contadores.
+        
+        Args:
+            disco (bool): Borrar también los resultados guardados en disco
+        """
+        with self._lock:
+            self._memoria.clear()
+            self.aciertos_memoria = self.aciertos_disco = self.fallos = 0
+            if disco and self._conexion is not None:
+                self._conexion.execute("DELETE FROM resultados")
+                self._conexion.commit()
+    
+    def cerrar(self):
+        """Cierra la conexión con el nivel en disco."""
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def obtener_cache():
+    """
+    Devuelve la caché compartida del proceso (una sola instancia para todas las sesiones).
+    
+    Se configura con FINANZBOT_CACHE_TAMANO (elementos en memoria) y
+    FINANZBOT_CACHE_DISCO (ruta del archivo SQLite; sin ella no hay nivel en disco).
+    
+    Returns:
+        CacheAnalisis: Caché compartida
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheAnalisis(
+                max_elementos=int(os.environ.get(VARIABLE_TAMANO, 1024)),
+                ruta_disco=os.environ.get(VARIABLE_RUTA_DISCO)
+            )
+        return _cache
+
+def analizar_empresa_cache(datos, modo_nlp='perezoso'):
+    """
+    Versión de analizar_empresa que usa la caché compartida del proceso.
+    
+    Args:
+        datos (dict): Datos de la empresa
+        modo_nlp (str, optional): Modo NLP de analizar_empresa
+        
+    Returns:
+        dict: Resultados del análisis
+    """
+    return obtener_cache().obtener(datos, modo_nlp)
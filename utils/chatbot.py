@@ -0,0 +1,524 @@
+"""
+Respuestas del chatbot financiero.
+
+Detecta si un mensaje es financiero, lo clasifica por tema y construye la
+respuesta, personalizada con los resultados del análisis de la empresa cuando
+están disponibles. No depende de Streamlit, por lo que se puede usar y medir
+fuera de la aplicación.
+"""
+import random
+
+from .nlp_utils import analizar_texto_cache
+from .percentiles import texto_percentil
+from .sectores import obtener_registro
+from .trazas import anotar, instrumentar, span
+
+# Función para formatear números grandes
+def formato_numero(numero):
+    """
+    Formatea un número grande para mejor legibilidad.
+    Ejemplo: 1234567 -> 1,234,567
+    
+    Args:
+        numero (float): Número a formatear
+    
+    Returns:
+        str: Número formateado
+    """
+    return f"{numero:,.0f}"
+
+def comparacion_sector(datos_empresa, indicador):
+    """
+    Texto con el percentil de un indicador frente a las empresas del sector.
+    
+    Args:
+        datos_empresa (dict): Datos de la empresa en sesión
+        indicador (str): Nombre del indicador (p. ej. 'rentabilidad')
+        
+    Returns:
+        str: Párrafo para agregar a la respuesta, o cadena vacía si no hay pares
+    """
+    texto = texto_percentil(datos_empresa.get('percentiles'), indicador)
+    return f"📊 {texto}.\n\n" if texto else ""
+
+# Función para detectar si un mensaje está fuera del ámbito financiero
+@instrumentar()
+def es_mensaje_no_financiero(mensaje):
+    """
+    Detecta si un mensaje está fuera del ámbito financiero.
+    
+    Args:
+        mensaje (str): Mensaje del usuario
+        
+    Returns:
+        bool: True si el mensaje no es financiero, False si es financiero
+    """
+    # Palabras clave de saludos comunes
+    saludos = ['hola', 'buenos días', 'buenas tardes', 'buenas noches', 'saludos', 'qué tal', 'como estas', 'cómo estás', 'como vas', 'qué hay']
+    
+    # Palabras clave de despedidas
+    despedidas = ['adiós', 'chao', 'hasta luego', 'nos vemos', 'bye', 'hasta pronto', 'hasta mañana']
+    
+    # Palabras clave sobre estados emocionales
+    emociones = ['triste', 'feliz', 'deprimido', 'ansioso', 'estresado', 'cansado', 'aburrido', 'mal', 'bien', 'enfermo']
+    
+    # Palabras clave sobre temas personales
+    temas_personales = ['salud', 'vida', 'familia', 'amigo', 'amor', 'relación', 'matrimonio', 'hijo', 'niño', 'mascota']
+    
+    # Peticiones de ayuda generales
+    ayuda_general = ['ayuda', 'ayúdame', 'socorro', 'sos', 'help']
+    
+    # Verificar si el mensaje coincide con alguna categoría
+    mensaje_lower = mensaje.lower()
+    
+    # Detectar saludos simples
+    if any(saludo == mensaje_lower for saludo in saludos):
+        return True, "saludo"
+    
+    # Detectar despedidas simples
+    if any(despedida == mensaje_lower for despedida in despedidas):
+        return True, "despedida"
+        
+    # Detectar si es una petición de ayuda general
+    if any(ayuda == mensaje_lower for ayuda in ayuda_general):
+        return True, "ayuda"
+    
+    # Detectar emociones o temas personales
+    if any(emocion in mensaje_lower for emocion in emociones):
+        return True, "emocion"
+    
+    if any(tema in mensaje_lower for tema in temas_personales):
+        return True, "personal"
+    
+    # Detectar mensajes muy cortos o sin palabras clave financieras
+    if len(mensaje_lower.split()) < 2:
+        # Puede ser una respuesta corta no financiera
+        return True, "corto"
+    
+    # Palabras clave financieras para verificar si es un mensaje financiero
+    palabras_financieras = [
+        'finanza', 'empresa', 'dinero', 'capital', 'beneficio', 'ganancia', 'activo', 'pasivo', 
+        'deuda', 'préstamo', 'inversion', 'cartera', 'crédito', 'liquidez', 'rentabilidad', 
+        'margen', 'impuesto', 'pago', 'cobro', 'factura', 'balance', 'contabilidad', 'inventario',
+        'flujo', 'costo', 'ingreso', 'gasto', 'ratio', 'indicador', 'estado', 'análisis',
+        'endeudamiento', 'productividad', 'rotación'
+    ]
+    
+    # Si contiene alguna palabra financiera, considerarlo como mensaje financiero
+    if any(palabra in mensaje_lower for palabra in palabras_financieras):
+        return False, "financiero"
+    
+    # Por defecto, considerar como no financiero
+    return True, "otro"
+
+# Función para responder a mensajes no financieros
+def responder_mensaje_no_financiero(tipo):
+    """
+    Genera respuestas para mensajes que no son de índole financiera.
+    
+    Args:
+        tipo (str): Tipo de mensaje no financiero
+        
+    Returns:
+        str: Respuesta apropiada
+    """
+    if tipo == "saludo":
+        saludos = [
+            "👋 ¡Hola! Soy FinanzGPT, tu asistente financiero empresarial. ¿En qué puedo ayudarte hoy con respecto a tus finanzas?",
+            "¡Hola! Estoy aquí para ayudarte con el análisis financiero de tu empresa. ¿Qué te gustaría saber?",
+            "¡Saludos! Soy tu asistente especializado en análisis financiero empresarial. ¿Tienes alguna consulta sobre tus indicadores financieros?"
+        ]
+        return random.choice(saludos)
+    
+    elif tipo == "despedida":
+        despedidas = [
+            "¡Hasta pronto! Recuerda revisar periódicamente tus indicadores financieros para mantener el control de tu empresa.",
+            "¡Adiós! Si tienes más preguntas sobre finanzas empresariales en el futuro, estaré aquí para ayudarte.",
+            "¡Que tengas un buen día! Estaré disponible cuando necesites más análisis financieros para tu empresa."
+        ]
+        return random.choice(despedidas)
+    
+    elif tipo == "emocion" or tipo == "personal":
+        respuestas = [
+            "Como asistente financiero, estoy diseñado para ayudarte con indicadores y análisis económicos de tu empresa. ¿Te gustaría que analizáramos algún aspecto financiero específico?",
+            "Mi especialidad es el análisis financiero empresarial. ¿Puedo ayudarte con alguna consulta sobre tus indicadores económicos?",
+            "Estoy programado para asistirte en temas financieros empresariales. ¿Hay algún aspecto financiero de tu empresa sobre el que quieras información?"
+        ]
+        return random.choice(respuestas)
+    
+    elif tipo == "ayuda":
+        # Mostrar menú de opciones de ayuda
+        respuesta = """### 🔍 ¿En qué puedo ayudarte?
+
+Soy FinanzGPT, tu asistente especializado en análisis financiero empresarial. Puedo ayudarte con:
+
+1. **Análisis de endeudamiento**: Evaluación de tu ratio de deuda y recomendaciones para optimizarlo
+2. **Análisis de rentabilidad**: Evaluación de tu ROA y estrategias para mejorar tus beneficios
+3. **Análisis de productividad**: Evaluación del rendimiento por empleado y consejos para aumentarlo
+4. **Análisis de rotación de cartera**: Evaluación de tu ciclo de cobro y métodos para acelerarlo
+5. **Análisis de liquidez**: Evaluación de tu capacidad para cubrir obligaciones a corto plazo
+6. **Resumen general financiero**: Visión global de todos tus indicadores financieros
+
+Para consultar, simplemente pregunta por ejemplo: *"¿Cómo está mi endeudamiento?"* o *"¿Qué puedo hacer para mejorar mi rentabilidad?"*"""
+        return respuesta
+    
+    elif tipo == "corto" or tipo == "otro":
+        respuestas = [
+            "Soy un asistente especializado en análisis financiero empresarial. ¿Puedo ayudarte con alguna consulta sobre indicadores financieros de tu empresa?",
+            "Estoy aquí para ayudarte con análisis económico y financiero. ¿Qué indicador financiero te gustaría analizar?",
+            "Como asistente financiero, puedo ayudarte a interpretar tus indicadores y darte recomendaciones para mejorar la salud económica de tu empresa. ¿Qué aspecto te interesa analizar?"
+        ]
+        return random.choice(respuestas)
+
+# Función mejorada para respuestas del chatbot estilo ChatGPT
+@instrumentar()
+def chatbot_response(mensaje, datos_empresa=None):
+    """
+    Genera respuestas del chatbot basadas en el mensaje del usuario y los datos de la empresa.
+    
+    Args:
+        mensaje (str): Mensaje del usuario
+        datos_empresa (dict, optional): Datos de la empresa
+        
+    Returns:
+        str: Respuesta del chatbot
+    """
+    anotar(longitud_mensaje=len(mensaje))
+    
+    # Verificar si es un mensaje no financiero
+    es_no_financiero, tipo = es_mensaje_no_financiero(mensaje)
+    
+    if es_no_financiero:
+        anotar(categoria=tipo, financiero=False)
+        return responder_mensaje_no_financiero(tipo)
+    
+    # Si el mensaje es financiero, continuar con el análisis normal
+    # Aplicar NLP al mensaje (las preguntas repetidas se sirven desde la caché compartida)
+    analisis = analizar_texto_cache(mensaje)
+    tokens = analisis.tokens
+    lemas = analisis.lemas
+    pos_tags = analisis.pos_tags
+    keywords = analisis.palabras_clave[:3]
+    
+    # Mensajes predefinidos para diferentes situaciones
+    mensajes_predefinidos = {
+        'saludo': [
+            "👋 ¡Hola! Soy FinanzGPT, tu asistente especializado en análisis financiero empresarial. ¿En qué puedo ayudarte hoy?",
+            "¡Saludos! Estoy aquí para ayudarte a entender mejor la situación financiera de tu empresa. ¿Qué te gustaría saber?",
+            "Hola, soy tu asistente de análisis económico. Puedo ayudarte a interpretar tus indicadores financieros y darte recomendaciones personalizadas."
+        ],
+        'agradecimiento': [
+            "¡Es un placer ayudarte! El análisis financiero es mi especialidad. ¿Hay algo más que quieras saber?",
+            "No hay de qué. Recuerda que puedo explicarte cualquier indicador financiero de tu empresa con más detalle.",
+            "¡De nada! Si tienes más preguntas sobre la salud financiera de tu empresa, no dudes en consultarme."
+        ],
+        'despedida': [
+            "¡Hasta pronto! Recuerda revisar periódicamente tus indicadores financieros para mantener el control de tu empresa.",
+            "Adiós. No olvides implementar las recomendaciones para mejorar la salud financiera de tu negocio. ¡Éxito!",
+            "Que tengas un excelente día. Estaré aquí cuando necesites más análisis o interpretaciones de tus datos financieros."
+        ],
+        'endeudamiento': [
+            "El ratio de endeudamiento muestra qué proporción de tus activos está financiada por deuda. Un valor menor generalmente indica una situación más sólida, aunque depende del sector.\n\nTe invito a consultar este indicador específico para tu empresa escribiendo '¿Cómo está mi endeudamiento?'",
+            "Para mejorar tu ratio de endeudamiento, podrías:\n• Aumentar el capital social\n• Reinvertir beneficios\n• Vender activos no productivos para reducir deuda\n• Renegociar plazos de pago.\n\nSi quieres un análisis más detallado de tu situación, pregúntame directamente.",
+            "Es importante comparar tu ratio de endeudamiento con empresas similares del sector. Cada industria tiene sus particularidades y lo que es alto en un sector puede ser normal en otro.\n\nPuedo analizar la situación específica de tu empresa si me preguntas sobre tu nivel de endeudamiento."
+        ],
+        'rentabilidad': [
+            "La rentabilidad sobre activos (ROA) indica cuánto beneficio generas por cada peso invertido en activos. Un ROA más alto significa que estás aprovechando mejor tus recursos.\n\nPara conocer cómo está tu rentabilidad, simplemente pregúntame '¿Cómo es mi rentabilidad?'",
+            "Para mejorar tu rentabilidad podrías:\n• Aumentar precios si el mercado lo permite\n• Reducir costos operativos\n• Optimizar la gestión de inventarios\n• Deshacerte de activos poco productivos.\n\nPregúntame por un análisis específico para tu empresa.",
+            "Tu ROA debe compararse con la media del sector. Si está por debajo, podría ser momento de replantearse la estrategia de negocio o buscar nuevas oportunidades de mercado.\n\nPuedo darte una evaluación personalizada si me preguntas directamente."
+        ],
+        'productividad': [
+            "La productividad por empleado muestra cuánto genera cada trabajador en términos de ingresos. Es un indicador clave de la eficiencia operativa.\n\nSi quieres saber cómo está la productividad en tu empresa, pregúntame directamente.",
+            "Para mejorar la productividad podrías:\n• Invertir en capacitación\n• Mejorar procesos y tecnología\n• Implementar sistemas de incentivos basados en resultados\n• Revisar la distribución de tareas.\n\nConsulta el estado de tu empresa preguntándome por tu nivel de productividad.",
+            "Una baja productividad puede indicar exceso de personal, falta de tecnología adecuada, o procesos ineficientes. Análisis más profundos te ayudarán a identificar los cuellos de botella.\n\nPregúntame directamente por tu productividad para un análisis específico."
+        ],
+        'cartera': [
+            "La rotación de cartera indica cuántos días tardas en cobrar tus ventas a crédito. Una rotación más baja es generalmente mejor, ya que mejora tu liquidez.\n\nPara saber cómo está tu rotación de cartera, puedes preguntarme directamente.",
+            "Para mejorar tu rotación de cartera, considera:\n• Revisar políticas de crédito\n• Implementar descuentos por pronto pago\n• Mejorar el seguimiento de cobros\n• Evaluar factoring para cuentas problemáticas.\n\nPregúntame específicamente por tu rotación de cartera para un análisis personalizado.",
+            "Una cartera que rota lentamente puede generar problemas de liquidez. Es importante balancear las políticas de crédito para no perder clientes pero tampoco arriesgar tu flujo de caja.\n\nSi quieres saber cómo está tu rotación de cartera, solo pregúntame."
+        ],
+        'liquidez': [
+            "La liquidez se refiere a la capacidad de tu empresa para cumplir con sus obligaciones a corto plazo. Con los datos proporcionados, puedo hacer una estimación básica.\n\nSi quieres saber más sobre tu liquidez, pregúntame directamente.",
+            "Un buen ratio de liquidez suele estar entre 1.5 y 2.0, indicando que puedes cubrir tus deudas a corto plazo sin problemas.\n\nPara un análisis específico de tu empresa, pregúntame por tu liquidez.",
+            "Si tienes problemas de liquidez, podrías:\n• Mejorar la gestión de cobros\n• Renegociar plazos con proveedores\n• Establecer líneas de crédito\n• Revisar tu ciclo de conversión de efectivo.\n\nConsulta tu situación preguntándome directamente."
+        ],
+        'general': [
+            "Basándome en los datos proporcionados, puedo analizar varios aspectos financieros de tu empresa. ¿Hay algún indicador específico que te interese conocer más a fondo?",
+            "¿Sabías que el análisis financiero debe ser periódico? Te recomiendo revisar estos indicadores al menos trimestralmente para detectar tendencias y actuar a tiempo.",
+            "Recuerda que cada sector tiene sus propios estándares para los indicadores financieros. Lo importante es identificar tendencias y compararte con empresas similares."
+        ]
+    }
+    
+    # Verificar el tipo de mensaje usando NLP
+    # Enfoque mejorado analizando palabras clave y contexto
+    if any(palabra in mensaje.lower() for palabra in ['hola', 'buenos', 'saludos', 'que tal']):
+        categoria = 'saludo'
+    elif any(palabra in mensaje.lower() for palabra in ['gracias', 'agradecido', 'agradezco', 'thank']):
+        categoria = 'agradecimiento'
+    elif any(palabra in mensaje.lower() for palabra in ['adios', 'chao', 'hasta luego', 'nos vemos', 'bye']):
+        categoria = 'despedida'
+    elif any(palabra in mensaje.lower() for palabra in ['deuda', 'endeudamiento', 'pasivo', 'prestamo', 'financiacion', 'apalancamiento']):
+        categoria = 'endeudamiento'
+    elif any(palabra in mensaje.lower() for palabra in ['rentabilidad', 'ganancia', 'beneficio', 'rendimiento', 'roa', 'margen','utilidad']):
+        categoria = 'rentabilidad'
+    elif any(palabra in mensaje.lower() for palabra in ['productividad', 'eficiencia', 'empleado', 'trabajador', 'personal', 'rendimiento']):
+        categoria = 'productividad'
+    elif any(palabra in mensaje.lower() for palabra in ['cartera', 'cobrar', 'credito', 'rotacion', 'cliente', 'factura', 'cobranza']):
+        categoria = 'cartera'
+    elif any(palabra in mensaje.lower() for palabra in ['liquidez', 'efectivo', 'caja', 'corriente', 'solvencia', 'flujo']):
+        categoria = 'liquidez'
+    else:
+        # Análisis más avanzado basado en similitud semántica con el índice de temas
+        from .temas import obtener_indice_temas
+        
+        indice_temas = obtener_indice_temas()
+        with span('similitud_temas', temas=len(indice_temas.temas)) as s:
+            # Elegir el tema con mayor similitud si supera el umbral
+            tema, similitud = indice_temas.clasificar(analisis)
+            s.anotar(mejor_tema=tema, similitud=similitud)
+        categoria = tema or 'general'
+    
+    anotar(categoria=categoria, financiero=True, personalizada=bool(datos_empresa and 'resultados' in datos_empresa))
+    
+    # Si hay datos de empresa, personalizar respuesta
+    if datos_empresa and 'resultados' in datos_empresa:
+        resultados = datos_empresa['resultados']
+        
+        if categoria == 'endeudamiento':
+            ratio = resultados['indicadores']['ratio_endeudamiento']
+            evaluacion = resultados['evaluacion']['endeudamiento']
+            
+            # Respuesta detallada y personalizada
+            respuesta = f"### 📊 Análisis de Endeudamiento\n\nTu ratio de endeudamiento es **{ratio:.2f}**, lo cual es considerado **{evaluacion}** para el sector {resultados['sector']}.\n\n"
+            respuesta += comparacion_sector(datos_empresa, 'endeudamiento')
+            
+            # Añadir interpretación según el valor
+            if ratio < 0.4:
+                respuesta += "Este valor indica un bajo nivel de endeudamiento, lo que es positivo para la estabilidad financiera, pero podría estar perdiendo oportunidades de apalancamiento para crecer más rápido.\n\n"
+            elif ratio < 0.6:
+                respuesta += "Este valor muestra un endeudamiento moderado y saludable, un buen balance entre capital propio y ajeno.\n\n"
+            else:
+                respuesta += "Este nivel de endeudamiento es elevado, lo que podría aumentar el riesgo financiero y dificultar el acceso a nuevo financiamiento.\n\n"
+            
+            # Añadir recomendaciones específicas
+            if ratio > 0.6:
+                respuesta += "**Recomendaciones para reducir tu endeudamiento:**\n\n"
+                respuesta += "1. Considera aumentar el capital social o reinvertir beneficios\n"
+                respuesta += "2. Evalúa la posibilidad de vender activos no estratégicos\n"
+                respuesta += "3. Establece un plan gradual de reducción de deuda\n"
+                respuesta += "4. Renegocia condiciones de crédito con tus acreedores\n\n"
+            
+            return respuesta
+            
+        elif categoria == 'rentabilidad':
+            rent = resultados['indicadores']['rentabilidad']
+            evaluacion = resultados['evaluacion']['rentabilidad']
+            
+            # Respuesta detallada
+            respuesta = f"### 💰 Análisis de Rentabilidad\n\nTu rentabilidad sobre activos (ROA) es **{rent:.2%}**, lo cual es considerada **{evaluacion}** para el sector {resultados['sector']}.\n\n"
+            respuesta += comparacion_sector(datos_empresa, 'rentabilidad')
+            
+            # Interpretación personalizada
+            if rent < 0.05:
+                respuesta += "Esta rentabilidad es baja. Cada $100 invertidos en activos están generando menos de $5 de beneficio, lo que sugiere revisar la eficiencia operativa y la estructura de costos.\n\n"
+                
+                # Añadir recomendaciones específicas para baja rentabilidad
+                respuesta += "**Recomendaciones para mejorar tu rentabilidad:**\n\n"
+                respuesta += "1. Realiza un análisis detallado de costos para identificar ineficiencias\n"
+                respuesta += "2. Evalúa tu estrategia de precios y considera ajustes si el mercado lo permite\n"
+                respuesta += "3. Revisa la productividad de tus activos y considera deshacerte de aquellos poco productivos\n"
+                respuesta += "4. Analiza tus líneas de productos/servicios e identifica cuáles son más rentables\n\n"
+                
+            elif rent < 0.15:
+                respuesta += "Esta rentabilidad es moderada. Tus activos están produciendo un retorno razonable, aunque siempre hay espacio para mejorar.\n\n"
+                
+                # Recomendaciones para rentabilidad moderada
+                respuesta += "**Acciones para optimizar tu rentabilidad:**\n\n"
+                respuesta += "1. Busca oportunidades de incremento de eficiencia operativa\n"
+                respuesta += "2. Considera estrategias para aumentar el volumen de ventas\n"
+                respuesta += "3. Evalúa posibilidades de diversificación hacia productos/servicios más rentables\n\n"
+                
+            else:
+                respuesta += "¡Excelente rentabilidad! Tus activos están siendo muy productivos generando un alto retorno sobre la inversión.\n\n"
+                
+                # Consejos para mantener alta rentabilidad
+                respuesta += "**Para mantener esta excelente rentabilidad:**\n\n"
+                respuesta += "1. Documenta tus procesos exitosos para asegurar su continuidad\n"
+                respuesta += "2. Considera reinvertir parte de los beneficios para sostener el crecimiento\n"
+                respuesta += "3. Monitorea regularmente los indicadores para detectar cambios de tendencia\n\n"
+            
+            return respuesta
+            
+        elif categoria == 'productividad':
+            productividad = resultados['indicadores']['productividad']
+            evaluacion = resultados['evaluacion']['productividad']
+            
+            # Respuesta detallada
+            respuesta = f"### 👥 Análisis de Productividad\n\nLa productividad por empleado es **${formato_numero(productividad)} COP**, lo cual es considerada **{evaluacion}** para el sector {resultados['sector']}.\n\n"
+            respuesta += comparacion_sector(datos_empresa, 'productividad')
+            
+            # Interpretación personalizada según sector
+            limite = obtener_registro().limite(resultados['sector'], 'productividad')
+            
+            if productividad < limite * 0.7:
+                respuesta += "Esta productividad está por debajo del estándar del sector. Podría ser conveniente revisar procesos, capacitación y tecnología disponible para los empleados.\n\n"
+                
+                # Recomendaciones específicas para baja productividad
+                respuesta += "**Estrategias para aumentar la productividad:**\n\n"
+                respuesta += "1. Implementa programas de capacitación y desarrollo de habilidades\n"
+                respuesta += "2. Revisa y optimiza los procesos operativos para eliminar ineficiencias\n"
+                respuesta += "3. Evalúa la incorporación de tecnología para automatizar tareas repetitivas\n"
+                respuesta += "4. Considera sistemas de incentivos basados en resultados\n\n"
+                
+            elif productividad < limite * 1.2:
+                respuesta += "Esta productividad está alineada con los estándares del sector, mostrando una operación eficiente.\n\n"
+                
+                # Consejos para mantener buena productividad
+                respuesta += "**Para mantener y mejorar tu productividad:**\n\n"
+                respuesta += "1. Establece sistemas de mejora continua en tus procesos\n"
+                respuesta += "2. Fomenta la participación de los empleados en la identificación de mejoras\n"
+                respuesta += "3. Realiza evaluaciones periódicas de desempeño y productividad\n\n"
+                
+            else:
+                respuesta += "¡Excelente productividad! Tus empleados generan un valor significativamente superior al promedio del sector.\n\n"
+                
+                # Estrategias para mantener alta productividad
+                respuesta += "**Para mantener este excelente nivel:**\n\n"
+                respuesta += "1. Documenta y estandariza las mejores prácticas actuales\n"
+                respuesta += "2. Reconoce y premia el alto desempeño para mantener la motivación\n"
+                respuesta += "3. Comparte el conocimiento entre equipos para extender el éxito\n\n"
+            
+            return respuesta
+            
+        elif categoria == 'cartera':
+            rotacion = resultados['indicadores']['rotacion_cartera']
+            evaluacion = resultados['evaluacion']['rotacion']
+            
+            # Respuesta detallada
+            respuesta = f"### 📅 Análisis de Rotación de Cartera\n\nTu rotación de cartera es de **{rotacion:.1f} días**, lo cual es considerado **{evaluacion}** para el sector {resultados['sector']}.\n\n"
+            respuesta += comparacion_sector(datos_empresa, 'rotacion')
+            
+            # Interpretación personalizada
+            if rotacion < 30:
+                respuesta += "¡Excelente gestión de cobros! Tu empresa recupera el dinero rápidamente, lo que favorece la liquidez.\n\n"
+                
+                # Consejos para mantener buena rotación
+                respuesta += "**Para mantener esta excelente rotación:**\n\n"
+                respuesta += "1. Documenta tus políticas y procesos de cobranza actuales\n"
+                respuesta += "2. Mantén actualizada tu base de datos de clientes\n"
+                respuesta += "3. Continúa con los incentivos por pronto pago si los tienes implementados\n\n"
+                
+            elif rotacion < 60:
+                respuesta += "Tu gestión de cobros es adecuada. Mantiene un buen equilibrio entre política comercial y necesidades de liquidez.\n\n"
+                
+                # Consejos para mejorar una rotación adecuada
+                respuesta += "**Para optimizar aún más tu rotación:**\n\n"
+                respuesta += "1. Segmenta a tus clientes por comportamiento de pago\n"
+                respuesta += "2. Implementa recordatorios automáticos antes del vencimiento\n"
+                respuesta += "3. Evalúa ofrecer pequeños descuentos por pronto pago\n\n"
+                
+            else:
+                respuesta += "Tu periodo de cobro es extenso, lo que podría estar afectando tu flujo de caja. Considera revisar tus políticas de crédito y cobranza.\n\n"
+                
+                # Estrategias para mejorar rotación alta
+                respuesta += "**Estrategias para reducir tu periodo de cobro:**\n\n"
+                respuesta += "1. Revisa y actualiza tus políticas de crédito y criterios de selección de clientes\n"
+                respuesta += "2. Implementa un sistema de seguimiento más estricto para facturas pendientes\n"
+                respuesta += "3. Considera ofrecer descuentos significativos por pronto pago\n"
+                respuesta += "4. Evalúa opciones de factoring para casos problemáticos o clientes estratégicos\n\n"
+            
+            return respuesta
+            
+        elif categoria == 'liquidez':
+            # Estimación aproximada de liquidez basada en cartera y deudas
+            cartera = datos_empresa['datos']['cartera']
+            deudas = datos_empresa['datos']['deudas']
+            
+            # Cálculo simplificado (solo con los datos disponibles)
+            est_liquidez = cartera / deudas if deudas > 0 else "Alta"
+            
+            # Respuesta
+            if isinstance(est_liquidez, str):
+                respuesta = f"### 💧 Estimación de Liquidez\n\nBasado en los datos proporcionados, tu empresa parece tener una liquidez **{est_liquidez}**, ya que tus deudas son mínimas en comparación con tu cartera.\n\n"
+                
+                respuesta += "**Recomendaciones para gestionar tu alta liquidez:**\n\n"
+                respuesta += "1. Evalúa oportunidades de inversión para recursos excedentes\n"
+                respuesta += "2. Considera expandir operaciones o diversificar\n"
+                respuesta += "3. Revisa tu política de dividendos si corresponde\n\n"
+                
+            else:
+                respuesta = f"### 💧 Estimación de Liquidez\n\nLa relación entre tu cartera y tus deudas es de **{est_liquidez:.2f}**.\n\n"
+                
+                if est_liquidez < 1:
+                    respuesta += "Esto podría indicar problemas de liquidez a corto plazo, ya que tu cartera no cubriría todas tus deudas.\n\n"
+                    
+                    # Estrategias para mejorar liquidez baja
+                    respuesta += "**Estrategias para mejorar tu liquidez:**\n\n"
+                    respuesta += "1. Acelera la cobranza de cartera con incentivos de pronto pago\n"
+                    respuesta += "2. Negocia extensiones de plazo con proveedores\n"
+                    respuesta += "3. Evalúa líneas de crédito de contingencia\n"
+                    respuesta += "4. Considera vender activos no esenciales si es necesario\n\n"
+                    
+                elif est_liquidez < 1.5:
+                    respuesta += "Tu liquidez es ajustada pero manejable. Mantén un control cercano de tu flujo de caja.\n\n"
+                    
+                    # Consejos para liquidez ajustada
+                    respuesta += "**Para mejorar tu posición de liquidez:**\n\n"
+                    respuesta += "1. Implementa un sistema de proyección semanal de flujo de caja\n"
+                    respuesta += "2. Revisa tus políticas de inventario para optimizar capital de trabajo\n"
+                    respuesta += "3. Establece alertas tempranas para posibles problemas de liquidez\n\n"
+                    
+                else:
+                    respuesta += "Tu posición de liquidez parece sólida, con suficiente cartera para cubrir tus obligaciones.\n\n"
+                    
+                    # Consejos para gestionar buena liquidez
+                    respuesta += "**Para optimizar tu gestión de liquidez:**\n\n"
+                    respuesta += "1. Evalúa opciones de inversión temporal para excedentes\n"
+                    respuesta += "2. Considera negociar mejores condiciones con proveedores\n"
+                    respuesta += "3. Mantén un fondo de contingencia para oportunidades o emergencias\n\n"
+            
+            return respuesta
+            
+        # Si la categoría no coincide con ninguna de las anteriores, dar respuesta general
+        else:
+            # Respuesta general sobre el estado de la empresa
+            estado = resultados['estado_general']
+            
+            respuesta = f"### 📈 Estado General de la Empresa\n\nBasado en mis análisis, la situación financiera general de **{resultados['nombre']}** es **{estado}**.\n\n"
+            
+            # Añadir resumen de los puntos principales
+            respuesta += "**Resumen de indicadores clave:**\n\n"
+            respuesta += f"• Endeudamiento: {resultados['indicadores']['ratio_endeudamiento']:.2f} - {resultados['evaluacion']['endeudamiento']}\n"
+            respuesta += f"• Rentabilidad: {resultados['indicadores']['rentabilidad']:.2%} - {resultados['evaluacion']['rentabilidad']}\n"
+            respuesta += f"• Productividad: ${formato_numero(resultados['indicadores']['productividad'])} por empleado - {resultados['evaluacion']['productividad']}\n"
+            respuesta += f"• Rotación de cartera: {resultados['indicadores']['rotacion_cartera']:.1f} días - {resultados['evaluacion']['rotacion']}\n\n"
+            
+            respuesta += "Para recibir un análisis detallado de cualquiera de estos indicadores, puedes preguntarme específicamente por ello.\n\n"
+            
+            # Sugerir próximos pasos según el estado general
+            if estado == "Excelente":
+                respuesta += "**¿Qué te interesaría saber para mantener este excelente desempeño?**"
+            elif estado == "Bueno":
+                respuesta += "**¿Qué aspecto te gustaría mejorar para llevar tu empresa al siguiente nivel?**"
+            elif estado == "Regular":
+                respuesta += "**¿Sobre qué área te gustaría trabajar primero para mejorar la situación?**"
+            else:  # Crítico
+                respuesta += "**Es importante actuar pronto. ¿Qué aspecto te preocupa más y quieres abordar primero?**"
+                
+            return respuesta
+    
+    # Si no hay datos de empresa o la consulta es general
+    # Usar POS tagging para identificar verbos y sustantivos clave
+    verbos = [word for word, tag in pos_tags if tag == 'VERB']
+    sustantivos = [word for word, tag in pos_tags if tag in ['NOUN', 'PROPN']]
+    
+    # Personalización básica basada en palabras extraídas
+    if verbos and sustantivos:
+        accion = verbos[0]
+        tema = sustantivos[0] if sustantivos else "empresa"
+        respuesta = f"Entiendo que quieres {accion} sobre {tema}. "
+        respuesta += random.choice(mensajes_predefinidos[categoria])
+        return respuesta
+    
+    # Si no hay suficiente contexto para personalizar, usar respuesta predefinida
+    return random.choice(mensajes_predefinidos[categoria])
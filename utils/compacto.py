@@ -0,0 +1,252 @@
+"""
+Representación compacta de resultados de análisis.
+
+Las evaluaciones se guardan como códigos enteros (0 = cumple, 1 = no cumple, en el
+orden de las reglas del registro), el estado general como índice de ESTADOS y las
+recomendaciones como máscara de bits (bit i = regla i no cumple). El diccionario
+de analizar_empresa y el texto de generar_mensaje_resultado solo se construyen
+cuando se piden.
+"""
+import numpy as np
+import pandas as pd
+
+from .analysis import _calcular_lote, _estado_general, analizar_empresa, generar_mensaje_resultado
+from .sectores import obtener_registro
+
+# Estados generales en orden de código
+ESTADOS = ("Crítico", "Regular", "Bueno", "Excelente")
+
+# Claves de los indicadores numéricos en el orden en que se almacenan
+CAMPOS_INDICADORES = ('ratio_endeudamiento', 'rentabilidad', 'productividad', 'rotacion_cartera')
+
+def _codigos_estado(num_reglas):
+    return np.array(
+        [ESTADOS.index(_estado_general(puntos)) for puntos in range(num_reglas + 1)],
+        dtype=np.uint8
+    )
+
+def _entero_sin_signo(bits, que):
+    for tipo in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if bits <= np.iinfo(tipo).bits:
+            return tipo
+    raise ValueError(f"{que} no cabe en un entero de 64 bits ({bits} bits).")
+
+def dtype_resultados(registro=None):
+    """
+    Devuelve el dtype estructurado de un lote de resultados compactos.
+    
+    Los tamaños del código de sector y de la máscara de recomendaciones se
+    ajustan al número de sectores y de reglas del registro.
+    
+    Args:
+        registro (RegistroSectores, optional): Registro de sectores a usar
+        
+    Returns:
+        numpy.dtype: Indicadores en float64, código de sector, un código uint8
+            por evaluación, código de estado y máscara de recomendaciones
+            
+    Raises:
+        ValueError: Si el registro tiene más de 64 reglas
+    """
+    registro = registro or obtener_registro()
+    bits_sector = max(1, (len(registro.sectores) - 1).bit_length())
+    campos = [(campo, np.float64) for campo in CAMPOS_INDICADORES]
+    campos.append(('sector', _entero_sin_signo(bits_sector, "El código de sector")))
+    campos.extend((f'eval_{indicador}', np.uint8) for indicador in registro.indicadores)
+    campos.append(('estado', np.uint8))
+    campos.append(('recomendaciones', _entero_sin_signo(len(registro.reglas), "La máscara de recomendaciones")))
+    return np.dtype(campos)
+
+class ResultadoCompacto:
+    """
+    Resultado de un análisis con __slots__ y códigos enteros en lugar de textos.
+    """
+    
+    __slots__ = (
+        'nombre', 'sector', 'ratio_endeudamiento', 'rentabilidad', 'productividad',
+        'rotacion_cartera', 'estado', 'recomendaciones'
+    )
+    
+    def __init__(self, nombre, sector, ratio_endeudamiento, rentabilidad, productividad,
+                 rotacion_cartera, estado, recomendaciones):
+        self.nombre = nombre
+        self.sector = sector
+        self.ratio_endeudamiento = ratio_endeudamiento
+        self.rentabilidad = rentabilidad
+        self.productividad = productividad
+        self.rotacion_cartera = rotacion_cartera
+        self.estado = estado
+        self.recomendaciones = recomendaciones
+    
+    @classmethod
+    def desde_dict(cls, resultados, registro=None):
+        """
+        Crea un resultado compacto a partir del diccionario de analizar_empresa.
+        
+        Args:
+            resultados (dict): Resultados del análisis
+            registro (RegistroSectores, optional): Registro de sectores a usar
+            
+        Returns:
+            ResultadoCompacto: Resultado compacto
+        """
+        registro = registro or obtener_registro()
+        mascara = 0
+        for i, regla in enumerate(registro.reglas):
+            if resultados['evaluacion'][regla['indicador']] != regla['etiquetas'][0]:
+                mascara |= 1 << i
+        ind = resultados['indicadores']
+        return cls(
+            resultados['nombre'], resultados['sector'],
+            ind['ratio_endeudamiento'], ind['rentabilidad'], ind['productividad'], ind['rotacion_cartera'],
+            ESTADOS.index(resultados['estado_general']), mascara
+        )
+    
+    @property
+    def codigos_evaluacion(self):
+        """tuple: Código de cada evaluación (0 = cumple, 1 = no cumple)."""
+        return tuple((self.recomendaciones >> i) & 1 for i in range(len(obtener_registro().reglas)))
+    
+    @property
+    def estado_general(self):
+        """str: Estado general en texto."""
+        return ESTADOS[self.estado]
+    
+    def a_dict(self, registro=None):
+        """
+        Reconstruye el diccionario de analizar_empresa (sin 'nlp_ejemplo').
+        
+        Args:
+            registro (RegistroSectores, optional): Registro de sectores a usar
+            
+        Returns:
+            dict: Resultados del análisis
+        """
+        registro = registro or obtener_registro()
+        evaluacion = {}
+        recomendaciones = []
+        for i, regla in enumerate(registro.reglas):
+            no_cumple = (self.recomendaciones >> i) & 1
+            evaluacion[regla['indicador']] = regla['etiquetas'][no_cumple]
+            if no_cumple:
+                recomendaciones.append(regla['recomendacion'])
+        return {
+            'nombre': self.nombre,
+            'sector': self.sector,
+            'indicadores': {
+                'ratio_endeudamiento': self.ratio_endeudamiento,
+                'rentabilidad': self.rentabilidad,
+                'productividad': self.productividad,
+                'rotacion_cartera': self.rotacion_cartera
+            },
+            'evaluacion': evaluacion,
+            'estado_general': self.estado_general,
+            'recomendaciones': recomendaciones
+        }
+    
+    def mensaje(self):
+        """
+        Genera el texto de generar_mensaje_resultado para este resultado.
+        
+        Returns:
+            str: Mensaje personalizado
+        """
+        return generar_mensaje_resultado(self.a_dict())
+    
+    def __repr__(self):
+        return (f"ResultadoCompacto(nombre={self.nombre!r}, sector={self.sector!r}, "
+                f"estado={self.estado_general!r}, recomendaciones={self.recomendaciones:#06b})")
+
+def analizar_empresa_compacto(datos):
+    """
+    Analiza una empresa y devuelve el resultado en forma compacta.
+    
+    Args:
+        datos (dict): Diccionario con datos de la empresa
+        
+    Returns:
+        ResultadoCompacto: Resultado compacto
+    """
+    return ResultadoCompacto.desde_dict(analizar_empresa(datos, modo_nlp=None))
+
+def analizar_lote_compacto(datos):
+    """
+    Analiza un portafolio y devuelve un arreglo estructurado sin textos.
+    
+    Los nombres no se almacenan y el sector queda como código del registro; se
+    pueden pasar de nuevo al convertir con estructurado_a_dicts.
+    
+    Args:
+        datos (pandas.DataFrame | dict): Columnas de datos (ver analizar_empresas_lote)
+        
+    Returns:
+        numpy.ndarray: Arreglo con dtype_resultados()
+    """
+    if not isinstance(datos, pd.DataFrame):
+        datos = pd.DataFrame(datos)
+    
+    registro = obtener_registro()
+    codigos = registro.codigos_lote(datos['sector'].to_numpy())
+    lote = _calcular_lote(
+        datos['ganancias'].to_numpy(),
+        datos['activos'].to_numpy(),
+        datos['deudas'].to_numpy(),
+        datos['cartera'].to_numpy(),
+        datos['empleados'].to_numpy(),
+        codigos,
+        registro
+    )
+    
+    resultado = np.empty(len(datos), dtype=dtype_resultados(registro))
+    for campo in CAMPOS_INDICADORES:
+        resultado[campo] = lote['indicadores'][campo]
+    resultado['sector'] = codigos
+    for i, indicador in enumerate(registro.indicadores):
+        resultado[f'eval_{indicador}'] = ~lote['cumple'][:, i]
+    resultado['estado'] = _codigos_estado(len(registro.reglas))[lote['puntos']]
+    resultado['recomendaciones'] = lote['mascara']
+    return resultado
+
+def estructurado_a_compacto(resultados, i, nombre=None, sector=None):
+    """
+    Extrae una fila de un arreglo estructurado como ResultadoCompacto.
+    
+    Args:
+        resultados (numpy.ndarray): Arreglo de analizar_lote_compacto
+        i (int): Índice de la fila
+        nombre (str, optional): Nombre de la empresa
+        sector (str, optional): Sector tal como se ingresó (por defecto, el del registro)
+        
+    Returns:
+        ResultadoCompacto: Resultado de la fila
+    """
+    fila = resultados[i]
+    if sector is None:
+        sector = obtener_registro().sectores[fila['sector']]
+    return ResultadoCompacto(
+        nombre, sector,
+        float(fila['ratio_endeudamiento']), float(fila['rentabilidad']),
+        float(fila['productividad']), float(fila['rotacion_cartera']),
+        int(fila['estado']), int(fila['recomendaciones'])
+    )
+
+def estructurado_a_dicts(resultados, nombres=None, sectores=None):
+    """
+    Convierte un arreglo estructurado al formato de analizar_empresa, de forma perezosa.
+    
+    Args:
+        resultados (numpy.ndarray): Arreglo de analizar_lote_compacto
+        nombres (sequence, optional): Nombres de las empresas
+        sectores (sequence, optional): Sectores tal como se ingresaron
+        
+    Yields:
+        dict: Resultados de cada empresa (sin 'nlp_ejemplo')
+    """
+    registro = obtener_registro()
+    for i in range(len(resultados)):
+        compacto = estructurado_a_compacto(
+            resultados, i,
+            nombres[i] if nombres is not None else None,
+            sectores[i] if sectores is not None else None
+        )
+        yield compacto.a_dict(registro)
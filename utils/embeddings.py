@@ -0,0 +1,215 @@
+"""
+Embeddings de texto de dimensión fija y su almacén en disco.
+
+Los embeddings se calculan con el truco de hashing: cada palabra (en minúsculas y
+sin tildes) se asigna a una de DIMENSION_EMBEDDING columnas, así que no hay
+vocabulario que ajustar ni guardar y todos los vectores son comparables entre
+sí. Los vectores son dispersos y de norma L2 unitaria: la similitud coseno es
+un producto punto.
+
+AlmacenEmbeddings guarda los vectores de muchos textos (p. ej. toda la cartera de
+clientes) con sus identificadores en un único archivo .npz comprimido.
+"""
+import numbers
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from .nlp_utils import plegar_acentos
+
+# Número de columnas del embedding (no se puede cambiar sin recalcular los almacenes)
+DIMENSION_EMBEDDING = 2 ** 18
+
+def _preprocesar(texto):
+    return plegar_acentos(texto.lower())
+
+def _vectorizador(dimension):
+    return HashingVectorizer(
+        n_features=dimension,
+        preprocessor=_preprocesar,
+        alternate_sign=False,
+        norm='l2'
+    )
+
+_VECTORIZADOR = _vectorizador(DIMENSION_EMBEDDING)
+
+def crear_embeddings_lote(textos):
+    """
+    Crea los embeddings de dimensión fija de una secuencia de textos.
+    
+    Args:
+        textos (iterable): Textos
+        
+    Returns:
+        scipy.sparse.csr_matrix: Matriz (textos x DIMENSION_EMBEDDING) con filas de norma 1
+    """
+    return _VECTORIZADOR.transform(textos)
+
+def crear_embedding_fijo(texto):
+    """
+    Crea el embedding de dimensión fija de un texto.
+    
+    Args:
+        texto (str): Texto
+        
+    Returns:
+        scipy.sparse.csr_matrix: Vector fila (1 x DIMENSION_EMBEDDING) de norma 1
+    """
+    return crear_embeddings_lote([texto])
+
+def _tipo_identificador(identificador):
+    if isinstance(identificador, str):
+        return str
+    if isinstance(identificador, numbers.Integral) and not isinstance(identificador, bool):
+        return int
+    raise TypeError(f"Los identificadores deben ser str o int; se recibió {type(identificador).__name__}.")
+
+class AlmacenEmbeddings:
+    """
+    Embeddings de muchos textos con sus identificadores.
+    
+    Los identificadores de un almacén son todos str o todos int, para que se
+    guarden con un dtype explícito y sean los mismos al cargarlo. Las inserciones
+    se acumulan en bloques y se apilan en una sola matriz CSR la siguiente vez
+    que se consulta el almacén.
+    """
+    
+    def __init__(self, dimension=DIMENSION_EMBEDDING):
+        self.dimension = dimension
+        self._vectorizador = _VECTORIZADOR if dimension == DIMENSION_EMBEDDING else _vectorizador(dimension)
+        self._ids = []
+        self._tipo_ids = None
+        self._posiciones = {}
+        self._matriz = sparse.csr_matrix((0, dimension))
+        self._pendientes = []
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    @property
+    def ids(self):
+        """list: Identificadores en el orden de las filas de la matriz."""
+        return list(self._ids)
+    
+    @property
+    def matriz(self):
+        """scipy.sparse.csr_matrix: Embeddings de todos los textos, una fila por identificador."""
+        if self._pendientes:
+            self._matriz = sparse.vstack([self._matriz] + self._pendientes, format='csr')
+            self._pendientes = []
+        return self._matriz
+    
+    def agregar_vectores(self, ids, vectores):
+        """
+        Agrega embeddings ya calculados.
+        
+        Args:
+            ids (sequence): Identificador de cada fila (str o int, únicos en el almacén)
+            vectores (scipy.sparse matrix): Embeddings, una fila por identificador
+            
+        Raises:
+            TypeError: Si algún identificador no es str ni int
+            ValueError: Si hay identificadores repetidos, o de tipo distinto al
+                del resto del almacén
+        """
+        ids = list(ids)
+        if vectores.shape != (len(ids), self.dimension):
+            raise ValueError(
+                f"Se esperaban {len(ids)} vectores de dimensión {self.dimension}; se recibió {vectores.shape}."
+            )
+        tipos = {_tipo_identificador(identificador) for identificador in ids}
+        if self._tipo_ids is not None:
+            tipos.add(self._tipo_ids)
+        if len(tipos) > 1:
+            raise ValueError("Los identificadores de un almacén deben ser todos str o todos int.")
+        if int in tipos:
+            # Enteros de numpy como int de Python, igual que al cargar el almacén
+            ids = [int(identificador) for identificador in ids]
+        repetidos = [i for i in ids if i in self._posiciones]
+        if repetidos or len(set(ids)) != len(ids):
+            raise ValueError(f"Identificadores repetidos: {repetidos[:5] or 'dentro del lote'}.")
+        for identificador in ids:
+            self._posiciones[identificador] = len(self._ids)
+            self._ids.append(identificador)
+        if ids:
+            self._tipo_ids = tipos.pop()
+            self._pendientes.append(sparse.csr_matrix(vectores))
+    
+    def agregar(self, ids, textos):
+        """
+        Calcula y agrega los embeddings de una secuencia de textos.
+        
+        Args:
+            ids (sequence): Identificador de cada texto
+            textos (sequence): Textos, en el mismo orden que ids
+        """
+        self.agregar_vectores(ids, self._vectorizador.transform(textos))
+    
+    def vector(self, identificador):
+        """
+        Devuelve el embedding guardado de un identificador.
+        
+        Args:
+            identificador: Identificador del texto
+            
+        Returns:
+            scipy.sparse.csr_matrix: Vector fila del embedding
+        """
+        return self.matriz[self._posiciones[identificador]]
+    
+    def similares(self, texto, k=5):
+        """
+        Busca los textos guardados más similares a un texto.
+        
+        Args:
+            texto (str): Texto de consulta
+            k (int): Número de resultados
+            
+        Returns:
+            list: Tuplas (identificador, similitud coseno), de mayor a menor similitud
+        """
+        similitudes = (self.matriz @ self._vectorizador.transform([texto]).T).toarray().ravel()
+        k = min(k, len(similitudes))
+        if k <= 0:
+            return []
+        mejores = np.argpartition(-similitudes, k - 1)[:k]
+        mejores = mejores[np.argsort(-similitudes[mejores], kind='stable')]
+        return [(self._ids[i], float(similitudes[i])) for i in mejores]
+    
+    def guardar(self, ruta):
+        """
+        Guarda el almacén en un archivo .npz comprimido.
+        
+        Args:
+            ruta (str): Ruta del archivo
+        """
+        matriz = self.matriz
+        np.savez_compressed(
+            ruta,
+            ids=np.array(self._ids, dtype=np.int64 if self._tipo_ids is int else np.str_),
+            datos=matriz.data.astype(np.float32),
+            indices=matriz.indices,
+            punteros=matriz.indptr,
+            forma=np.array(matriz.shape)
+        )
+
+def cargar_almacen(ruta):
+    """
+    Carga un almacén de embeddings guardado con AlmacenEmbeddings.guardar.
+    
+    Args:
+        ruta (str): Ruta del archivo .npz
+        
+    Returns:
+        AlmacenEmbeddings: Almacén cargado
+    """
+    with np.load(ruta, allow_pickle=False) as archivo:
+        filas, dimension = (int(n) for n in archivo['forma'])
+        almacen = AlmacenEmbeddings(dimension)
+        matriz = sparse.csr_matrix(
+            (archivo['datos'].astype(float), archivo['indices'], archivo['punteros']),
+            shape=(filas, dimension)
+        )
+        almacen.agregar_vectores(archivo['ids'].tolist(), matriz)
+    return almacen
@@ -0,0 +1,205 @@
+"""
+Pruebas de estrés de una empresa con escenarios aleatorios o en rejilla.
+
+Cada escenario aplica choques relativos (p. ej. -0.2 = caída del 20 %) a los datos
+de la empresa. Todos los escenarios se evalúan a la vez con el cálculo vectorizado
+de analizar_empresas_lote, sin iterar en Python.
+"""
+import numpy as np
+import pandas as pd
+
+from .analysis import _calcular_lote, _estado_general, _estados_por_puntos
+from .sectores import obtener_registro
+
+# Datos de la empresa a los que se pueden aplicar choques
+VARIABLES_ESCENARIO = ('ganancias', 'activos', 'deudas', 'cartera', 'empleados')
+
+# Desviación estándar por defecto de los choques aleatorios
+VOLATILIDAD_DEFECTO = {
+    'ganancias': 0.20,
+    'activos': 0.10,
+    'deudas': 0.10,
+    'cartera': 0.15,
+    'empleados': 0.05
+}
+
+# Percentiles de la distribución de cada indicador
+PERCENTILES_DEFECTO = (5, 25, 50, 75, 95)
+
+def _validar_variables(variables):
+    desconocidas = set(variables) - set(VARIABLES_ESCENARIO)
+    if desconocidas:
+        raise ValueError(f"Variables de escenario desconocidas: {', '.join(sorted(desconocidas))}.")
+
+def choques_aleatorios(num_escenarios=10000, volatilidad=None, tendencia=None, semilla=None):
+    """
+    Genera choques relativos con distribución normal para cada variable.
+    
+    Args:
+        num_escenarios (int): Número de escenarios
+        volatilidad (dict, optional): Desviación estándar por variable (por defecto,
+            VOLATILIDAD_DEFECTO; las variables omitidas no cambian)
+        tendencia (dict, optional): Choque medio por variable (p. ej. {'ganancias': -0.2})
+        semilla (int, optional): Semilla del generador aleatorio
+        
+    Returns:
+        dict: Arreglo de choques por variable
+    """
+    volatilidad = VOLATILIDAD_DEFECTO if volatilidad is None else volatilidad
+    tendencia = tendencia or {}
+    _validar_variables(volatilidad)
+    _validar_variables(tendencia)
+    
+    generador = np.random.default_rng(semilla)
+    choques = {}
+    for variable in VARIABLES_ESCENARIO:
+        sigma = volatilidad.get(variable, 0.0)
+        media = tendencia.get(variable, 0.0)
+        if sigma:
+            choques[variable] = generador.normal(media, sigma, num_escenarios)
+        elif media:
+            choques[variable] = np.full(num_escenarios, float(media))
+    return choques
+
+def choques_rejilla(**rangos):
+    """
+    Genera todas las combinaciones de choques dados por variable.
+    
+    Ejemplo: choques_rejilla(ganancias=[-0.3, -0.2, -0.1, 0], deudas=[0, 0.1])
+    produce 8 escenarios.
+    
+    Args:
+        **rangos: Secuencia de choques relativos por variable
+        
+    Returns:
+        dict: Arreglo de choques por variable
+    """
+    _validar_variables(rangos)
+    if not rangos:
+        return {}
+    mallas = np.meshgrid(*(np.asarray(valores, dtype=float) for valores in rangos.values()), indexing='ij')
+    return {variable: malla.ravel() for variable, malla in zip(rangos, mallas)}
+
+def aplicar_choques(datos, choques):
+    """
+    Aplica choques relativos a los datos de una empresa.
+    
+    Los activos, deudas, cartera y empleados no bajan de cero; las ganancias sí
+    pueden volverse negativas. Los empleados del escenario se redondean al
+    entero más cercano (los empates, al par): si se truncaran, un choque
+    negativo quitaría un empleado completo (10 empleados con -5 % serían 9) y
+    uno positivo igual de grande no cambiaría nada, lo que sesgaría la
+    productividad hacia arriba.
+    
+    Args:
+        datos (dict): Datos de la empresa
+        choques (dict): Choque relativo por variable (escalar o arreglo)
+        
+    Returns:
+        dict: Arreglo de cada variable en todos los escenarios
+    """
+    _validar_variables(choques)
+    factores = np.broadcast_arrays(*(1.0 + np.asarray(choques.get(variable, 0.0), dtype=float)
+                                     for variable in VARIABLES_ESCENARIO))
+    valores = {}
+    for variable, factor in zip(VARIABLES_ESCENARIO, factores):
+        base = float(int(datos[variable])) if variable == 'empleados' else float(datos[variable])
+        valor = base * np.atleast_1d(factor)
+        if variable == 'empleados':
+            valor = np.rint(valor)
+        valores[variable] = valor if variable == 'ganancias' else np.maximum(valor, 0.0)
+    return valores
+
+def _evaluar_escenarios(datos, choques, registro):
+    valores = aplicar_choques(datos, choques)
+    num_escenarios = len(valores['ganancias'])
+    return _calcular_lote(
+        valores['ganancias'], valores['activos'], valores['deudas'],
+        valores['cartera'], valores['empleados'],
+        np.full(num_escenarios, registro.codigo(str(datos['sector'])), dtype=np.intp),
+        registro
+    )
+
+def simular_escenarios(datos, choques, percentiles=PERCENTILES_DEFECTO):
+    """
+    Evalúa una empresa bajo todos los escenarios de choques a la vez.
+    
+    Args:
+        datos (dict): Datos de la empresa (como en analizar_empresa)
+        choques (dict): Choques por variable (de choques_aleatorios, choques_rejilla
+            o escalares para un solo escenario)
+        percentiles (sequence): Percentiles de la distribución de cada indicador
+        
+    Returns:
+        dict: 'escenarios' (número), 'indicadores' (arreglo por indicador),
+            'distribucion' (DataFrame con media y percentiles por indicador),
+            'prob_cumple' (probabilidad de cumplir cada límite del sector) y
+            'probabilidades' (probabilidad de cada estado_general)
+    """
+    registro = obtener_registro()
+    lote = _evaluar_escenarios(datos, choques, registro)
+    num_escenarios = len(lote['puntos'])
+    
+    num_reglas = len(registro.reglas)
+    frecuencias = np.bincount(lote['puntos'], minlength=num_reglas + 1) / num_escenarios
+    probabilidades = {estado: 0.0 for estado in ("Excelente", "Bueno", "Regular", "Crítico")}
+    for puntos, frecuencia in enumerate(frecuencias):
+        probabilidades[_estado_general(puntos)] += float(frecuencia)
+    
+    distribucion = {}
+    for indicador, arreglo in lote['indicadores'].items():
+        finitos = arreglo[np.isfinite(arreglo)]
+        fila = {'media': finitos.mean() if len(finitos) else np.nan,
+                'no_finitos': 1.0 - len(finitos) / num_escenarios}
+        # 'inverted_cdf' devuelve valores observados, sin interpolar con infinitos
+        cuantiles = np.percentile(arreglo, percentiles, method='inverted_cdf')
+        fila.update({f'p{p:g}': valor for p, valor in zip(percentiles, cuantiles)})
+        distribucion[indicador] = fila
+    
+    return {
+        'escenarios': num_escenarios,
+        'indicadores': lote['indicadores'],
+        'distribucion': pd.DataFrame.from_dict(distribucion, orient='index'),
+        'prob_cumple': dict(zip(registro.indicadores, lote['cumple'].mean(axis=0).tolist())),
+        'probabilidades': probabilidades
+    }
+
+def estresar_empresa(datos, num_escenarios=100000, volatilidad=None, tendencia=None, semilla=None):
+    """
+    Prueba de estrés Monte Carlo de una empresa con choques normales.
+    
+    Args:
+        datos (dict): Datos de la empresa
+        num_escenarios (int): Número de escenarios
+        volatilidad (dict, optional): Desviación estándar por variable
+        tendencia (dict, optional): Choque medio por variable
+        semilla (int, optional): Semilla del generador aleatorio
+        
+    Returns:
+        dict: Resultado de simular_escenarios
+    """
+    choques = choques_aleatorios(num_escenarios, volatilidad, tendencia, semilla)
+    return simular_escenarios(datos, choques)
+
+def escenarios_rejilla_a_dataframe(datos, **rangos):
+    """
+    Evalúa una rejilla de choques y devuelve una fila por escenario.
+    
+    Útil para preguntas como "¿qué pasa si mis ingresos bajan 20 % y mi deuda
+    sube 10 %?" con pocas combinaciones.
+    
+    Args:
+        datos (dict): Datos de la empresa
+        **rangos: Secuencia de choques relativos por variable
+        
+    Returns:
+        pandas.DataFrame: Choques, indicadores y estado_general de cada escenario
+    """
+    choques = choques_rejilla(**rangos)
+    registro = obtener_registro()
+    lote = _evaluar_escenarios(datos, choques, registro)
+    num_escenarios = len(lote['puntos'])
+    columnas = {f'choque_{variable}': np.broadcast_to(choque, num_escenarios) for variable, choque in choques.items()}
+    columnas.update(lote['indicadores'])
+    columnas['estado_general'] = _estados_por_puntos(len(registro.reglas))[lote['puntos']]
+    return pd.DataFrame(columnas)
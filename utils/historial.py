@@ -0,0 +1,301 @@
+"""
+Historial de análisis por periodo (p. ej. trimestral) de cada empresa.
+
+Cada periodo nuevo actualiza de forma incremental, en O(1) por empresa, las
+medias móviles, las pendientes de tendencia, las variaciones respecto al periodo
+anterior y las rachas de estado 'Crítico', sin recorrer el historial completo.
+"""
+import math
+from collections import deque
+
+import pandas as pd
+
+from .analysis import analizar_empresa, analizar_empresas_lote
+
+# Indicadores que se siguen en el historial
+INDICADORES_HISTORIAL = ('ratio_endeudamiento', 'rentabilidad', 'productividad', 'rotacion_cartera')
+
+# Cada cuántas actualizaciones se recalculan las sumas para evitar errores acumulados
+_RESINCRONIZAR_CADA = 1024
+
+class _VentanaMovil:
+    """
+    Ventana deslizante con suma y suma ponderada por posición actualizadas en O(1).
+    
+    Los valores no finitos (p. ej. inf en divisiones por cero) se guardan pero no
+    entran en las sumas; mientras haya alguno en la ventana, la media es inf (o nan)
+    y la pendiente es nan.
+    """
+    
+    __slots__ = ('tamano', 'valores', 'suma', 'suma_xy', 'no_finitos', 'actualizaciones')
+    
+    def __init__(self, tamano):
+        self.tamano = tamano
+        self.valores = deque()
+        self.suma = 0.0
+        self.suma_xy = 0.0  # sum(i * y_i), con i = posición en la ventana
+        self.no_finitos = 0
+        self.actualizaciones = 0
+    
+    def agregar(self, valor):
+        if len(self.valores) == self.tamano:
+            saliente = self.valores.popleft()
+            finito = saliente if math.isfinite(saliente) else 0.0
+            self.no_finitos -= not math.isfinite(saliente)
+            # Al desplazar la ventana cada posición baja en uno
+            self.suma_xy -= self.suma - finito
+            self.suma -= finito
+        
+        posicion = len(self.valores)
+        self.valores.append(valor)
+        if math.isfinite(valor):
+            self.suma += valor
+            self.suma_xy += posicion * valor
+        else:
+            self.no_finitos += 1
+        
+        self.actualizaciones += 1
+        if self.actualizaciones % _RESINCRONIZAR_CADA == 0:
+            self._resincronizar()
+    
+    def _resincronizar(self):
+        finitos = [(i, v) for i, v in enumerate(self.valores) if math.isfinite(v)]
+        self.suma = math.fsum(v for _, v in finitos)
+        self.suma_xy = math.fsum(i * v for i, v in finitos)
+    
+    def media(self):
+        if not self.valores:
+            return float('nan')
+        if self.no_finitos:
+            no_finitos = [v for v in self.valores if not math.isfinite(v)]
+            return sum(no_finitos)
+        return self.suma / len(self.valores)
+    
+    def pendiente(self):
+        n = len(self.valores)
+        if n < 2 or self.no_finitos:
+            return float('nan')
+        suma_x = n * (n - 1) / 2
+        suma_xx = (n - 1) * n * (2 * n - 1) / 6
+        return (n * self.suma_xy - suma_x * self.suma) / (n * suma_xx - suma_x ** 2)
+
+class HistorialEmpresa:
+    """
+    Agregados móviles del historial de una empresa.
+    
+    Guarda solo la ventana de los últimos periodos, no el historial completo.
+    """
+    
+    __slots__ = ('ventana', 'periodos', 'ultimo_periodo', 'ultimo', 'anterior',
+                 'estado', '_ventanas', 'racha_critico', 'racha_critico_max')
+    
+    def __init__(self, ventana=4):
+        if ventana < 1:
+            raise ValueError("La ventana debe tener al menos un periodo.")
+        self.ventana = ventana
+        self.periodos = 0
+        self.ultimo_periodo = None
+        self.ultimo = None
+        self.anterior = None
+        self.estado = None
+        self._ventanas = {indicador: _VentanaMovil(ventana) for indicador in INDICADORES_HISTORIAL}
+        self.racha_critico = 0
+        self.racha_critico_max = 0
+    
+    def validar_periodo(self, periodo):
+        """
+        Comprueba que un periodo pueda agregarse, sin modificar el historial.
+        
+        Args:
+            periodo: Identificador ordenable del periodo
+            
+        Raises:
+            ValueError: Si el periodo no es posterior al último registrado
+        """
+        if self.ultimo_periodo is not None and not periodo > self.ultimo_periodo:
+            raise ValueError(
+                f"El periodo {periodo!r} no es posterior al último registrado ({self.ultimo_periodo!r})."
+            )
+    
+    def agregar(self, periodo, indicadores, estado_general):
+        """
+        Incorpora un periodo nuevo al historial.
+        
+        Args:
+            periodo: Identificador ordenable del periodo (p. ej. '2024Q1')
+            indicadores (dict): Indicadores del periodo (como en analizar_empresa)
+            estado_general (str): Estado general del periodo
+        """
+        self.validar_periodo(periodo)
+        
+        valores = {indicador: float(indicadores[indicador]) for indicador in INDICADORES_HISTORIAL}
+        for indicador, valor in valores.items():
+            self._ventanas[indicador].agregar(valor)
+        
+        self.anterior = self.ultimo
+        self.ultimo = valores
+        self.ultimo_periodo = periodo
+        self.estado = estado_general
+        self.periodos += 1
+        
+        if estado_general == "Crítico":
+            self.racha_critico += 1
+            self.racha_critico_max = max(self.racha_critico_max, self.racha_critico)
+        else:
+            self.racha_critico = 0
+    
+    def media_movil(self, indicador):
+        """
+        Devuelve la media del indicador en la ventana de periodos.
+        
+        Args:
+            indicador (str): Clave del indicador
+            
+        Returns:
+            float: Media móvil
+        """
+        return self._ventanas[indicador].media()
+    
+    def tendencia(self, indicador):
+        """
+        Devuelve la pendiente (variación por periodo) del indicador en la ventana.
+        
+        Args:
+            indicador (str): Clave del indicador
+            
+        Returns:
+            float: Pendiente de la recta de mínimos cuadrados (nan con menos de 2 periodos)
+        """
+        return self._ventanas[indicador].pendiente()
+    
+    def variacion(self, indicador):
+        """
+        Devuelve el cambio del indicador respecto al periodo anterior.
+        
+        Args:
+            indicador (str): Clave del indicador
+            
+        Returns:
+            float: Último valor menos el anterior (nan si no hay periodo anterior)
+        """
+        if self.anterior is None:
+            return float('nan')
+        return self.ultimo[indicador] - self.anterior[indicador]
+    
+    def resumen(self):
+        """
+        Devuelve los agregados actuales en un diccionario plano.
+        
+        Returns:
+            dict: Periodo, estado, rachas y, por indicador, valor, media móvil,
+                variación y tendencia
+        """
+        resumen = {
+            'periodo': self.ultimo_periodo,
+            'periodos': self.periodos,
+            'estado_general': self.estado,
+            'racha_critico': self.racha_critico,
+            'racha_critico_max': self.racha_critico_max
+        }
+        for indicador in INDICADORES_HISTORIAL:
+            resumen[indicador] = self.ultimo[indicador] if self.ultimo else float('nan')
+            resumen[f'{indicador}_media'] = self.media_movil(indicador)
+            resumen[f'{indicador}_variacion'] = self.variacion(indicador)
+            resumen[f'{indicador}_tendencia'] = self.tendencia(indicador)
+        return resumen
+
+class HistorialCartera:
+    """
+    Historial de todas las empresas de un portafolio, indexado por identificador.
+    """
+    
+    def __init__(self, ventana=4):
+        self.ventana = ventana
+        self.empresas = {}
+    
+    def _historial(self, id_empresa):
+        historial = self.empresas.get(id_empresa)
+        if historial is None:
+            historial = self.empresas[id_empresa] = HistorialEmpresa(self.ventana)
+        return historial
+    
+    def agregar_periodo(self, id_empresa, periodo, datos):
+        """
+        Analiza una empresa en un periodo y actualiza su historial.
+        
+        Args:
+            id_empresa: Identificador de la empresa
+            periodo: Identificador ordenable del periodo
+            datos (dict): Datos de la empresa para analizar_empresa
+            
+        Returns:
+            dict: Resumen actualizado de la empresa
+        """
+        resultados = analizar_empresa(datos, modo_nlp=None)
+        historial = self._historial(id_empresa)
+        historial.agregar(periodo, resultados['indicadores'], resultados['estado_general'])
+        return historial.resumen()
+    
+    def agregar_periodo_lote(self, periodo, datos, columna_id='id'):
+        """
+        Analiza un portafolio completo en un periodo y actualiza cada historial.
+        
+        Todo el lote se valida antes de modificar algún historial: si falla, el
+        portafolio queda como estaba.
+        
+        Args:
+            periodo: Identificador ordenable del periodo
+            datos (pandas.DataFrame): Datos de las empresas con una columna de identificador
+            columna_id (str): Nombre de la columna de identificador
+            
+        Returns:
+            int: Número de empresas actualizadas
+            
+        Raises:
+            ValueError: Si hay identificadores repetidos en el lote o el periodo no
+                es posterior al último de alguna de las empresas
+        """
+        ids = datos[columna_id].to_numpy()
+        repetidos = pd.unique(ids[pd.Series(ids).duplicated().to_numpy()])
+        if len(repetidos):
+            raise ValueError(f"Identificadores repetidos en el lote: {', '.join(map(repr, repetidos[:5]))}.")
+        for id_empresa in ids:
+            historial = self.empresas.get(id_empresa)
+            if historial is None:
+                continue
+            try:
+                historial.validar_periodo(periodo)
+            except ValueError as error:
+                raise ValueError(f"Empresa {id_empresa!r}: {error}") from None
+        
+        resultados = analizar_empresas_lote(datos)
+        columnas = [resultados[indicador].to_numpy() for indicador in INDICADORES_HISTORIAL]
+        estados = resultados['estado_general'].to_numpy()
+        for i, id_empresa in enumerate(ids):
+            indicadores = {indicador: columna[i] for indicador, columna in zip(INDICADORES_HISTORIAL, columnas)}
+            self._historial(id_empresa).agregar(periodo, indicadores, estados[i])
+        return len(ids)
+    
+    def resumen(self, id_empresa):
+        """
+        Devuelve el resumen de una empresa.
+        
+        Args:
+            id_empresa: Identificador de la empresa
+            
+        Returns:
+            dict: Resumen de HistorialEmpresa.resumen
+        """
+        return self.empresas[id_empresa].resumen()
+    
+    def a_dataframe(self):
+        """
+        Devuelve el resumen de todas las empresas.
+        
+        Returns:
+            pandas.DataFrame: Una fila por empresa, indexada por identificador
+        """
+        return pd.DataFrame.from_dict(
+            {id_empresa: historial.resumen() for id_empresa, historial in self.empresas.items()},
+            orient='index'
+        )
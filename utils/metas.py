@@ -0,0 +1,231 @@
+"""
+Metas mínimas para que cada indicador cumpla el límite de su sector.
+
+Para cada indicador que no cumple se calcula, por cada dato de entrada del que
+depende, el valor más cercano al actual con el que el indicador cruza el límite
+(p. ej. cuánta deuda hay que pagar para que el endeudamiento sea 'bueno'). Se usa
+la fórmula cerrada cuando existe; en los casos límite (divisiones por cero) o si
+la fórmula no alcanza el límite por redondeo, se recurre a una bisección
+vectorizada sobre todo el portafolio a la vez.
+"""
+import numpy as np
+import pandas as pd
+
+from .analysis import _calcular_indicadores_lote
+from .sectores import obtener_registro
+
+# Datos de entrada de los que depende cada indicador
+DEPENDENCIAS = {
+    'ratio_endeudamiento': ('deudas', 'activos'),
+    'rentabilidad': ('ganancias', 'activos'),
+    'productividad': ('ganancias', 'empleados'),
+    'rotacion_cartera': ('cartera', 'ganancias')
+}
+
+# Nombre de cada dato para los textos de recomendación
+NOMBRES_VARIABLES = {
+    'ganancias': "las ganancias anuales",
+    'activos': "los activos",
+    'deudas': "las deudas",
+    'cartera': "la cartera",
+    'empleados': "el número de empleados"
+}
+
+def _con_divisor(condicion, numerador, denominador):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(condicion, numerador / denominador, np.nan)
+
+# Valor de la variable con el que el indicador queda justo en el límite (nan si no hay fórmula)
+_FORMULAS_CERRADAS = {
+    ('ratio_endeudamiento', 'deudas'): lambda v, L: np.where(v['activos'] > 0, L * v['activos'], np.nan),
+    ('ratio_endeudamiento', 'activos'): lambda v, L: _con_divisor((L > 0) & (v['deudas'] > 0), v['deudas'], L),
+    ('rentabilidad', 'ganancias'): lambda v, L: np.where(v['activos'] > 0, L * v['activos'], np.nan),
+    ('rentabilidad', 'activos'): lambda v, L: _con_divisor(
+        (L > 0) & (v['ganancias'] > 0) & (v['activos'] > 0), v['ganancias'], L
+    ),
+    ('productividad', 'ganancias'): lambda v, L: np.where(v['empleados'] >= 1, L * v['empleados'], np.nan),
+    # Sin empleados la productividad es 0 y basta con uno; si no, el máximo que cumple
+    ('productividad', 'empleados'): lambda v, L: np.where(
+        v['empleados'] >= 1,
+        np.floor(_con_divisor((L > 0) & (v['ganancias'] >= L), v['ganancias'], L)),
+        np.where(v['ganancias'] >= L, 1.0, np.nan)
+    ),
+    ('rotacion_cartera', 'cartera'): lambda v, L: np.where((v['ganancias'] > 0) & (L >= 0), L * v['ganancias'] / 365, np.nan),
+    ('rotacion_cartera', 'ganancias'): lambda v, L: _con_divisor((L > 0) & (v['cartera'] > 0), 365 * v['cartera'], L)
+}
+
+def _cumple(valores, variable, nuevo, regla, limites):
+    modificados = dict(valores)
+    modificados[variable] = nuevo
+    indicador = _calcular_indicadores_lote(**modificados)[regla['valor']]
+    return indicador <= limites if regla['sentido'] == 'max' else indicador >= limites
+
+def _biseccion(valores, variable, regla, limites, iteraciones=64):
+    """
+    Busca, para todas las filas a la vez, el valor más cercano al actual que cumple.
+    
+    Prueba en ambas direcciones hasta un extremo amplio y, si el extremo cumple,
+    acota el cruce por bisección (se supone que el indicador es monótono en la
+    variable). Devuelve nan donde ninguna dirección cumple.
+    """
+    actual = valores[variable]
+    escala = np.maximum(np.abs(actual), 1.0)
+    mejor = np.full(len(actual), np.nan)
+    for direccion in (1.0, -1.0):
+        extremo = actual + direccion * escala * 1e6
+        if variable != 'ganancias':
+            extremo = np.maximum(extremo, 0.0)
+        alcanzable = _cumple(valores, variable, extremo, regla, limites)
+        bajo, alto = actual.copy(), extremo
+        for _ in range(iteraciones):
+            medio = (bajo + alto) / 2
+            cumple = _cumple(valores, variable, medio, regla, limites)
+            alto = np.where(cumple, medio, alto)
+            bajo = np.where(cumple, bajo, medio)
+        if variable == 'empleados':
+            # El análisis trunca los empleados, así que el valor truncado da el mismo indicador
+            alto = np.trunc(alto)
+        candidato = np.where(alcanzable, alto, np.nan)
+        reemplazar = ~np.isnan(candidato) & (np.isnan(mejor) | (np.abs(candidato - actual) < np.abs(mejor - actual)))
+        mejor = np.where(reemplazar, candidato, mejor)
+    return mejor
+
+def _resolver(valores, variable, regla, limites):
+    formula = _FORMULAS_CERRADAS.get((regla['valor'], variable))
+    objetivo = np.full(len(limites), np.nan) if formula is None else formula(valores, limites)
+    metodo = np.full(len(limites), 'cerrada', dtype=object)
+    
+    # Si el redondeo deja el indicador justo del otro lado del límite, se avanza un
+    # ulp, hasta 4 veces; la última pasada solo comprueba, para que fallan refleje
+    # el objetivo final
+    for intento in range(5):
+        revisar = ~np.isnan(objetivo)
+        fallan = np.zeros(len(objetivo), dtype=bool)
+        fallan[revisar] = ~_cumple(
+            {clave: arreglo[revisar] for clave, arreglo in valores.items()},
+            variable, objetivo[revisar], regla, limites[revisar]
+        )
+        if not fallan.any() or intento == 4:
+            break
+        alejarse = 2 * objetivo[fallan] - valores[variable][fallan]
+        objetivo[fallan] = np.nextafter(objetivo[fallan], alejarse)
+    
+    # Casos sin fórmula (divisiones por cero) o que siguen sin cumplir
+    pendientes = np.isnan(objetivo) | fallan
+    if pendientes.any():
+        objetivo[pendientes] = _biseccion(
+            {clave: arreglo[pendientes] for clave, arreglo in valores.items()},
+            variable, regla, limites[pendientes]
+        )
+        metodo[pendientes] = 'biseccion'
+    return objetivo, metodo
+
+def calcular_metas_lote(datos):
+    """
+    Calcula las metas de todos los indicadores que no cumplen en un portafolio.
+    
+    Args:
+        datos (pandas.DataFrame | dict): Columnas 'ganancias', 'activos', 'deudas',
+            'cartera', 'empleados' y 'sector' (ver analizar_empresas_lote)
+            
+    Returns:
+        pandas.DataFrame: Una fila por empresa, indicador que no cumple y variable,
+            con 'fila' (índice de la entrada), 'indicador', 'variable', 'actual',
+            'objetivo', 'cambio', 'cambio_relativo' y 'metodo'. 'objetivo' es nan
+            si la variable no basta por sí sola para cumplir.
+    """
+    if not isinstance(datos, pd.DataFrame):
+        datos = pd.DataFrame(datos)
+    
+    registro = obtener_registro()
+    valores = {variable: datos[variable].to_numpy(dtype=float) for variable in NOMBRES_VARIABLES}
+    valores['empleados'] = np.trunc(valores['empleados'])
+    codigos = registro.codigos_lote(datos['sector'].to_numpy())
+    indicadores = _calcular_indicadores_lote(**valores)
+    cumple = registro.cumple_lote(codigos, indicadores)
+    
+    partes = []
+    for i, regla in enumerate(registro.reglas):
+        filas = np.flatnonzero(~cumple[:, i])
+        if len(filas) == 0:
+            continue
+        limites = registro.limites[codigos[filas], i]
+        subconjunto = {variable: arreglo[filas] for variable, arreglo in valores.items()}
+        for variable in DEPENDENCIAS[regla['valor']]:
+            objetivo, metodo = _resolver(subconjunto, variable, regla, limites)
+            actual = subconjunto[variable]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                relativo = np.where(actual != 0, (objetivo - actual) / np.abs(actual), np.nan)
+            partes.append(pd.DataFrame({
+                'fila': datos.index.to_numpy()[filas],
+                'indicador': regla['indicador'],
+                'variable': variable,
+                'actual': actual,
+                'objetivo': objetivo,
+                'cambio': objetivo - actual,
+                'cambio_relativo': relativo,
+                'metodo': metodo
+            }))
+    
+    columnas = ['fila', 'indicador', 'variable', 'actual', 'objetivo', 'cambio', 'cambio_relativo', 'metodo']
+    if not partes:
+        return pd.DataFrame(columns=columnas)
+    return pd.concat(partes, ignore_index=True).sort_values(['fila', 'indicador'], kind='stable', ignore_index=True)
+
+def calcular_metas(datos):
+    """
+    Calcula las metas de una empresa.
+    
+    Args:
+        datos (dict): Datos de la empresa (como en analizar_empresa)
+        
+    Returns:
+        list: Un diccionario por indicador que no cumple y variable (ver calcular_metas_lote)
+    """
+    fila = {clave: [datos[clave]] for clave in ('sector', *NOMBRES_VARIABLES)}
+    return calcular_metas_lote(fila).drop(columns='fila').to_dict('records')
+
+def texto_meta(meta):
+    """
+    Describe una meta en lenguaje natural.
+    
+    Args:
+        meta (dict): Meta de calcular_metas
+        
+    Returns:
+        str: Texto como "reducir las deudas en $1,200,000 (-15%)", o cadena vacía
+            si la variable no basta para cumplir
+    """
+    if np.isnan(meta['objetivo']):
+        return ""
+    verbo = "aumentar" if meta['cambio'] > 0 else "reducir"
+    if meta['variable'] == 'empleados':
+        cantidad = f"{abs(meta['cambio']):,.0f}"
+    else:
+        cantidad = f"${abs(meta['cambio']):,.0f}"
+    texto = f"{verbo} {NOMBRES_VARIABLES[meta['variable']]} en {cantidad}"
+    if not np.isnan(meta['cambio_relativo']):
+        texto += f" ({meta['cambio_relativo']:+.0%})"
+    return texto
+
+def recomendaciones_con_metas(resultados, metas):
+    """
+    Complementa las recomendaciones del análisis con las metas calculadas.
+    
+    Args:
+        resultados (dict): Resultados de analizar_empresa
+        metas (list): Metas de calcular_metas para la misma empresa
+        
+    Returns:
+        list: Recomendaciones, cada una con las metas de su indicador si las hay
+    """
+    registro = obtener_registro()
+    indicador_por_recomendacion = {regla['recomendacion']: regla['indicador'] for regla in registro.reglas}
+    recomendaciones = []
+    for recomendacion in resultados['recomendaciones']:
+        indicador = indicador_por_recomendacion.get(recomendacion)
+        textos = [texto for texto in (texto_meta(meta) for meta in metas if meta['indicador'] == indicador) if texto]
+        if textos:
+            recomendacion = f"{recomendacion} Para cumplir el límite del sector: {' o '.join(textos)}."
+        recomendaciones.append(recomendacion)
+    return recomendaciones
@@ -1,19 +1,529 @@
+import importlib.util
+import json
+import os
 import re
-import nltk
-import spacy
-from nltk.tokenize import word_tokenize
-from nltk.stem import SnowballStemmer
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import threading
+from collections import OrderedDict, namedtuple
+from functools import cached_property
 import numpy as np
 
-# Descargar recursos necesarios de NLTK
-nltk.download('punkt')
-nltk.download('stopwords')
+from .trazas import instrumentar, span
 
-# Cargar el modelo de spaCy para español
-nlp = spacy.load('es_core_news_sm')
+# Modelo de spaCy para español
+MODELO_SPACY = 'es_core_news_sm'
 
+# Perfiles de carga del modelo: componentes del pipeline que se excluyen en cada uno.
+# Se ordenan de menor a mayor: un documento de un perfil sirve para los anteriores.
+PERFILES_SPACY = {
+    # Solo tokenizador: texto, is_stop, is_alpha y demás atributos léxicos
+    'tokenizador': ('tok2vec', 'tagger', 'morphologizer', 'parser', 'senter', 'attribute_ruler', 'lemmatizer', 'ner'),
+    # Lemas y etiquetas POS, sin análisis de dependencias ni entidades
+    'lemas_pos': ('parser', 'senter', 'ner'),
+    'completo': ()
+}
+_NIVEL_PERFIL = {perfil: nivel for nivel, perfil in enumerate(PERFILES_SPACY)}
+
+# Textos que nlp.pipe agrupa por lote en las funciones *_lote
+TAM_LOTE_DEFECTO = 256
+
+# Variable de entorno con el número de textos de la caché NLP compartida
+VARIABLE_TAMANO_CACHE = 'FINANZBOT_CACHE_NLP_TAMANO'
+
+# Recursos de NLTK que deben estar instalados localmente (nombre, ruta en nltk.data)
+RECURSOS_NLTK = (('punkt', 'tokenizers/punkt'),)
+
+# Variable de entorno con el backend NLP: 'spacy' (por defecto) o 'ligero'
+VARIABLE_BACKEND = 'FINANZBOT_NLP_BACKEND'
+BACKEND_DEFECTO = 'spacy'
+
+# Tabla de lemas, etiquetas POS y stopwords del backend ligero (ver generar_recursos_ligero)
+RUTA_RECURSOS_LIGERO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nlp_ligero.json')
+
+# Tokenizador del backend ligero: números con separadores y porcentaje (20%, 1.5, 2.900.000),
+# palabras y signos sueltos
+_PATRON_TOKEN_LIGERO = re.compile(r'\d+(?:[.,]\d+)*%?|\w+|[^\w\s]')
+
+# Vocales acentuadas y con diéresis -> vocal simple; la ñ se conserva
+_TABLA_ACENTOS = str.maketrans('áéíóúüàèìòùÁÉÍÓÚÜÀÈÌÒÙ', 'aeiouuaeiouAEIOUUAEIOU')
+
+# Normalización: signos y dígitos se borran en una pasada (equivale a quitar [^\w\s] y
+# luego \d+, porque ambas solo borran caracteres); los espacios se colapsan con
+# str.split, que usa la misma definición de espacio que \s
+_PATRON_SIGNOS_DIGITOS = re.compile(r'[^\w\s]|\d')
+
+_modelos = {}
+_perfiles_declarados = set()
+_lock_nlp = threading.Lock()
+
+def verificar_recursos():
+    """
+    Comprueba que los recursos del backend NLP configurado estén instalados
+    localmente, sin descargar nada.
+    
+    Raises:
+        RuntimeError: Si falta algún recurso (de NLTK, el modelo de spaCy o la
+            tabla del backend ligero), con el comando para instalarlo
+    """
+    obtener_backend().verificar_recursos()
+
+def _validar_perfil(perfil):
+    if perfil not in PERFILES_SPACY:
+        raise ValueError(f"Perfil de spaCy no soportado: {perfil}. Usa uno de: {', '.join(PERFILES_SPACY)}.")
+
+def obtener_nlp(perfil='completo'):
+    """
+    Devuelve el modelo de spaCy de un perfil, cargándolo la primera vez que se pide.
+    
+    Args:
+        perfil (str): Perfil de PERFILES_SPACY
+        
+    Returns:
+        spacy.language.Language: Modelo de spaCy para español
+    """
+    modelo = _modelos.get(perfil)
+    if modelo is None:
+        _validar_perfil(perfil)
+        with _lock_nlp:
+            modelo = _modelos.get(perfil)
+            if modelo is None:
+                import spacy
+                
+                with span('spacy_load', modelo=MODELO_SPACY, perfil=perfil):
+                    modelo = spacy.load(MODELO_SPACY, exclude=list(PERFILES_SPACY[perfil]))
+                _modelos[perfil] = modelo
+    return modelo
+
+def requiere_perfil(perfil):
+    """
+    Decorador que declara el perfil de spaCy que necesita una función.
+    
+    El perfil queda en el atributo perfil_spacy de la función y precargar()
+    carga los perfiles declarados.
+    
+    Args:
+        perfil (str): Perfil de PERFILES_SPACY
+        
+    Returns:
+        callable: Decorador
+    """
+    _validar_perfil(perfil)
+    
+    def decorador(funcion):
+        funcion.perfil_spacy = perfil
+        _perfiles_declarados.add(perfil)
+        return funcion
+    return decorador
+
+def precargar(perfiles=None):
+    """
+    Verifica los recursos y carga los modelos por adelantado.
+    
+    Pensado para servidores y procesos trabajadores que prefieren pagar el costo
+    de carga al arrancar y no en la primera petición.
+    
+    Args:
+        perfiles (iterable, optional): Perfiles a cargar (por defecto, los que
+            declaran las funciones del módulo)
+    """
+    backend = obtener_backend()
+    backend.verificar_recursos()
+    backend.precargar(perfiles or sorted(_perfiles_declarados, key=_NIVEL_PERFIL.get))
+    DocumentoAnalizado("precarga").tokens
+
+def __getattr__(nombre):
+    # Compatibilidad con el atributo de módulo nlp, ahora cargado de forma diferida
+    if nombre == 'nlp':
+        return obtener_nlp()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+class BackendSpacy:
+    """
+    Backend NLP completo: tokens de NLTK y lemas, etiquetas POS y stopwords de spaCy.
+    """
+    
+    nombre = 'spacy'
+    
+    def verificar_recursos(self):
+        """
+        Comprueba que NLTK punkt, spaCy y su modelo estén instalados.
+        
+        Raises:
+            RuntimeError: Si falta algún recurso, con el comando para instalarlo
+        """
+        import nltk
+        
+        faltantes = []
+        for nombre, ruta in RECURSOS_NLTK:
+            try:
+                nltk.data.find(ruta)
+            except LookupError:
+                faltantes.append(f"NLTK '{nombre}' (python -m nltk.downloader {nombre})")
+        if importlib.util.find_spec('spacy') is None:
+            faltantes.append("spaCy (pip install -r requirements.txt)")
+        elif importlib.util.find_spec(MODELO_SPACY) is None:
+            faltantes.append(f"modelo de spaCy '{MODELO_SPACY}' (python -m spacy download {MODELO_SPACY})")
+        if faltantes:
+            raise RuntimeError("Faltan recursos NLP: " + "; ".join(faltantes) + ".")
+    
+    def precargar(self, perfiles):
+        """
+        Carga los modelos de spaCy de varios perfiles.
+        
+        Args:
+            perfiles (iterable): Perfiles de PERFILES_SPACY
+        """
+        for perfil in perfiles:
+            obtener_nlp(perfil)
+    
+    def tokenizar(self, texto):
+        """
+        Tokeniza un texto con NLTK.
+        
+        Args:
+            texto (str): Texto en minúsculas
+            
+        Returns:
+            list: Tokens
+        """
+        from nltk.tokenize import word_tokenize
+        
+        return word_tokenize(texto)
+    
+    def procesar(self, texto, perfil):
+        """
+        Analiza un texto con el modelo de spaCy de un perfil.
+        
+        Args:
+            texto (str): Texto en minúsculas
+            perfil (str): Perfil de PERFILES_SPACY
+            
+        Returns:
+            spacy.tokens.Doc: Documento de spaCy
+        """
+        with span('spacy_parse', longitud_texto=len(texto), perfil=perfil):
+            return obtener_nlp(perfil)(texto)
+    
+    def procesar_lote(self, textos, perfil, batch_size=TAM_LOTE_DEFECTO, n_process=1):
+        """
+        Analiza una secuencia de textos con nlp.pipe.
+        
+        Args:
+            textos (iterable): Textos en minúsculas
+            perfil (str): Perfil de PERFILES_SPACY
+            batch_size (int): Textos por lote de spaCy
+            n_process (int): Procesos de spaCy (-1 para usar todos los CPU)
+            
+        Returns:
+            iterator: Documentos de spaCy, en el orden de entrada
+        """
+        return obtener_nlp(perfil).pipe(textos, batch_size=batch_size, n_process=n_process)
+
+# Token del backend ligero, con los atributos de spacy.tokens.Token que usa este módulo
+TokenLigero = namedtuple('TokenLigero', ['text', 'lemma_', 'pos_', 'is_stop', 'is_alpha'])
+
+def _etiquetar_desconocida(palabra):
+    # Lema y etiqueta de una palabra que no está en la tabla del backend ligero
+    if palabra.isalpha():
+        return palabra, ('VERB' if palabra.endswith(('ar', 'er', 'ir')) else 'NOUN')
+    if palabra[0].isdigit():
+        return palabra, ('SYM' if palabra.endswith('%') else 'NUM')
+    if len(palabra) == 1 and not palabra.isalnum():
+        return palabra, 'PUNCT'
+    return palabra, 'NOUN'
+
+class BackendLigero:
+    """
+    Backend NLP sin spaCy ni NLTK, para procesos con poca memoria.
+    
+    Tokeniza con una expresión regular y toma lemas y etiquetas POS de una tabla
+    precalculada con spaCy sobre el vocabulario financiero del chatbot (ver
+    generar_recursos_ligero); las stopwords son las de spaCy. Una palabra que no
+    está en la tabla es su propio lema, con etiqueta VERB si parece un infinitivo
+    y NOUN en otro caso. Los perfiles se ignoran: todos los atributos salen de
+    la misma pasada, que es barata.
+    """
+    
+    nombre = 'ligero'
+    
+    def __init__(self, ruta=RUTA_RECURSOS_LIGERO):
+        self.ruta = ruta
+        self._lemas = None
+        self._stopwords = None
+        self._lock = threading.Lock()
+    
+    def _recursos(self):
+        if self._lemas is None:
+            with self._lock:
+                if self._lemas is None:
+                    with open(self.ruta, encoding='utf-8') as archivo:
+                        recursos = json.load(archivo)
+                    self._stopwords = frozenset(recursos['stopwords'])
+                    self._lemas = {forma: (lema, recursos['pos'][forma]) for forma, lema in recursos['lemas'].items()}
+        return self._lemas, self._stopwords
+    
+    def verificar_recursos(self):
+        """
+        Comprueba que exista la tabla de lemas y stopwords.
+        
+        Raises:
+            RuntimeError: Si no existe, con el comando para generarla
+        """
+        if not os.path.exists(self.ruta):
+            raise RuntimeError(
+                f"Faltan recursos NLP: tabla del backend ligero '{self.ruta}' "
+                "(python -m benchmarks.paridad_backends --regenerar)."
+            )
+    
+    def precargar(self, perfiles=None):
+        """
+        Carga la tabla de lemas y stopwords.
+        
+        Args:
+            perfiles (iterable, optional): Se ignora; existe por compatibilidad con BackendSpacy
+        """
+        self._recursos()
+    
+    def tokenizar(self, texto):
+        """
+        Tokeniza un texto con una expresión regular.
+        
+        Args:
+            texto (str): Texto en minúsculas
+            
+        Returns:
+            list: Tokens
+        """
+        return _PATRON_TOKEN_LIGERO.findall(texto)
+    
+    def procesar(self, texto, perfil='completo'):
+        """
+        Analiza un texto con la tabla de lemas.
+        
+        Args:
+            texto (str): Texto en minúsculas
+            perfil (str): Se ignora; existe por compatibilidad con BackendSpacy
+            
+        Returns:
+            list: TokenLigero de cada token
+        """
+        lemas, stopwords = self._recursos()
+        tokens = []
+        for palabra in _PATRON_TOKEN_LIGERO.findall(texto):
+            lema, pos = lemas.get(palabra) or _etiquetar_desconocida(palabra)
+            tokens.append(TokenLigero(palabra, lema, pos, palabra in stopwords, palabra.isalpha()))
+        return tokens
+    
+    def procesar_lote(self, textos, perfil='completo', batch_size=TAM_LOTE_DEFECTO, n_process=1):
+        """
+        Analiza una secuencia de textos; equivale a procesar sobre cada uno.
+        
+        Args:
+            textos (iterable): Textos en minúsculas
+            perfil (str): Se ignora
+            batch_size (int): Se ignora
+            n_process (int): Se ignora; el análisis es secuencial
+            
+        Returns:
+            iterator: Listas de TokenLigero, en el orden de entrada
+        """
+        return (self.procesar(texto) for texto in textos)
+
+# Backends NLP por nombre, para FINANZBOT_NLP_BACKEND y configurar_backend
+BACKENDS_NLP = {
+    BackendSpacy.nombre: BackendSpacy,
+    BackendLigero.nombre: BackendLigero
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def _crear_backend(nombre):
+    if nombre not in BACKENDS_NLP:
+        raise ValueError(f"Backend NLP no soportado: {nombre}. Usa uno de: {', '.join(BACKENDS_NLP)}.")
+    return BACKENDS_NLP[nombre]()
+
+def obtener_backend():
+    """
+    Devuelve el backend NLP del proceso, creándolo la primera vez que se pide.
+    
+    Se configura con FINANZBOT_NLP_BACKEND ('spacy' por defecto, o 'ligero').
+    
+    Returns:
+        BackendSpacy | BackendLigero: Backend compartido
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _crear_backend(os.environ.get(VARIABLE_BACKEND, BACKEND_DEFECTO))
+        return _backend
+
+def configurar_backend(nombre):
+    """
+    Cambia el backend NLP del proceso.
+    
+    Vacía la caché NLP compartida, cuyos análisis son del backend anterior, y
+    exporta FINANZBOT_NLP_BACKEND para que los procesos trabajadores que se
+    creen después usen el mismo backend. Los índices ya construidos (como el de
+    temas) conservan los lemas con que se construyeron.
+    
+    Args:
+        nombre (str): Nombre del backend en BACKENDS_NLP
+        
+    Returns:
+        BackendSpacy | BackendLigero: Backend nuevo
+    """
+    global _backend
+    backend = _crear_backend(nombre)
+    with _backend_lock:
+        _backend = backend
+        os.environ[VARIABLE_BACKEND] = nombre
+    if _cache is not None:
+        _cache.limpiar()
+    return backend
+
+def generar_recursos_ligero(textos, ruta=RUTA_RECURSOS_LIGERO):
+    """
+    Genera con spaCy la tabla de lemas, etiquetas POS y stopwords del backend ligero.
+    
+    Cada forma toma el lema y la etiqueta más frecuentes en los textos; las
+    stopwords que no aparecen en ellos se analizan sueltas. Los espacios y las
+    formas con dígitos no se guardan: el backend ligero los etiqueta por su cuenta.
+    
+    Args:
+        textos (iterable): Textos con el vocabulario a cubrir
+        ruta (str): Archivo JSON de salida
+        
+    Returns:
+        int: Número de formas de la tabla
+    """
+    nlp = obtener_nlp('lemas_pos')
+    stopwords = sorted(nlp.Defaults.stop_words)
+    conteos = {}
+    for doc in nlp.pipe(texto.lower() for texto in textos):
+        for token in doc:
+            if token.is_space or any(c.isdigit() for c in token.text):
+                continue
+            clave = (token.lemma_, token.pos_)
+            por_forma = conteos.setdefault(token.text, {})
+            por_forma[clave] = por_forma.get(clave, 0) + 1
+    sueltas = [palabra for palabra in stopwords if palabra not in conteos]
+    for palabra, doc in zip(sueltas, nlp.pipe(sueltas)):
+        if len(doc) == 1:
+            conteos[palabra] = {(doc[0].lemma_, doc[0].pos_): 1}
+    
+    elegidos = {forma: max(por_forma.items(), key=lambda x: x[1])[0] for forma, por_forma in conteos.items()}
+    # Lemas y etiquetas en diccionarios separados: una forma por línea en el JSON
+    recursos = {
+        'modelo': MODELO_SPACY,
+        'stopwords': stopwords,
+        'lemas': {forma: lema for forma, (lema, _) in elegidos.items()},
+        'pos': {forma: pos for forma, (_, pos) in elegidos.items()}
+    }
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(recursos, archivo, ensure_ascii=False, indent=1, sort_keys=True)
+        archivo.write('\n')
+    return len(elegidos)
+
+def _ordenar_keywords(doc):
+    palabras = [token.text for token in doc if not token.is_stop and token.is_alpha]
+    frecuencia = {}
+    
+    for palabra in palabras:
+        if palabra in frecuencia:
+            frecuencia[palabra] += 1
+        else:
+            frecuencia[palabra] = 1
+    
+    # Ordenar por frecuencia
+    keywords = sorted(frecuencia.items(), key=lambda x: x[1], reverse=True)
+    return [palabra for palabra, _ in keywords]
+
+def _normalizar(texto, plegar=False):
+    texto = texto.lower()
+    if plegar:
+        texto = texto.translate(_TABLA_ACENTOS)
+    return ' '.join(_PATRON_SIGNOS_DIGITOS.sub('', texto).split())
+
+class DocumentoAnalizado:
+    """
+    Análisis de un texto que ejecuta el backend NLP una sola vez.
+    
+    Los tokens, lemas, etiquetas POS, palabras clave y el texto normalizado se
+    calculan al pedirlos por primera vez y se reutilizan; las funciones de este
+    módulo son envolturas sobre esta clase. Con el backend de spaCy, cada
+    atributo usa el perfil más liviano que le basta, y un documento ya analizado
+    con un perfil más completo se reutiliza.
+    """
+    
+    def __init__(self, texto):
+        self.texto = texto
+        self._backend = obtener_backend()
+        self._docs = {}
+    
+    def documento(self, perfil='completo'):
+        """
+        Devuelve el documento del backend NLP del texto en minúsculas para un perfil.
+        
+        Si ya se analizó el texto con un perfil igual o más completo, reutiliza
+        ese documento en lugar de volver a analizarlo.
+        
+        Args:
+            perfil (str): Perfil mínimo de PERFILES_SPACY
+            
+        Returns:
+            spacy.tokens.Doc | list: Documento de spaCy, o lista de TokenLigero
+        """
+        _validar_perfil(perfil)
+        nivel = _NIVEL_PERFIL[perfil]
+        for perfil_previo, doc in self._docs.items():
+            if _NIVEL_PERFIL[perfil_previo] >= nivel:
+                return doc
+        doc = self._backend.procesar(self.texto.lower(), perfil)
+        self._docs[perfil] = doc
+        return doc
+    
+    @property
+    def doc(self):
+        """spacy.tokens.Doc | list: Documento con el pipeline completo."""
+        return self.documento('completo')
+    
+    @cached_property
+    def tokens(self):
+        """list: Tokens del texto en minúsculas (de NLTK con el backend de spaCy)."""
+        return self._backend.tokenizar(self.texto.lower())
+    
+    @cached_property
+    def lemas(self):
+        """list: Lema de cada token del documento."""
+        return [token.lemma_ for token in self.documento('lemas_pos')]
+    
+    @cached_property
+    def pos_tags(self):
+        """list: Tuplas (palabra, etiqueta) de cada token del documento."""
+        return [(token.text, token.pos_) for token in self.documento('lemas_pos')]
+    
+    @cached_property
+    def _keywords_ordenadas(self):
+        return _ordenar_keywords(self.documento('tokenizador'))
+    
+    def keywords(self, num_palabras=5):
+        """
+        Devuelve las palabras clave más frecuentes (sin stopwords ni números).
+        
+        Args:
+            num_palabras (int, optional): Número de palabras clave a devolver (None para todas)
+            
+        Returns:
+            list: Lista de palabras clave
+        """
+        return self._keywords_ordenadas[:num_palabras]
+    
+    @cached_property
+    def texto_normalizado(self):
+        """str: Texto en minúsculas sin signos, números ni espacios repetidos."""
+        return _normalizar(self.texto)
+
+@instrumentar()
 def tokenizar_texto(texto):
     """
     Tokeniza un texto en palabras individuales.
@@ -24,11 +534,13 @@ def tokenizar_texto(texto):
     Returns:
         list: Lista de tokens
     """
-    return word_tokenize(texto.lower())
+    return DocumentoAnalizado(texto).tokens
 
+@instrumentar()
+@requiere_perfil('lemas_pos')
 def lematizar_texto(texto):
     """
-    Lematiza un texto utilizando spaCy.
+    Lematiza un texto con el backend NLP configurado.
     
     Args:
         texto (str): Texto a lematizar
@@ -36,9 +548,10 @@ def lematizar_texto(texto):
     Returns:
         list: Lista de lemas
     """
-    doc = nlp(texto.lower())
-    return [token.lemma_ for token in doc]
+    return DocumentoAnalizado(texto).lemas
 
+@instrumentar()
+@requiere_perfil('lemas_pos')
 def pos_tagging(texto):
     """
     Realiza el etiquetado gramatical (POS tagging) de un texto.
@@ -49,9 +562,9 @@ def pos_tagging(texto):
     Returns:
         list: Lista de tuplas (palabra, etiqueta)
     """
-    doc = nlp(texto.lower())
-    return [(token.text, token.pos_) for token in doc]
+    return DocumentoAnalizado(texto).pos_tags
 
+@instrumentar()
 def crear_embedding(texto):
     """
     Crea un embedding simple para un texto utilizando CountVectorizer.
@@ -62,9 +575,12 @@ def crear_embedding(texto):
     Returns:
         numpy.ndarray: Vector de embedding
     """
+    from sklearn.feature_extraction.text import CountVectorizer
+    
     vectorizer = CountVectorizer()
     return vectorizer.fit_transform([texto]).toarray()[0]
 
+@instrumentar()
 def similaridad_textos(texto1, texto2):
     """
     Calcula la similaridad coseno entre dos textos.
@@ -76,10 +592,14 @@ def similaridad_textos(texto1, texto2):
     Returns:
         float: Valor de similaridad
     """
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+    
     vectorizer = CountVectorizer().fit([texto1, texto2])
     vectores = vectorizer.transform([texto1, texto2])
     return cosine_similarity(vectores[0:1], vectores[1:2])[0][0]
 
+@instrumentar()
 def normalizar_texto(texto):
     """
     Normaliza un texto: elimina caracteres especiales, convierte a minúsculas.
@@ -90,16 +610,31 @@ def normalizar_texto(texto):
     Returns:
         str: Texto normalizado
     """
-    # Convertir a minúsculas
-    texto = texto.lower()
-    # Eliminar caracteres especiales
-    texto = re.sub(r'[^\w\s]', '', texto)
-    # Eliminar números
-    texto = re.sub(r'\d+', '', texto)
-    # Eliminar espacios múltiples
-    texto = re.sub(r'\s+', ' ', texto).strip()
-    return texto
+    return DocumentoAnalizado(texto).texto_normalizado
 
+@instrumentar()
+def normalizar_textos(textos, plegar=False):
+    """
+    Normaliza una serie o lista de textos como normalizar_texto.
+    
+    Args:
+        textos (pandas.Series | iterable): Textos a normalizar; en una serie, los
+            valores nulos se conservan
+        plegar (bool): Quitar además tildes y diéresis (conservando la ñ), para
+            que 'adiós' y 'adios' coincidan
+            
+    Returns:
+        pandas.Series | list: Textos normalizados (una serie con el mismo índice
+            si la entrada es una serie); sin plegar, idénticos a normalizar_texto
+    """
+    import pandas as pd
+    
+    if isinstance(textos, pd.Series):
+        return textos.map(lambda texto: _normalizar(texto, plegar), na_action='ignore')
+    return [_normalizar(texto, plegar) for texto in textos]
+
+@instrumentar()
+@requiere_perfil('tokenizador')
 def extraer_keywords(texto, num_palabras=5):
     """
     Extrae palabras clave de un texto basado en frecuencia y relevancia.
@@ -111,16 +646,213 @@ def extraer_keywords(texto, num_palabras=5):
     Returns:
         list: Lista de palabras clave
     """
-    doc = nlp(texto.lower())
-    palabras = [token.text for token in doc if not token.is_stop and token.is_alpha]
-    frecuencia = {}
+    return DocumentoAnalizado(texto).keywords(num_palabras)
+
+def plegar_acentos(texto):
+    """
+    Quita tildes y diéresis de las vocales, conservando la ñ.
     
-    for palabra in palabras:
-        if palabra in frecuencia:
-            frecuencia[palabra] += 1
-        else:
-            frecuencia[palabra] = 1
+    Args:
+        texto (str): Texto a plegar
+        
+    Returns:
+        str: Texto sin acentos
+    """
+    return texto.translate(_TABLA_ACENTOS)
+
+def documentos_lote(textos, perfil='completo', batch_size=TAM_LOTE_DEFECTO, n_process=1):
+    """
+    Analiza una secuencia de textos en minúsculas con el backend NLP configurado.
     
-    # Ordenar por frecuencia
-    keywords = sorted(frecuencia.items(), key=lambda x: x[1], reverse=True)
-    return [palabra for palabra, _ in keywords[:num_palabras]]
\ No newline at end of file
+    Args:
+        textos (iterable): Textos a analizar (se consumen de forma perezosa)
+        perfil (str): Perfil de PERFILES_SPACY
+        batch_size (int): Textos por lote de spaCy
+        n_process (int): Procesos de spaCy (-1 para usar todos los CPU)
+        
+    Returns:
+        iterator: Documento de cada texto (ver DocumentoAnalizado.documento), en el orden de entrada
+    """
+    _validar_perfil(perfil)
+    textos = (texto.lower() for texto in textos)
+    return obtener_backend().procesar_lote(textos, perfil, batch_size=batch_size, n_process=n_process)
+
+def tokenizar_lote(textos):
+    """
+    Tokeniza una secuencia de textos; equivale a tokenizar_texto sobre cada uno.
+    
+    La tokenización no pasa por spaCy, así que no hay lotes que configurar; los
+    resultados se generan de uno en uno.
+    
+    Args:
+        textos (iterable): Textos a tokenizar
+        
+    Yields:
+        list: Tokens de cada texto, en el orden de entrada
+    """
+    backend = obtener_backend()
+    for texto in textos:
+        yield backend.tokenizar(texto.lower())
+
+@requiere_perfil('lemas_pos')
+def lematizar_lote(textos, batch_size=TAM_LOTE_DEFECTO, n_process=1):
+    """
+    Lematiza una secuencia de textos con nlp.pipe; equivale a lematizar_texto sobre cada uno.
+    
+    Args:
+        textos (iterable): Textos a lematizar (se consumen de forma perezosa)
+        batch_size (int): Textos por lote de spaCy
+        n_process (int): Procesos de spaCy (-1 para usar todos los CPU)
+        
+    Yields:
+        list: Lemas de cada texto, en el orden de entrada
+    """
+    for doc in documentos_lote(textos, 'lemas_pos', batch_size, n_process):
+        yield [token.lemma_ for token in doc]
+
+@requiere_perfil('lemas_pos')
+def pos_tagging_lote(textos, batch_size=TAM_LOTE_DEFECTO, n_process=1):
+    """
+    Etiqueta una secuencia de textos con nlp.pipe; equivale a pos_tagging sobre cada uno.
+    
+    Args:
+        textos (iterable): Textos a etiquetar (se consumen de forma perezosa)
+        batch_size (int): Textos por lote de spaCy
+        n_process (int): Procesos de spaCy (-1 para usar todos los CPU)
+        
+    Yields:
+        list: Tuplas (palabra, etiqueta) de cada texto, en el orden de entrada
+    """
+    for doc in documentos_lote(textos, 'lemas_pos', batch_size, n_process):
+        yield [(token.text, token.pos_) for token in doc]
+
+@requiere_perfil('tokenizador')
+def extraer_keywords_lote(textos, num_palabras=5, batch_size=TAM_LOTE_DEFECTO, n_process=1):
+    """
+    Extrae palabras clave de una secuencia de textos; equivale a extraer_keywords sobre cada uno.
+    
+    Args:
+        textos (iterable): Textos a analizar (se consumen de forma perezosa)
+        num_palabras (int): Número de palabras clave por texto
+        batch_size (int): Textos por lote de spaCy
+        n_process (int): Procesos de spaCy (-1 para usar todos los CPU)
+        
+    Yields:
+        list: Palabras clave de cada texto, en el orden de entrada
+    """
+    for doc in documentos_lote(textos, 'tokenizador', batch_size, n_process):
+        yield _ordenar_keywords(doc)[:num_palabras]
+
+# Resultado inmutable de la caché NLP; palabras_clave tiene todas las palabras clave ordenadas
+AnalisisTexto = namedtuple('AnalisisTexto', ['texto_normalizado', 'tokens', 'lemas', 'pos_tags', 'palabras_clave'])
+
+class CacheNLP:
+    """
+    Caché LRU de análisis de texto, con el texto sin espacios en los extremos y
+    en minúsculas como clave.
+    
+    En un fallo se analiza el texto tal como llegó (sin los espacios de los
+    extremos), así que los tokens, lemas y etiquetas son los de analizarlo sin
+    caché, con sus números y signos. Los textos que solo difieren en mayúsculas
+    comparten la entrada del primero que se analizó. Los resultados son tuplas,
+    así que se pueden compartir entre sesiones sin copiarlos. Es segura entre hilos.
+    """
+    
+    def __init__(self, max_elementos=1024):
+        if max_elementos <= 0:
+            raise ValueError("max_elementos debe ser mayor que 0.")
+        self.max_elementos = max_elementos
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def obtener(self, texto):
+        """
+        Devuelve el análisis de un texto, calculándolo solo si no está en caché.
+        
+        Args:
+            texto (str): Texto a analizar
+            
+        Returns:
+            AnalisisTexto: Texto normalizado y tokens, lemas, etiquetas POS y
+                palabras clave del texto, como tuplas
+        """
+        texto = texto.strip()
+        clave = texto.lower()
+        with self._lock:
+            analisis = self._memoria.get(clave)
+            if analisis is not None:
+                self._memoria.move_to_end(clave)
+                self.aciertos += 1
+                return analisis
+        
+        documento = DocumentoAnalizado(texto)
+        analisis = AnalisisTexto(
+            documento.texto_normalizado,
+            tuple(documento.tokens),
+            tuple(documento.lemas),
+            tuple(documento.pos_tags),
+            tuple(documento.keywords(None))
+        )
+        with self._lock:
+            self.fallos += 1
+            self._memoria[clave] = analisis
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.max_elementos:
+                self._memoria.popitem(last=False)
+        return analisis
+    
+    def estadisticas(self):
+        """
+        Devuelve los contadores de la caché.
+        
+        Returns:
+            dict: Aciertos, fallos, tasa de aciertos y tamaño
+        """
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+                'en_memoria': len(self._memoria),
+                'max_elementos': self.max_elementos
+            }
+    
+    def limpiar(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._memoria.clear()
+            self.aciertos = self.fallos = 0
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def obtener_cache_nlp():
+    """
+    Devuelve la caché NLP compartida del proceso (una sola instancia para todas las sesiones).
+    
+    Se configura con FINANZBOT_CACHE_NLP_TAMANO (textos en memoria).
+    
+    Returns:
+        CacheNLP: Caché compartida
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheNLP(int(os.environ.get(VARIABLE_TAMANO_CACHE, 1024)))
+        return _cache
+
+def analizar_texto_cache(texto):
+    """
+    Analiza un texto usando la caché NLP compartida del proceso.
+    
+    Args:
+        texto (str): Texto a analizar
+        
+    Returns:
+        AnalisisTexto: Texto normalizado y tokens, lemas, etiquetas POS y
+            palabras clave del texto, como tuplas
+    """
+    return obtener_cache_nlp().obtener(texto)
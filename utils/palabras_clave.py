@@ -0,0 +1,180 @@
+"""
+Palabras clave por TF-IDF con frecuencias de documento acumuladas.
+
+A diferencia de nlp_utils.extraer_keywords, que ordena por frecuencia dentro de
+un solo texto, el extractor recuerda en cuántos textos ha aparecido cada palabra
+(mensajes del chat, descripciones de empresas...) y penaliza las que son comunes
+en todo el corpus. Las estadísticas se actualizan de forma incremental con cada
+lote y el vocabulario se poda cuando supera un máximo, descartando las palabras
+menos frecuentes, para que un proceso de larga duración no crezca sin límite.
+"""
+import itertools
+import math
+import threading
+
+import numpy as np
+
+from .nlp_utils import TAM_LOTE_DEFECTO, documentos_lote
+
+# Palabras distintas que se recuerdan antes de podar el vocabulario
+MAX_VOCABULARIO_DEFECTO = 100000
+
+# Fracción del máximo que se conserva tras una poda (evita podar en cada lote)
+FRACCION_TRAS_PODA = 0.9
+
+def _candidatas(textos, batch_size, n_process):
+    # Mismo criterio que extraer_keywords: sin stopwords ni números, en minúsculas
+    for doc in documentos_lote(textos, 'tokenizador', batch_size, n_process):
+        yield [token.text for token in doc if not token.is_stop and token.is_alpha]
+
+def _sublotes(textos, batch_size, n_process):
+    # Candidatas en listas de batch_size textos: la entrada se consume en streaming
+    candidatas = _candidatas(textos, batch_size, n_process)
+    while True:
+        sublote = list(itertools.islice(candidatas, batch_size))
+        if not sublote:
+            return
+        yield sublote
+
+class ExtractorPalabrasClave:
+    """
+    Frecuencias de documento de las palabras vistas y ranking TF-IDF de textos nuevos.
+    
+    El peso de una palabra en un texto es tf * idf, con tf el número de veces que
+    aparece en el texto e idf = ln((1 + N) / (1 + df)) + 1, donde N es el número de
+    textos vistos y df el número de textos en que apareció la palabra. Una
+    palabra podada o nunca vista tiene df = 0.
+    """
+    
+    def __init__(self, max_vocabulario=MAX_VOCABULARIO_DEFECTO):
+        if max_vocabulario <= 0:
+            raise ValueError("max_vocabulario debe ser mayor que 0.")
+        self.max_vocabulario = max_vocabulario
+        self.num_documentos = 0
+        self.podas = 0
+        self._frecuencias = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._frecuencias)
+    
+    def frecuencia_documento(self, palabra):
+        """
+        Devuelve en cuántos textos vistos apareció una palabra.
+        
+        Args:
+            palabra (str): Palabra en minúsculas
+            
+        Returns:
+            int: Frecuencia de documento (0 si no se vio o se podó)
+        """
+        return self._frecuencias.get(palabra, 0)
+    
+    def _registrar(self, candidatas_por_texto):
+        frecuencias = self._frecuencias
+        for candidatas in candidatas_por_texto:
+            for palabra in set(candidatas):
+                frecuencias[palabra] = frecuencias.get(palabra, 0) + 1
+        self.num_documentos += len(candidatas_por_texto)
+        if len(frecuencias) > self.max_vocabulario:
+            self._podar()
+    
+    def _podar(self):
+        # Conserva las palabras con mayor frecuencia de documento
+        conservar = int(self.max_vocabulario * FRACCION_TRAS_PODA)
+        palabras = list(self._frecuencias)
+        conteos = np.fromiter(self._frecuencias.values(), dtype=np.int64, count=len(palabras))
+        descartadas = np.argpartition(-conteos, conservar)[conservar:]
+        for i in descartadas:
+            del self._frecuencias[palabras[i]]
+        self.podas += 1
+    
+    def actualizar(self, textos, batch_size=TAM_LOTE_DEFECTO, n_process=1):
+        """
+        Agrega textos a las estadísticas del corpus sin extraer palabras clave.
+        
+        Los textos se consumen en sublotes de batch_size; el vocabulario se poda
+        después de cada uno.
+        
+        Args:
+            textos (iterable): Textos nuevos
+            batch_size (int): Textos por lote de spaCy y por sublote
+            n_process (int): Procesos de spaCy
+        """
+        for candidatas in _sublotes(textos, batch_size, n_process):
+            with self._lock:
+                self._registrar(candidatas)
+    
+    def _ordenar(self, candidatas, num_palabras):
+        conteos = {}
+        for palabra in candidatas:
+            conteos[palabra] = conteos.get(palabra, 0) + 1
+        numerador = 1 + self.num_documentos
+        pesos = {
+            palabra: tf * (math.log(numerador / (1 + self._frecuencias.get(palabra, 0))) + 1)
+            for palabra, tf in conteos.items()
+        }
+        # Orden estable: a igual peso, la palabra que aparece primero
+        ordenadas = sorted(pesos.items(), key=lambda x: x[1], reverse=True)
+        return ordenadas[:num_palabras]
+    
+    def extraer_lote(self, textos, num_palabras=5, actualizar=True, con_pesos=False,
+                     batch_size=TAM_LOTE_DEFECTO, n_process=1):
+        """
+        Extrae las palabras clave TF-IDF de un lote de textos.
+        
+        Los textos se consumen en sublotes de batch_size: con actualizar, cada
+        sublote se agrega a las estadísticas (y el vocabulario se poda) antes de
+        ordenar sus palabras, de modo que la memoria no depende del tamaño de la
+        entrada.
+        
+        Args:
+            textos (iterable): Textos a analizar
+            num_palabras (int): Palabras clave por texto
+            actualizar (bool): Agregar cada sublote a las estadísticas del corpus
+            con_pesos (bool): Devolver tuplas (palabra, peso) en lugar de solo palabras
+            batch_size (int): Textos por lote de spaCy y por sublote
+            n_process (int): Procesos de spaCy
+            
+        Returns:
+            list: Palabras clave de cada texto, en el orden de entrada
+        """
+        ranking = []
+        for candidatas in _sublotes(textos, batch_size, n_process):
+            with self._lock:
+                if actualizar:
+                    self._registrar(candidatas)
+                ranking.extend(self._ordenar(c, num_palabras) for c in candidatas)
+        if con_pesos:
+            return ranking
+        return [[palabra for palabra, _ in palabras] for palabras in ranking]
+    
+    def extraer(self, texto, num_palabras=5, actualizar=True):
+        """
+        Extrae las palabras clave TF-IDF de un texto.
+        
+        Args:
+            texto (str): Texto a analizar
+            num_palabras (int): Número de palabras clave
+            actualizar (bool): Agregar el texto a las estadísticas del corpus
+            
+        Returns:
+            list: Palabras clave, de mayor a menor peso
+        """
+        return self.extraer_lote([texto], num_palabras, actualizar)[0]
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+def obtener_extractor():
+    """
+    Devuelve el extractor de palabras clave compartido del proceso.
+    
+    Returns:
+        ExtractorPalabrasClave: Extractor compartido
+    """
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = ExtractorPalabrasClave()
+        return _extractor
@@ -0,0 +1,145 @@
+"""
+Análisis de portafolios en paralelo con un pool de procesos.
+
+Cada proceso trabajador carga los modelos NLP y el registro de sectores una sola
+vez en su inicializador; las tareas solo reciben bloques de datos y los
+resultados se devuelven en el mismo orden de la entrada.
+"""
+import os
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .analysis import _validar_modo_nlp, analizar_empresa, analizar_empresas_lote
+from .sectores import configurar_registro, obtener_registro
+
+# Filas por debajo de las cuales analizar_empresas_paralelo analiza en el proceso
+# principal: enviar los bloques de un DataFrame a los trabajadores y recibir los
+# resultados cuesta tanto como el análisis vectorizado. Para portafolios grandes
+# en disco, puntuar_cartera reparte rangos del archivo y no las filas
+MIN_FILAS_PARALELO = 1000000
+
+def _inicializar_trabajador(cargar_nlp, registro):
+    """
+    Prepara un proceso trabajador: registro de sectores y, si se pide, modelos NLP.
+    
+    Args:
+        cargar_nlp (bool): Cargar spaCy y NLTK antes de recibir tareas
+        registro (RegistroSectores): Registro de sectores del proceso principal
+    """
+    configurar_registro(registro)
+    if cargar_nlp:
+        from . import nlp_utils
+        
+        # Los modelos se cargan una vez por proceso, antes de la primera tarea
+        nlp_utils.precargar()
+
+def crear_pool(num_procesos=None, cargar_nlp=False, contexto=None):
+    """
+    Crea un pool de procesos con el inicializador de trabajadores.
+    
+    Args:
+        num_procesos (int, optional): Número de procesos (por defecto, los CPU disponibles)
+        cargar_nlp (bool): Cargar los modelos NLP en cada trabajador
+        contexto (multiprocessing.context.BaseContext, optional): Contexto de multiprocessing
+        
+    Returns:
+        concurrent.futures.ProcessPoolExecutor: Pool listo para usar
+    """
+    return ProcessPoolExecutor(
+        max_workers=num_procesos or os.cpu_count(),
+        mp_context=contexto,
+        initializer=_inicializar_trabajador,
+        initargs=(cargar_nlp, obtener_registro())
+    )
+
+def mapear_ordenado(pool, funcion, elementos, max_pendientes=None):
+    """
+    Aplica una función en el pool y devuelve los resultados en orden de entrada.
+    
+    A diferencia de Executor.map, consume la entrada de forma perezosa y mantiene
+    como máximo max_pendientes tareas en vuelo, por lo que sirve para flujos largos.
+    
+    Args:
+        pool (concurrent.futures.Executor): Pool de procesos
+        funcion (callable): Función a nivel de módulo (serializable)
+        elementos (iterable): Argumentos de cada tarea
+        max_pendientes (int, optional): Tareas en vuelo (por defecto, 2 por CPU)
+        
+    Yields:
+        object: Resultado de cada tarea, en el orden de elementos
+    """
+    max_pendientes = max_pendientes or 2 * (os.cpu_count() or 1)
+    pendientes = deque()
+    for elemento in elementos:
+        pendientes.append(pool.submit(funcion, elemento))
+        if len(pendientes) >= max_pendientes:
+            yield pendientes.popleft().result()
+    while pendientes:
+        yield pendientes.popleft().result()
+
+def _dividir(secuencia, tam_bloque):
+    for inicio in range(0, len(secuencia), tam_bloque):
+        yield secuencia[inicio:inicio + tam_bloque]
+
+def _analizar_empresas_bloque(empresas_y_modo):
+    empresas, modo_nlp = empresas_y_modo
+    return [analizar_empresa(datos, modo_nlp) for datos in empresas]
+
+def analizar_empresas_paralelo(datos, num_procesos=None, tam_bloque=20000, pool=None):
+    """
+    Versión en paralelo de analizar_empresas_lote: reparte el DataFrame en bloques.
+    
+    Con menos de MIN_FILAS_PARALELO filas, o si solo hay un proceso disponible,
+    analiza en el proceso principal.
+    
+    Args:
+        datos (pandas.DataFrame | dict): Datos de las empresas (ver analizar_empresas_lote)
+        num_procesos (int, optional): Número de procesos
+        tam_bloque (int): Filas por tarea
+        pool (ProcessPoolExecutor, optional): Pool existente (p. ej. de crear_pool)
+        
+    Returns:
+        pandas.DataFrame: Resultados en el orden de la entrada
+    """
+    if not isinstance(datos, pd.DataFrame):
+        datos = pd.DataFrame(datos)
+    sin_procesos = pool is None and (num_procesos or os.cpu_count() or 1) <= 1
+    if len(datos) < MIN_FILAS_PARALELO or sin_procesos:
+        return analizar_empresas_lote(datos)
+    
+    bloques = (datos.iloc[inicio:inicio + tam_bloque] for inicio in range(0, len(datos), tam_bloque))
+    gestor = nullcontext(pool) if pool is not None else crear_pool(num_procesos)
+    with gestor as pool:
+        return pd.concat(mapear_ordenado(pool, analizar_empresas_lote, bloques))
+
+def analizar_lista_paralelo(empresas, num_procesos=None, tam_bloque=256, modo_nlp=None, pool=None):
+    """
+    Aplica analizar_empresa a una lista de diccionarios en paralelo.
+    
+    Con modo_nlp='inmediato' el ejemplo NLP se calcula en los trabajadores, que
+    cargan spaCy una sola vez al iniciar.
+    
+    Args:
+        empresas (list): Diccionarios con los datos de cada empresa
+        num_procesos (int, optional): Número de procesos
+        tam_bloque (int): Empresas por tarea
+        modo_nlp (str, optional): Modo NLP de analizar_empresa ('inmediato' o None)
+        pool (ProcessPoolExecutor, optional): Pool existente (p. ej. de crear_pool)
+        
+    Returns:
+        list: Resultados en el orden de la entrada
+    """
+    _validar_modo_nlp(modo_nlp)
+    if modo_nlp == 'perezoso':
+        raise ValueError("modo_nlp='perezoso' calcularía el NLP en el proceso principal; usa 'inmediato' o None.")
+    
+    tareas = ((bloque, modo_nlp) for bloque in _dividir(list(empresas), tam_bloque))
+    resultados = []
+    gestor = nullcontext(pool) if pool is not None else crear_pool(num_procesos, cargar_nlp=modo_nlp == 'inmediato')
+    with gestor as pool:
+        for bloque in mapear_ordenado(pool, _analizar_empresas_bloque, tareas):
+            resultados.extend(bloque)
+    return resultados
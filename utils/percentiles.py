@@ -0,0 +1,235 @@
+"""
+Índice de percentiles por sector para comparar una empresa con sus pares.
+
+Por cada sector e indicador se mantiene un arreglo ordenado de valores del
+portafolio; la consulta de un percentil es una búsqueda binaria (O(log n)). Las
+empresas nuevas se acumulan en un búfer que se fusiona con el arreglo ordenado en
+la siguiente consulta, de modo que las inserciones no reordenan todo el índice.
+"""
+import os
+import threading
+
+import numpy as np
+
+from .analysis import analizar_empresas_lote
+from .sectores import obtener_registro
+
+# Variable de entorno con un CSV o Parquet de portafolio para precargar el índice compartido
+VARIABLE_PORTAFOLIO = 'FINANZBOT_PORTAFOLIO'
+
+class IndicePercentiles:
+    """
+    Arreglos ordenados de indicadores por sector, con inserción incremental.
+    
+    El percentil indica el porcentaje de pares del sector que la empresa iguala o
+    supera, teniendo en cuenta si el indicador es mejor cuanto menor (endeudamiento,
+    rotación) o cuanto mayor (rentabilidad, productividad). Las empresas agregadas
+    con clave se pueden reemplazar o quitar; las de un lote no.
+    """
+    
+    def __init__(self, registro=None):
+        self.registro = registro or obtener_registro()
+        self._ordenados = {}
+        self._pendientes = {}
+        self._claves = {}  # clave -> (código de sector, valor de cada regla)
+        self._empresas = {}  # código de sector -> número de empresas
+        self._lock = threading.Lock()
+    
+    def _agregar_valores(self, codigo, regla, valores):
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if len(valores):
+            self._pendientes.setdefault((codigo, regla['indicador']), []).append(valores)
+    
+    def _fusionar(self, clave):
+        pendientes = self._pendientes.pop(clave, None)
+        if pendientes:
+            nuevos = np.sort(np.concatenate(pendientes))
+            ordenados = self._ordenados.get(clave)
+            if ordenados is None:
+                self._ordenados[clave] = nuevos
+            else:
+                self._ordenados[clave] = np.insert(ordenados, np.searchsorted(ordenados, nuevos), nuevos)
+        return self._ordenados.get(clave)
+    
+    def _quitar_valor(self, codigo, regla, valor):
+        if np.isnan(valor):
+            return
+        clave = (codigo, regla['indicador'])
+        ordenados = self._fusionar(clave)
+        posicion = np.searchsorted(ordenados, valor)
+        self._ordenados[clave] = np.delete(ordenados, posicion)
+    
+    def _quitar(self, clave):
+        codigo, valores = self._claves.pop(clave)
+        for regla, valor in zip(self.registro.reglas, valores):
+            self._quitar_valor(codigo, regla, valor)
+        self._empresas[codigo] -= 1
+    
+    def agregar(self, resultados, clave=None):
+        """
+        Agrega una empresa analizada al índice.
+        
+        Args:
+            resultados (dict): Resultados de analizar_empresa
+            clave (str, optional): Identificador de la empresa (p. ej. su nombre); si
+                ya se agregó, sus valores anteriores se reemplazan
+                
+        Returns:
+            bool: True si la empresa es nueva, False si reemplazó a la anterior
+        """
+        codigo = self.registro.codigo(resultados['sector'])
+        valores = tuple(float(resultados['indicadores'][regla['valor']]) for regla in self.registro.reglas)
+        with self._lock:
+            nueva = clave not in self._claves
+            if not nueva:
+                self._quitar(clave)
+            if clave is not None:
+                self._claves[clave] = (codigo, valores)
+            for regla, valor in zip(self.registro.reglas, valores):
+                self._agregar_valores(codigo, regla, [valor])
+            self._empresas[codigo] = self._empresas.get(codigo, 0) + 1
+            return nueva
+    
+    def quitar(self, clave):
+        """
+        Quita del índice una empresa agregada con clave.
+        
+        Args:
+            clave (str): Identificador usado en agregar
+            
+        Returns:
+            bool: True si la empresa estaba en el índice
+        """
+        with self._lock:
+            if clave not in self._claves:
+                return False
+            self._quitar(clave)
+            return True
+    
+    def agregar_lote(self, resultados_lote):
+        """
+        Agrega un lote de empresas analizadas al índice.
+        
+        Args:
+            resultados_lote (pandas.DataFrame): Resultado de analizar_empresas_lote
+        """
+        codigos = self.registro.codigos_lote(resultados_lote['sector'].to_numpy())
+        with self._lock:
+            for codigo in np.unique(codigos):
+                filas = codigos == codigo
+                for regla in self.registro.reglas:
+                    self._agregar_valores(int(codigo), regla, resultados_lote[regla['valor']].to_numpy()[filas])
+                self._empresas[int(codigo)] = self._empresas.get(int(codigo), 0) + int(filas.sum())
+    
+    def agregar_portafolio(self, datos):
+        """
+        Analiza un portafolio con analizar_empresas_lote y lo agrega al índice.
+        
+        Args:
+            datos (pandas.DataFrame | dict): Datos de las empresas
+        """
+        self.agregar_lote(analizar_empresas_lote(datos))
+    
+    def num_pares(self, sector):
+        """
+        Devuelve cuántas empresas del sector hay en el índice.
+        
+        Args:
+            sector (str): Nombre del sector
+            
+        Returns:
+            int: Número de empresas distintas del sector (una por clave)
+        """
+        codigo = self.registro.codigo(sector)
+        with self._lock:
+            return self._empresas.get(codigo, 0)
+    
+    def percentil(self, sector, indicador, valor):
+        """
+        Calcula el percentil de un valor frente a los pares de su sector.
+        
+        Args:
+            sector (str): Nombre del sector
+            indicador (str): Nombre del indicador (p. ej. 'rentabilidad')
+            valor (float): Valor del indicador
+            
+        Returns:
+            tuple: (percentil de 0 a 100 o None si no hay pares, número de pares)
+        """
+        codigo = self.registro.codigo(sector)
+        regla = self.registro.reglas[self.registro.indicadores.index(indicador)]
+        with self._lock:
+            ordenados = self._fusionar((codigo, indicador))
+        if ordenados is None or len(ordenados) == 0 or np.isnan(valor):
+            return None, 0 if ordenados is None else len(ordenados)
+        
+        n = len(ordenados)
+        menores = np.searchsorted(ordenados, valor, side='left')
+        menores_o_iguales = np.searchsorted(ordenados, valor, side='right')
+        iguales = menores_o_iguales - menores
+        if regla['sentido'] == 'max':
+            # Menor es mejor: se cuentan los pares con valor mayor
+            superados = n - menores_o_iguales
+        else:
+            superados = menores
+        return 100.0 * (superados + 0.5 * iguales) / n, n
+    
+    def percentiles(self, resultados):
+        """
+        Calcula el percentil de cada indicador de una empresa frente a su sector.
+        
+        Args:
+            resultados (dict): Resultados de analizar_empresa
+            
+        Returns:
+            dict: Por indicador, {'percentil': float | None, 'pares': int}
+        """
+        respuesta = {}
+        for regla in self.registro.reglas:
+            percentil, pares = self.percentil(
+                resultados['sector'], regla['indicador'], resultados['indicadores'][regla['valor']]
+            )
+            respuesta[regla['indicador']] = {'percentil': percentil, 'pares': pares}
+        return respuesta
+
+_indice = None
+_indice_lock = threading.Lock()
+
+def obtener_indice():
+    """
+    Devuelve el índice de percentiles compartido del proceso.
+    
+    Si FINANZBOT_PORTAFOLIO apunta a un CSV o Parquet de empresas, se precarga
+    por bloques la primera vez.
+    
+    Returns:
+        IndicePercentiles: Índice compartido
+    """
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            indice = IndicePercentiles()
+            ruta = os.environ.get(VARIABLE_PORTAFOLIO)
+            if ruta:
+                from .puntuar_cartera import iterar_bloques
+                for _, bloque in iterar_bloques(ruta):
+                    indice.agregar_portafolio(bloque)
+            _indice = indice
+        return _indice
+
+def texto_percentil(percentiles, indicador):
+    """
+    Describe el percentil de un indicador para mostrarlo al usuario.
+    
+    Args:
+        percentiles (dict): Resultado de IndicePercentiles.percentiles
+        indicador (str): Nombre del indicador
+        
+    Returns:
+        str: Texto descriptivo, o cadena vacía si no hay pares
+    """
+    datos = (percentiles or {}).get(indicador)
+    if not datos or datos['percentil'] is None:
+        return ""
+    return f"Percentil {datos['percentil']:.0f} frente a {datos['pares']:,} empresas del sector"
@@ -0,0 +1,343 @@
+"""
+Puntuación de portafolios completos desde la línea de comandos.
+
+Lee un archivo CSV o Parquet por bloques de tamaño fijo, analiza cada bloque con
+analizar_empresas_lote y escribe los resultados de forma incremental, de modo que
+la memoria usada no depende del tamaño del archivo.
+
+Uso:
+    python -m utils.puntuar_cartera entrada.csv salida.csv --tam-bloque 50000
+    python -m utils.puntuar_cartera entrada.parquet salida_dir --desde 1200000
+    python -m utils.puntuar_cartera entrada.csv salida.csv --procesos 32
+"""
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+import pandas as pd
+
+from .analysis import analizar_empresas_lote
+from .paralelo import crear_pool, mapear_ordenado
+
+# Columnas requeridas en el archivo de entrada
+COLUMNAS_ENTRADA = ['ganancias', 'activos', 'deudas', 'cartera', 'empleados', 'sector']
+
+# Separador de las recomendaciones en la columna de salida
+SEPARADOR_RECOMENDACIONES = ' | '
+
+def _es_parquet(ruta):
+    return ruta.lower().endswith(('.parquet', '.pq'))
+
+def _iterar_bloques_csv(ruta, tam_bloque, desde):
+    # Las filas previas se saltan leyendo líneas, con memoria constante: skiprows
+    # construye un conjunto con todos los números de fila omitidos. Supone que
+    # ningún campo contiene saltos de línea
+    with open(ruta, encoding='utf-8', newline='') as archivo:
+        cabecera = next(csv.reader([archivo.readline()]), [])
+        next(itertools.islice(archivo, desde, desde), None)
+        inicio = desde
+        for bloque in pd.read_csv(archivo, names=cabecera, header=None, chunksize=tam_bloque):
+            yield inicio, bloque
+            inicio += len(bloque)
+
+def _iterar_bloques_parquet(ruta, tam_bloque, desde):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Se requiere pyarrow para leer archivos Parquet (pip install pyarrow).")
+    
+    archivo = pq.ParquetFile(ruta)
+    
+    # Saltar grupos de filas completos antes del desplazamiento inicial
+    grupos = []
+    omitidas = 0
+    for i in range(archivo.num_row_groups):
+        filas = archivo.metadata.row_group(i).num_rows
+        if not grupos and omitidas + filas <= desde:
+            omitidas += filas
+            continue
+        grupos.append(i)
+    
+    inicio = desde
+    pendientes = desde - omitidas
+    for lote in archivo.iter_batches(batch_size=tam_bloque, row_groups=grupos):
+        if pendientes >= lote.num_rows:
+            pendientes -= lote.num_rows
+            continue
+        bloque = lote.slice(pendientes).to_pandas()
+        pendientes = 0
+        yield inicio, bloque
+        inicio += len(bloque)
+
+def iterar_bloques(ruta, tam_bloque=50000, desde=0):
+    """
+    Recorre un archivo CSV o Parquet por bloques de filas.
+    
+    Args:
+        ruta (str): Ruta del archivo de entrada
+        tam_bloque (int): Número máximo de filas por bloque
+        desde (int): Fila (base 0, sin encabezado) desde la cual empezar
+        
+    Yields:
+        tuple: (fila_inicial, pandas.DataFrame) de cada bloque; el índice del
+            DataFrame es el número de fila de cada empresa en el archivo
+    """
+    if _es_parquet(ruta):
+        bloques = _iterar_bloques_parquet(ruta, tam_bloque, desde)
+    else:
+        bloques = _iterar_bloques_csv(ruta, tam_bloque, desde)
+    return _con_indice_global(bloques)
+
+def _rangos_csv(ruta, tam_bloque, desde):
+    # Una pasada en binario que solo cuenta líneas y guarda la posición en bytes
+    # del comienzo de cada bloque, para que cada trabajador lea el suyo con seek
+    with open(ruta, 'rb') as archivo:
+        cabecera = next(csv.reader([archivo.readline().decode('utf-8')]), [])
+        posicion = archivo.tell()
+        for linea in itertools.islice(archivo, desde):
+            posicion += len(linea)
+        inicio = desde
+        while True:
+            desplazamiento, filas = posicion, 0
+            for linea in itertools.islice(archivo, tam_bloque):
+                posicion += len(linea)
+                filas += 1
+            if not filas:
+                return
+            yield inicio, filas, (desplazamiento, cabecera)
+            inicio += filas
+
+def _rangos_parquet(ruta, tam_bloque, desde):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Se requiere pyarrow para leer archivos Parquet (pip install pyarrow).")
+    
+    total = pq.ParquetFile(ruta).metadata.num_rows
+    for inicio in range(desde, total, tam_bloque):
+        yield inicio, min(tam_bloque, total - inicio), None
+
+def planificar_rangos(ruta, tam_bloque=50000, desde=0):
+    """
+    Divide un archivo CSV o Parquet en rangos de filas sin cargar los datos.
+    
+    Cada rango puede leerse después por separado con leer_rango, por ejemplo en
+    otro proceso, sin que el proceso principal envíe las filas.
+    
+    Args:
+        ruta (str): Ruta del archivo de entrada
+        tam_bloque (int): Número máximo de filas por rango
+        desde (int): Fila (base 0, sin encabezado) desde la cual empezar
+        
+    Yields:
+        tuple: (fila_inicial, filas, posicion), donde posicion es la información
+            que necesita leer_rango para llegar al rango sin recorrer las filas previas
+    """
+    if _es_parquet(ruta):
+        return _rangos_parquet(ruta, tam_bloque, desde)
+    return _rangos_csv(ruta, tam_bloque, desde)
+
+def leer_rango(ruta, inicio, filas, posicion=None):
+    """
+    Lee un rango de filas de un archivo CSV o Parquet.
+    
+    Args:
+        ruta (str): Ruta del archivo de entrada
+        inicio (int): Primera fila del rango (base 0, sin encabezado)
+        filas (int): Filas del rango
+        posicion (object, optional): Posición calculada por planificar_rangos
+            (necesaria para CSV)
+        
+    Returns:
+        pandas.DataFrame: Filas del rango, con el número de fila en el archivo como índice
+    """
+    if _es_parquet(ruta):
+        # Los lotes de un rango pueden repartirse entre grupos de filas
+        partes, leidas = [], 0
+        for _, parte in _iterar_bloques_parquet(ruta, filas, inicio):
+            partes.append(parte.iloc[:filas - leidas])
+            leidas += len(partes[-1])
+            if leidas >= filas:
+                break
+        bloque = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+    else:
+        desplazamiento, cabecera = posicion
+        with open(ruta, 'rb') as archivo:
+            archivo.seek(desplazamiento)
+            bloque = pd.read_csv(archivo, names=cabecera, header=None, nrows=filas, encoding='utf-8')
+    bloque.index = pd.RangeIndex(inicio, inicio + len(bloque))
+    return bloque
+
+def _con_indice_global(bloques):
+    # Los lectores numeran cada bloque desde 0 (Parquet) o desde la primera fila
+    # leída (CSV); los reportes por archivo usan el índice como nombre
+    for inicio, bloque in bloques:
+        bloque.index = pd.RangeIndex(inicio, inicio + len(bloque))
+        yield inicio, bloque
+
+def puntuar_bloque(bloque, inicio=0):
+    """
+    Analiza un bloque de empresas y lo prepara para escribirse en disco.
+    
+    Args:
+        bloque (pandas.DataFrame): Datos de las empresas
+        inicio (int): Número de la primera fila del bloque en el archivo
+        
+    Returns:
+        pandas.DataFrame: Resultados con la columna 'fila' y las recomendaciones como texto
+    """
+    faltantes = [columna for columna in COLUMNAS_ENTRADA if columna not in bloque]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en la entrada: {', '.join(faltantes)}")
+    
+    resultados = analizar_empresas_lote(bloque.reset_index(drop=True))
+    resultados['recomendaciones'] = [
+        SEPARADOR_RECOMENDACIONES.join(recs) for recs in resultados['recomendaciones']
+    ]
+    resultados.insert(0, 'fila', range(inicio, inicio + len(resultados)))
+    return resultados
+
+def _puntuar_bloque_tarea(tarea):
+    inicio, bloque, serializar = tarea
+    # Serializar aquí para que, en paralelo, el proceso principal solo escriba
+    return inicio, len(bloque), serializar(puntuar_bloque(bloque, inicio))
+
+def _puntuar_rango_tarea(tarea):
+    # Cada trabajador lee su propio rango del archivo: las tareas solo llevan la
+    # ruta y la posición, y devuelven los resultados ya serializados
+    ruta, inicio, filas, posicion, serializar = tarea
+    return _puntuar_bloque_tarea((inicio, leer_rango(ruta, inicio, filas, posicion), serializar))
+
+class _EscritorCSV:
+    def __init__(self, ruta, anexar):
+        self.ruta = ruta
+        self.encabezado = not (anexar and os.path.exists(ruta) and os.path.getsize(ruta) > 0)
+        if not anexar and os.path.exists(ruta):
+            os.remove(ruta)
+    
+    @staticmethod
+    def serializar(resultados):
+        return resultados.head(0).to_csv(index=False), resultados.to_csv(index=False, header=False)
+    
+    def escribir(self, inicio, resultados):
+        encabezado, filas = resultados
+        with open(self.ruta, 'a', encoding='utf-8', newline='') as archivo:
+            if self.encabezado:
+                archivo.write(encabezado)
+                self.encabezado = False
+            archivo.write(filas)
+
+class _EscritorParquet:
+    # Un archivo por bloque, nombrado por su fila inicial, para poder reanudar
+    def __init__(self, ruta, anexar):
+        self.ruta = ruta
+        os.makedirs(ruta, exist_ok=True)
+        if not anexar:
+            for nombre in os.listdir(ruta):
+                if nombre.startswith('parte-') and nombre.endswith('.parquet'):
+                    os.remove(os.path.join(ruta, nombre))
+    
+    @staticmethod
+    def serializar(resultados):
+        return resultados.to_parquet(None, index=False)
+    
+    def escribir(self, inicio, resultados):
+        with open(os.path.join(self.ruta, f"parte-{inicio:012d}.parquet"), 'wb') as archivo:
+            archivo.write(resultados)
+
+def puntuar_archivo(entrada, salida, tam_bloque=50000, desde=0, informar=None, num_procesos=1):
+    """
+    Puntúa un archivo completo por bloques y escribe los resultados incrementalmente.
+    
+    Si la salida termina en .csv se escribe un único CSV (anexando al reanudar);
+    en otro caso se escribe un directorio de archivos Parquet, uno por bloque.
+    
+    Args:
+        entrada (str): Archivo CSV o Parquet con los datos de las empresas
+        salida (str): Archivo CSV o directorio Parquet de resultados
+        tam_bloque (int): Filas por bloque
+        desde (int): Fila desde la cual reanudar
+        informar (callable, optional): Recibe un texto de progreso por bloque
+        num_procesos (int): Procesos para leer y puntuar bloques en paralelo (1 = secuencial)
+        
+    Returns:
+        dict: Filas procesadas, segundos transcurridos y filas por segundo
+    """
+    if salida.lower().endswith('.csv'):
+        escritor = _EscritorCSV(salida, anexar=desde > 0)
+    else:
+        escritor = _EscritorParquet(salida, anexar=desde > 0)
+    
+    total = 0
+    t0 = time.perf_counter()
+    gestor = crear_pool(num_procesos) if num_procesos > 1 else nullcontext()
+    with gestor as pool:
+        if pool is None:
+            tareas = (
+                (inicio, bloque, escritor.serializar)
+                for inicio, bloque in iterar_bloques(entrada, tam_bloque, desde)
+            )
+            puntuados = map(_puntuar_bloque_tarea, tareas)
+        else:
+            # El proceso principal solo planifica los rangos y escribe en orden;
+            # la lectura, el análisis y la serialización ocurren en los trabajadores
+            tareas = (
+                (entrada, inicio, filas, posicion, escritor.serializar)
+                for inicio, filas, posicion in planificar_rangos(entrada, tam_bloque, desde)
+            )
+            puntuados = mapear_ordenado(pool, _puntuar_rango_tarea, tareas, 2 * num_procesos)
+        
+        t_bloque = time.perf_counter()
+        for inicio, filas, resultados in puntuados:
+            escritor.escribir(inicio, resultados)
+            total += filas
+            
+            if informar:
+                ahora = time.perf_counter()
+                duracion = ahora - t_bloque
+                t_bloque = ahora
+                velocidad = filas / duracion if duracion > 0 else float('inf')
+                informar(f"Filas {inicio:,}-{inicio + filas:,}: {velocidad:,.0f} filas/s")
+    
+    segundos = time.perf_counter() - t0
+    return {
+        'filas': total,
+        'segundos': segundos,
+        'filas_por_segundo': total / segundos if segundos > 0 else float('inf'),
+        'siguiente_fila': desde + total
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Puntúa un portafolio de empresas (CSV o Parquet) por bloques."
+    )
+    parser.add_argument('entrada', help="Archivo CSV o Parquet con las columnas " + ", ".join(COLUMNAS_ENTRADA))
+    parser.add_argument('salida', help="Archivo .csv o directorio de salida Parquet")
+    parser.add_argument('--tam-bloque', type=int, default=50000, help="Filas por bloque (por defecto 50000)")
+    parser.add_argument('--desde', type=int, default=0, help="Fila desde la cual reanudar (por defecto 0)")
+    parser.add_argument('--procesos', type=int, default=1, help="Procesos para puntuar en paralelo (por defecto 1)")
+    parser.add_argument('--silencioso', action='store_true', help="No mostrar el progreso por bloque")
+    args = parser.parse_args(argv)
+    
+    if args.tam_bloque <= 0:
+        parser.error("--tam-bloque debe ser mayor que 0")
+    if args.desde < 0:
+        parser.error("--desde no puede ser negativo")
+    if args.procesos <= 0:
+        parser.error("--procesos debe ser mayor que 0")
+    
+    informar = None if args.silencioso else (lambda texto: print(texto, file=sys.stderr))
+    resumen = puntuar_archivo(args.entrada, args.salida, args.tam_bloque, args.desde, informar, args.procesos)
+    print(
+        f"{resumen['filas']:,} filas en {resumen['segundos']:.2f} s "
+        f"({resumen['filas_por_segundo']:,.0f} filas/s). Siguiente fila: {resumen['siguiente_fila']}",
+        file=sys.stderr
+    )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Generación masiva de reportes de análisis.
+
+Produce, para cada empresa de un resultado de analizar_empresas_lote, el mismo
+texto que generar_mensaje_resultado, usando una plantilla precompilada que se
+llena directamente con las columnas del lote. Los reportes se escriben en
+streaming (un archivo por empresa o un único archivo Markdown/HTML), de modo que
+la memoria no crece con el tamaño del portafolio.
+
+Uso:
+    python -m utils.reportes entrada.csv reportes.md
+    python -m utils.reportes entrada.parquet reportes.html --tam-bloque 20000
+    python -m utils.reportes entrada.csv reportes_dir --formato archivos
+"""
+import argparse
+import html
+import os
+import re
+import sys
+import time
+
+from .analysis import analizar_empresas_lote
+
+# Estructura de los mensajes de análisis (generar_mensaje_resultado y los reportes),
+# sin el bloque de recomendaciones
+PLANTILLA_MENSAJE = (
+    "Análisis económico para {nombre} (Sector: {sector}):\n\n"
+    "Estado económico general: {estado_general}\n\n"
+    "Indicadores analizados:\n"
+    "• Ratio de endeudamiento: {ratio_endeudamiento:.2f} ({evaluacion_endeudamiento})\n"
+    "• Rentabilidad sobre activos: {rentabilidad:.2%} ({evaluacion_rentabilidad})\n"
+    "• Productividad por empleado: ${productividad:,.0f} COP ({evaluacion_productividad})\n"
+    "• Rotación de cartera: {rotacion_cartera:.1f} días ({evaluacion_rotacion})\n\n"
+)
+
+# Columnas del lote que llenan la plantilla, en el orden de sus campos
+_CAMPOS_PLANTILLA = (
+    'nombre', 'sector', 'estado_general', 'ratio_endeudamiento', 'evaluacion_endeudamiento',
+    'rentabilidad', 'evaluacion_rentabilidad', 'productividad', 'evaluacion_productividad',
+    'rotacion_cartera', 'evaluacion_rotacion'
+)
+
+# Campos de la plantilla que están en la raíz del diccionario de analizar_empresa
+_CAMPOS_RESULTADO = ('nombre', 'sector', 'estado_general')
+
+# Formatos de salida admitidos
+FORMATOS = ('markdown', 'html', 'archivos')
+
+_CABECERA_HTML = (
+    "<!DOCTYPE html>\n<html lang=\"es\">\n<head>\n<meta charset=\"utf-8\">\n"
+    "<title>Reportes de análisis financiero</title>\n</head>\n<body>\n"
+)
+_PIE_HTML = "</body>\n</html>\n"
+
+class PlantillaReporte:
+    """
+    Plantilla de mensaje compilada una vez y reutilizada para todas las filas.
+    
+    Los bloques de recomendaciones se construyen una sola vez por combinación de
+    recomendaciones, que se repiten mucho en un portafolio.
+    """
+    
+    def __init__(self, plantilla=PLANTILLA_MENSAJE):
+        # Sustituye los nombres de campo por posiciones para llenar con tuplas
+        posiciones = {}
+        def _posicional(coincidencia):
+            campo = coincidencia.group(1)
+            posiciones.setdefault(campo, len(posiciones))
+            return '{' + str(posiciones[campo]) + (coincidencia.group(2) or '') + '}'
+        self._formatear = re.sub(r'\{(\w+)(:[^}]*)?\}', _posicional, plantilla).format
+        # Cada campo se lee del resultado (0), de 'indicadores' (1) o de 'evaluacion' (2)
+        self._rutas = tuple(
+            (2, campo[len('evaluacion_'):]) if campo.startswith('evaluacion_')
+            else (0, campo) if campo in _CAMPOS_RESULTADO
+            else (1, campo)
+            for campo in posiciones
+        )
+        self._bloques_recomendaciones = {}
+    
+    def _recomendaciones(self, recomendaciones):
+        bloque = self._bloques_recomendaciones.get(recomendaciones)
+        if bloque is None:
+            bloque = ""
+            if recomendaciones:
+                bloque = "Recomendaciones:\n" + "".join(
+                    f"{i}. {rec}\n" for i, rec in enumerate(recomendaciones, 1)
+                )
+            self._bloques_recomendaciones[recomendaciones] = bloque
+        return bloque
+    
+    def mensaje(self, resultados):
+        """
+        Genera el mensaje de un resultado de analizar_empresa.
+        
+        Los campos de la plantilla con el prefijo 'evaluacion_' se leen de
+        'evaluacion', los de _CAMPOS_RESULTADO del diccionario y el resto de
+        'indicadores'.
+        
+        Args:
+            resultados (dict): Resultados del análisis
+            
+        Returns:
+            str: Mensaje personalizado
+        """
+        fuentes = (resultados, resultados['indicadores'], resultados['evaluacion'])
+        valores = [fuentes[fuente][clave] for fuente, clave in self._rutas]
+        return self._formatear(*valores) + self._recomendaciones(tuple(resultados['recomendaciones']))
+    
+    def mensajes(self, resultados_lote):
+        """
+        Genera el mensaje de cada fila de un resultado de analizar_empresas_lote.
+        
+        Args:
+            resultados_lote (pandas.DataFrame): Resultado de analizar_empresas_lote
+            
+        Yields:
+            tuple: (índice de la fila, nombre, mensaje idéntico a generar_mensaje_resultado)
+        """
+        indices = resultados_lote.index.tolist()
+        if 'nombre' in resultados_lote:
+            nombres = resultados_lote['nombre'].tolist()
+        else:
+            nombres = [str(indice) for indice in indices]
+        columnas = [nombres] + [resultados_lote[campo].tolist() for campo in _CAMPOS_PLANTILLA[1:]]
+        formatear = self._formatear
+        recomendaciones = self._recomendaciones
+        for indice, valores, recs in zip(indices, zip(*columnas), resultados_lote['recomendaciones'].tolist()):
+            yield indice, valores[0], formatear(*valores) + recomendaciones(tuple(recs))
+
+# Plantilla de generar_mensaje_resultado, compartida entre llamadas para reutilizar
+# los bloques de recomendaciones
+_plantilla_mensaje = PlantillaReporte()
+
+def plantilla_mensaje():
+    """
+    Devuelve la plantilla compartida de PLANTILLA_MENSAJE.
+    
+    Returns:
+        PlantillaReporte: Plantilla por defecto
+    """
+    return _plantilla_mensaje
+
+def generar_mensajes_lote(resultados_lote, plantilla=None):
+    """
+    Genera los mensajes de un lote con la plantilla precompilada.
+    
+    Args:
+        resultados_lote (pandas.DataFrame): Resultado de analizar_empresas_lote
+        plantilla (PlantillaReporte, optional): Plantilla a reutilizar entre lotes
+        
+    Yields:
+        tuple: (índice de la fila, nombre, mensaje)
+    """
+    return (plantilla or _plantilla_mensaje).mensajes(resultados_lote)
+
+def _nombre_archivo(indice, nombre):
+    base = re.sub(r'[^\w-]+', '_', str(nombre)).strip('_')[:80]
+    return f"{indice}_{base}.md" if base else f"{indice}.md"
+
+def _seccion_markdown(nombre, mensaje):
+    return f"## {nombre}\n\n```text\n{mensaje}```\n\n"
+
+def _seccion_html(nombre, mensaje):
+    return f"<section>\n<h2>{html.escape(str(nombre))}</h2>\n<pre>{html.escape(mensaje)}</pre>\n</section>\n"
+
+def escribir_reportes(bloques, salida, formato=None):
+    """
+    Escribe en streaming los reportes de una secuencia de lotes de resultados.
+    
+    Args:
+        bloques (iterable): Resultados de analizar_empresas_lote (un DataFrame por bloque)
+        salida (str): Archivo .md/.html, o directorio para un archivo por empresa
+        formato (str, optional): 'markdown', 'html' o 'archivos' (por defecto, según la extensión)
+        
+    Returns:
+        int: Número de reportes escritos
+    """
+    formato = formato or _formato_por_extension(salida)
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}. Usa uno de: {', '.join(FORMATOS)}.")
+    
+    plantilla = PlantillaReporte()
+    total = 0
+    if formato == 'archivos':
+        os.makedirs(salida, exist_ok=True)
+        for resultados_lote in bloques:
+            for indice, nombre, mensaje in plantilla.mensajes(resultados_lote):
+                with open(os.path.join(salida, _nombre_archivo(indice, nombre)), 'w', encoding='utf-8') as archivo:
+                    archivo.write(mensaje)
+                total += 1
+        return total
+    
+    seccion = _seccion_html if formato == 'html' else _seccion_markdown
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        archivo.write(_CABECERA_HTML if formato == 'html' else "# Reportes de análisis financiero\n\n")
+        for resultados_lote in bloques:
+            secciones = [seccion(nombre, mensaje) for _, nombre, mensaje in plantilla.mensajes(resultados_lote)]
+            archivo.writelines(secciones)
+            total += len(secciones)
+        if formato == 'html':
+            archivo.write(_PIE_HTML)
+    return total
+
+def _formato_por_extension(salida):
+    extension = os.path.splitext(salida)[1].lower()
+    if extension in ('.md', '.markdown'):
+        return 'markdown'
+    if extension in ('.html', '.htm'):
+        return 'html'
+    return 'archivos'
+
+def generar_reportes_archivo(entrada, salida, formato=None, tam_bloque=50000):
+    """
+    Analiza un portafolio (CSV o Parquet) por bloques y escribe sus reportes.
+    
+    Args:
+        entrada (str): Archivo con las columnas de puntuar_cartera.COLUMNAS_ENTRADA
+        salida (str): Archivo .md/.html, o directorio para un archivo por empresa
+        formato (str, optional): 'markdown', 'html' o 'archivos'
+        tam_bloque (int): Filas por bloque
+        
+    Returns:
+        dict: 'reportes', 'segundos' y 'reportes_por_segundo'
+    """
+    from .puntuar_cartera import iterar_bloques
+    
+    inicio = time.perf_counter()
+    bloques = (analizar_empresas_lote(bloque) for _, bloque in iterar_bloques(entrada, tam_bloque))
+    total = escribir_reportes(bloques, salida, formato)
+    segundos = time.perf_counter() - inicio
+    return {
+        'reportes': total,
+        'segundos': segundos,
+        'reportes_por_segundo': total / segundos if segundos > 0 else float('inf')
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Genera los reportes de análisis de un portafolio (CSV o Parquet)."
+    )
+    parser.add_argument('entrada', help="Archivo CSV o Parquet con los datos de las empresas")
+    parser.add_argument('salida', help="Archivo .md o .html, o directorio para un archivo por empresa")
+    parser.add_argument('--formato', choices=FORMATOS, help="Formato de salida (por defecto, según la extensión)")
+    parser.add_argument('--tam-bloque', type=int, default=50000, help="Filas por bloque (por defecto 50000)")
+    args = parser.parse_args(argv)
+    
+    if args.tam_bloque <= 0:
+        parser.error("--tam-bloque debe ser mayor que 0")
+    
+    resumen = generar_reportes_archivo(args.entrada, args.salida, args.formato, args.tam_bloque)
+    print(
+        f"{resumen['reportes']:,} reportes en {resumen['segundos']:.2f} s "
+        f"({resumen['reportes_por_segundo']:,.0f} reportes/s)",
+        file=sys.stderr
+    )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Variable de entorno con la ruta de un archivo JSON de perfiles de sector
+VARIABLE_CONFIGURACION = 'FINANZBOT_SECTORES'
+
+# Límites por sector (simplificados para este ejemplo)
+PERFILES_SECTOR = {
+    'tecnologia': {
+        'alias': ['tecnología'],
+        'endeudamiento': 0.6,
+        'rentabilidad': 0.15,
+        'productividad': 100000000,  # 100 millones COP por empleado
+        'rotacion': 60
+    },
+    'comercio': {
+        'endeudamiento': 0.5,
+        'rentabilidad': 0.08,
+        'productividad': 50000000,  # 50 millones COP por empleado
+        'rotacion': 45
+    },
+    'manufactura': {
+        'endeudamiento': 0.55,
+        'rentabilidad': 0.1,
+        'productividad': 70000000,  # 70 millones COP por empleado
+        'rotacion': 50
+    },
+    'servicios': {
+        'endeudamiento': 0.45,
+        'rentabilidad': 0.12,
+        'productividad': 60000000,  # 60 millones COP por empleado
+        'rotacion': 30
+    },
+    'otro': {
+        'endeudamiento': 0.5,
+        'rentabilidad': 0.1,
+        'productividad': 60000000,  # 60 millones COP por empleado
+        'rotacion': 45
+    }
+}
+
+# Reglas de evaluación, en el orden en que se reportan los indicadores.
+# 'sentido' es 'max' si el indicador cumple cuando valor <= límite y 'min' si valor >= límite.
+REGLAS = [
+    {
+        'indicador': 'endeudamiento',
+        'valor': 'ratio_endeudamiento',
+        'sentido': 'max',
+        'etiquetas': ['bueno', 'alto'],
+        'recomendacion': "Reducir el nivel de endeudamiento, considerar reestructuración de deuda."
+    },
+    {
+        'indicador': 'rentabilidad',
+        'valor': 'rentabilidad',
+        'sentido': 'min',
+        'etiquetas': ['buena', 'baja'],
+        'recomendacion': "Mejorar la eficiencia operativa y revisar la estructura de costos."
+    },
+    {
+        'indicador': 'productividad',
+        'valor': 'productividad',
+        'sentido': 'min',
+        'etiquetas': ['buena', 'baja'],
+        'recomendacion': "Optimizar procesos y/o implementar programas de capacitación para los empleados."
+    },
+    {
+        'indicador': 'rotacion',
+        'valor': 'rotacion_cartera',
+        'sentido': 'max',
+        'etiquetas': ['buena', 'alta'],
+        'recomendacion': "Mejorar las políticas de cobro y gestión de cartera."
+    }
+]
+
+class RegistroSectores:
+    """
+    Perfiles de sector y reglas de evaluación compilados en arreglos.
+    
+    Cada sector recibe un código entero; los límites quedan en una matriz
+    (sectores x reglas) que comparten el análisis individual y el de lotes.
+    """
+    
+    def __init__(self, perfiles, reglas=None, sector_defecto='otro'):
+        reglas = REGLAS if reglas is None else reglas
+        if sector_defecto not in perfiles:
+            raise ValueError(f"El sector por defecto '{sector_defecto}' no tiene perfil.")
+        
+        self.sectores = tuple(perfiles)
+        self.reglas = tuple(dict(regla) for regla in reglas)
+        self.indicadores = tuple(regla['indicador'] for regla in self.reglas)
+        self.sector_defecto = sector_defecto
+        self.codigo_defecto = self.sectores.index(sector_defecto)
+        
+        # Nombres y alias (en minúsculas) -> código de sector
+        self._codigos = {}
+        for codigo, sector in enumerate(self.sectores):
+            self._codigos[sector.lower()] = codigo
+            for alias in perfiles[sector].get('alias', []):
+                self._codigos[alias.lower()] = codigo
+        
+        self.limites = np.array(
+            [[float(perfiles[sector][ind]) for ind in self.indicadores] for sector in self.sectores],
+            dtype=float
+        )
+        self.es_maximo = np.array([regla['sentido'] == 'max' for regla in self.reglas], dtype=bool)
+        self.recomendaciones_por_mascara = np.empty(2 ** len(self.reglas), dtype=object)
+        for mascara in range(len(self.recomendaciones_por_mascara)):
+            self.recomendaciones_por_mascara[mascara] = tuple(
+                regla['recomendacion'] for i, regla in enumerate(self.reglas) if mascara & (1 << i)
+            )
+        
+        # Filas de límites como floats de Python para la evaluación individual
+        self._limites_filas = [tuple(fila) for fila in self.limites.tolist()]
+        self._perfiles = {sector: dict(perfiles[sector]) for sector in self.sectores}
+        contenido = json.dumps(
+            {'perfiles': self._perfiles, 'reglas': self.reglas, 'sector_defecto': sector_defecto},
+            sort_keys=True, ensure_ascii=False
+        )
+        self.version = hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+    
+    def codigo(self, sector):
+        """
+        Devuelve el código del sector (el del sector por defecto si no está definido).
+        
+        Args:
+            sector (str): Nombre del sector
+            
+        Returns:
+            int: Código del sector
+        """
+        return self._codigos.get(sector.lower(), self.codigo_defecto)
+    
+    def codigos_lote(self, sectores):
+        """
+        Convierte un arreglo de nombres de sector en códigos.
+        
+        Args:
+            sectores (array-like): Sectores de las empresas
+            
+        Returns:
+            numpy.ndarray: Código de sector de cada empresa
+        """
+        valores, inversa = np.unique(np.asarray(sectores, dtype=object).astype(str), return_inverse=True)
+        codigos = np.array([self.codigo(valor) for valor in valores], dtype=np.intp)
+        return codigos[inversa.reshape(-1)]
+    
+    def limite(self, sector, indicador):
+        """
+        Devuelve el límite de un indicador para un sector.
+        
+        Args:
+            sector (str): Nombre del sector
+            indicador (str): Nombre del indicador (p. ej. 'productividad')
+            
+        Returns:
+            float: Límite del indicador
+        """
+        return self._limites_filas[self.codigo(sector)][self.indicadores.index(indicador)]
+    
+    def evaluar(self, sector, indicadores):
+        """
+        Evalúa los indicadores de una empresa contra los límites de su sector.
+        
+        Args:
+            sector (str): Nombre del sector
+            indicadores (dict): Valores de los indicadores calculados
+            
+        Returns:
+            tuple: (evaluacion, cumple) con las etiquetas por indicador y la
+                lista de booleanos en el orden de las reglas
+        """
+        limites = self._limites_filas[self.codigo(sector)]
+        evaluacion = {}
+        cumple = []
+        for regla, limite in zip(self.reglas, limites):
+            valor = indicadores[regla['valor']]
+            ok = valor <= limite if regla['sentido'] == 'max' else valor >= limite
+            evaluacion[regla['indicador']] = regla['etiquetas'][0] if ok else regla['etiquetas'][1]
+            cumple.append(ok)
+        return evaluacion, cumple
+    
+    def cumple_lote(self, codigos, indicadores):
+        """
+        Evalúa arreglos de indicadores contra los límites de cada sector.
+        
+        Args:
+            codigos (numpy.ndarray): Códigos de sector
+            indicadores (dict): Arreglos de valores por clave de indicador
+            
+        Returns:
+            numpy.ndarray: Matriz booleana (empresas x reglas)
+        """
+        valores = np.column_stack([indicadores[regla['valor']] for regla in self.reglas])
+        limites = self.limites[codigos]
+        return np.where(self.es_maximo, valores <= limites, valores >= limites)
+    
+    def a_dict(self):
+        """
+        Devuelve los perfiles y reglas en el formato del archivo de configuración.
+        
+        Returns:
+            dict: Configuración serializable a JSON
+        """
+        return {
+            'sector_defecto': self.sector_defecto,
+            'perfiles': {sector: dict(perfil) for sector, perfil in self._perfiles.items()},
+            'reglas': [dict(regla) for regla in self.reglas]
+        }
+
+def cargar_registro(ruta):
+    """
+    Carga y compila un registro de sectores desde un archivo JSON.
+    
+    El archivo contiene 'perfiles' y, opcionalmente, 'reglas' y 'sector_defecto'.
+    
+    Args:
+        ruta (str): Ruta del archivo JSON
+        
+    Returns:
+        RegistroSectores: Registro compilado
+    """
+    with open(ruta, encoding='utf-8') as archivo:
+        configuracion = json.load(archivo)
+    return RegistroSectores(
+        configuracion['perfiles'],
+        configuracion.get('reglas'),
+        configuracion.get('sector_defecto', 'otro')
+    )
+
+_registro = None
+
+def obtener_registro():
+    """
+    Devuelve el registro de sectores del proceso, cargándolo una sola vez.
+    
+    Usa el archivo indicado en FINANZBOT_SECTORES si existe; si no, los
+    perfiles definidos en este módulo.
+    
+    Returns:
+        RegistroSectores: Registro activo
+    """
+    global _registro
+    if _registro is None:
+        ruta = os.environ.get(VARIABLE_CONFIGURACION)
+        _registro = cargar_registro(ruta) if ruta else RegistroSectores(PERFILES_SECTOR)
+    return _registro
+
+def configurar_registro(registro):
+    """
+    Reemplaza el registro de sectores activo.
+    
+    Args:
+        registro (RegistroSectores | str): Registro compilado o ruta de un JSON
+    """
+    global _registro
+    _registro = cargar_registro(registro) if isinstance(registro, str) else registro
@@ -0,0 +1,382 @@
+"""
+Índice de empresas similares por perfil de indicadores.
+
+Cada empresa se representa con un vector de sus cuatro indicadores normalizados
+respecto a los límites de su sector: arcsinh(valor / límite), que hace comparables
+escalas muy distintas (ratios, porcentajes, pesos por empleado, días) y acota
+los valores extremos o infinitos. Los vecinos más cercanos se buscan por
+distancia euclidiana, opcionalmente solo entre empresas del mismo sector.
+
+Cada partición guarda sus vectores en arreglos que crecen por duplicación. Las
+empresas consolidadas se consultan con un KD-tree (con cuatro dimensiones
+responde en microsegundos) y las recién insertadas, con un kernel NumPy de
+fuerza bruta por bloques; el árbol se reconstruye en la siguiente búsqueda cuando
+las pendientes superan una fracción de las consolidadas, de modo que las
+inserciones no pagan la construcción del árbol.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+from .analysis import analizar_empresas_lote
+from .percentiles import VARIABLE_PORTAFOLIO
+from .sectores import obtener_registro
+
+# Valor máximo de valor / límite antes de aplicar arcsinh (p. ej. ratios infinitos)
+_TOPE_RELATIVO = 1e6
+
+# Distancias que se calculan por bloque (consultas x empresas) para acotar la memoria
+_ELEMENTOS_BLOQUE = 2 ** 22
+
+# Consultas por bloque en las búsquedas masivas
+_CONSULTAS_BLOQUE = 256
+
+# Capacidad inicial de cada partición; se duplica al llenarse
+_CAPACIDAD_INICIAL = 1024
+
+# Empresas pendientes a partir de las cuales se reconstruye el KD-tree de una partición
+# (o 1/16 de las consolidadas, si es mayor); por debajo basta la fuerza bruta
+_MIN_PENDIENTES_ARBOL = 4096
+
+def _k_vecinos(consultas, vectores, normas, k):
+    """
+    Busca los k vectores más cercanos a cada consulta recorriendo los datos por bloques.
+    
+    Args:
+        consultas (numpy.ndarray): Matriz (consultas x dimensiones)
+        vectores (numpy.ndarray): Matriz (empresas x dimensiones)
+        normas (numpy.ndarray): Norma al cuadrado de cada vector
+        k (int): Vecinos por consulta (como máximo el número de vectores)
+        
+    Returns:
+        tuple: (posiciones, distancias) como matrices (consultas x k), de menor a mayor distancia
+    """
+    normas_consultas = np.einsum('ij,ij->i', consultas, consultas)[:, None]
+    filas_bloque = max(k, _ELEMENTOS_BLOQUE // max(len(consultas), 1))
+    mejores_d = np.empty((len(consultas), 0))
+    mejores_i = np.empty((len(consultas), 0), dtype=np.intp)
+    
+    for inicio in range(0, len(vectores), filas_bloque):
+        fin = min(inicio + filas_bloque, len(vectores))
+        d = normas_consultas - 2.0 * (consultas @ vectores[inicio:fin].T) + normas[inicio:fin]
+        candidatos_d = np.hstack([mejores_d, d])
+        candidatos_i = np.hstack([mejores_i, np.broadcast_to(np.arange(inicio, fin), d.shape)])
+        if candidatos_d.shape[1] > k:
+            seleccion = np.argpartition(candidatos_d, k - 1, axis=1)[:, :k]
+            candidatos_d = np.take_along_axis(candidatos_d, seleccion, axis=1)
+            candidatos_i = np.take_along_axis(candidatos_i, seleccion, axis=1)
+        mejores_d, mejores_i = candidatos_d, candidatos_i
+    
+    orden = np.argsort(mejores_d, axis=1, kind='stable')
+    distancias = np.sqrt(np.maximum(np.take_along_axis(mejores_d, orden, axis=1), 0.0))
+    return np.take_along_axis(mejores_i, orden, axis=1), distancias
+
+class _Particion:
+    """Arreglos crecientes de vectores de un sector (o de todas las empresas)."""
+    
+    __slots__ = ('vectores', 'normas', 'claves', 'nombres', 'codigos', 'posiciones', 'n', 'arbol', 'n_arbol')
+    
+    def __init__(self, dimensiones):
+        self.vectores = np.empty((_CAPACIDAD_INICIAL, dimensiones))
+        self.normas = np.empty(_CAPACIDAD_INICIAL)
+        self.codigos = np.empty(_CAPACIDAD_INICIAL, dtype=np.intp)
+        self.claves = []
+        self.nombres = []
+        self.posiciones = {}
+        self.n = 0
+        self.arbol = None
+        self.n_arbol = 0
+    
+    def agregar(self, vectores, codigos, claves, nombres):
+        total = self.n + len(vectores)
+        if total > len(self.vectores):
+            capacidad = max(total, 2 * len(self.vectores))
+            for atributo in ('vectores', 'normas', 'codigos'):
+                actual = getattr(self, atributo)
+                nuevo = np.empty((capacidad,) + actual.shape[1:], dtype=actual.dtype)
+                nuevo[:self.n] = actual[:self.n]
+                setattr(self, atributo, nuevo)
+        self.vectores[self.n:total] = vectores
+        self.normas[self.n:total] = np.einsum('ij,ij->i', vectores, vectores)
+        self.codigos[self.n:total] = codigos
+        for posicion, clave in enumerate(claves, self.n):
+            self.posiciones[clave] = posicion
+        self.claves.extend(claves)
+        self.nombres.extend(nombres)
+        self.n = total
+    
+    def _k_vecinos(self, consultas, k):
+        pendientes = self.n - self.n_arbol
+        if pendientes >= max(_MIN_PENDIENTES_ARBOL, self.n_arbol // 16):
+            # Las filas [:n] no se modifican después de insertarse; el árbol puede referenciarlas
+            self.arbol = KDTree(self.vectores[:self.n])
+            self.n_arbol = self.n
+            pendientes = 0
+        
+        partes = []
+        if self.n_arbol:
+            distancias, posiciones = self.arbol.query(consultas, k=min(k, self.n_arbol))
+            partes.append((posiciones, distancias))
+        if pendientes:
+            posiciones, distancias = _k_vecinos(
+                consultas, self.vectores[self.n_arbol:self.n], self.normas[self.n_arbol:self.n], min(k, pendientes)
+            )
+            partes.append((posiciones + self.n_arbol, distancias))
+        if len(partes) == 1:
+            return partes[0]
+        
+        posiciones = np.hstack([p for p, _ in partes])
+        distancias = np.hstack([d for _, d in partes])
+        orden = np.argsort(distancias, axis=1, kind='stable')[:, :k]
+        return np.take_along_axis(posiciones, orden, axis=1), np.take_along_axis(distancias, orden, axis=1)
+    
+    def buscar(self, consultas, k, excluir=None):
+        """
+        Devuelve posiciones y distancias de los k vecinos de cada consulta.
+        
+        excluir tiene, por consulta, la posición que no debe aparecer en el
+        resultado (-1 si ninguna). Si hay menos de k empresas, las columnas
+        sobrantes quedan con posición -1 y distancia inf.
+        """
+        extra = 0 if excluir is None else 1
+        disponibles = min(k + extra, self.n)
+        posiciones = np.full((len(consultas), k), -1, dtype=np.intp)
+        distancias = np.full((len(consultas), k), np.inf)
+        if disponibles == 0:
+            return posiciones, distancias
+        
+        encontradas, d = self._k_vecinos(consultas, disponibles)
+        if excluir is not None:
+            # Mueve la propia empresa al final de cada fila sin alterar el orden del resto
+            propia = encontradas == np.asarray(excluir)[:, None]
+            orden = np.argsort(propia, axis=1, kind='stable')
+            encontradas = np.take_along_axis(encontradas, orden, axis=1)
+            d = np.where(np.take_along_axis(propia, orden, axis=1), np.inf, np.take_along_axis(d, orden, axis=1))
+            encontradas = np.where(np.isinf(d), -1, encontradas)
+        columnas = min(k, encontradas.shape[1])
+        posiciones[:, :columnas] = encontradas[:, :columnas]
+        distancias[:, :columnas] = d[:, :columnas]
+        return posiciones, distancias
+
+class IndiceSimilares:
+    """
+    Vectores de indicadores normalizados de las empresas, con búsqueda de vecinos.
+    
+    Con por_sector=True (por defecto) cada sector tiene su propia partición y
+    las búsquedas solo devuelven empresas del mismo sector.
+    """
+    
+    def __init__(self, registro=None, por_sector=True):
+        self.registro = registro or obtener_registro()
+        self.por_sector = por_sector
+        self._particiones = {}
+        self._lock = threading.Lock()
+    
+    def vectores(self, codigos, indicadores):
+        """
+        Normaliza los indicadores de un lote de empresas.
+        
+        Args:
+            codigos (numpy.ndarray): Códigos de sector del registro
+            indicadores (dict | pandas.DataFrame): Arreglo de cada clave de indicador
+            
+        Returns:
+            numpy.ndarray: Matriz (empresas x reglas) de indicadores normalizados
+        """
+        valores = np.column_stack([
+            np.asarray(indicadores[regla['valor']], dtype=float) for regla in self.registro.reglas
+        ])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relativos = valores / self.registro.limites[codigos]
+        relativos = np.nan_to_num(relativos, nan=0.0, posinf=_TOPE_RELATIVO, neginf=-_TOPE_RELATIVO)
+        return np.arcsinh(np.clip(relativos, -_TOPE_RELATIVO, _TOPE_RELATIVO))
+    
+    def _particion(self, codigo):
+        clave = int(codigo) if self.por_sector else None
+        particion = self._particiones.get(clave)
+        if particion is None:
+            particion = self._particiones[clave] = _Particion(len(self.registro.reglas))
+        return particion
+    
+    def __len__(self):
+        return sum(particion.n for particion in self._particiones.values())
+    
+    def agregar(self, resultados, clave=None):
+        """
+        Agrega una empresa analizada al índice.
+        
+        Args:
+            resultados (dict): Resultados de analizar_empresa
+            clave (str, optional): Identificador único (por defecto, el nombre); si ya
+                se agregó, se ignora
+                
+        Returns:
+            bool: True si la empresa se agregó
+        """
+        clave = resultados['nombre'] if clave is None else clave
+        codigo = self.registro.codigo(resultados['sector'])
+        indicadores = {valor: [dato] for valor, dato in resultados['indicadores'].items()}
+        with self._lock:
+            particion = self._particion(codigo)
+            if clave in particion.posiciones:
+                return False
+            particion.agregar(self.vectores(np.array([codigo]), indicadores), [codigo], [clave], [resultados['nombre']])
+            return True
+    
+    def agregar_lote(self, resultados_lote, claves=None):
+        """
+        Agrega un lote de empresas analizadas; se ignoran las claves ya presentes.
+        
+        Args:
+            resultados_lote (pandas.DataFrame): Resultado de analizar_empresas_lote
+            claves (sequence, optional): Identificador de cada fila (por defecto, el índice)
+        """
+        claves = np.asarray(resultados_lote.index if claves is None else claves, dtype=object)
+        if 'nombre' in resultados_lote:
+            nombres = resultados_lote['nombre'].to_numpy(dtype=object)
+        else:
+            nombres = claves.astype(str).astype(object)
+        codigos = self.registro.codigos_lote(resultados_lote['sector'].to_numpy())
+        vectores = self.vectores(codigos, resultados_lote)
+        
+        with self._lock:
+            grupos = np.unique(codigos) if self.por_sector else [None]
+            for codigo in grupos:
+                filas = np.ones(len(codigos), dtype=bool) if codigo is None else codigos == codigo
+                particion = self._particion(0 if codigo is None else codigo)
+                # Dentro del lote también se conserva solo la primera aparición de cada
+                # clave, comparando como las posiciones (1 y '1' son claves distintas)
+                vistas = set()
+                seleccion = []
+                for fila, clave in zip(np.flatnonzero(filas), claves[filas]):
+                    if clave not in particion.posiciones and clave not in vistas:
+                        vistas.add(clave)
+                        seleccion.append(fila)
+                seleccion = np.array(seleccion, dtype=np.intp)
+                if len(seleccion):
+                    particion.agregar(vectores[seleccion], codigos[seleccion], claves[seleccion].tolist(), nombres[seleccion].tolist())
+    
+    def agregar_portafolio(self, datos, claves=None):
+        """
+        Analiza un portafolio con analizar_empresas_lote y lo agrega al índice.
+        
+        Args:
+            datos (pandas.DataFrame | dict): Datos de las empresas
+            claves (sequence, optional): Identificador de cada fila (por defecto, el índice)
+        """
+        self.agregar_lote(analizar_empresas_lote(datos), claves)
+    
+    def _formatear(self, particion, posiciones, distancias):
+        return [
+            {
+                'clave': particion.claves[posicion],
+                'nombre': particion.nombres[posicion],
+                'sector': self.registro.sectores[particion.codigos[posicion]],
+                'distancia': float(distancia)
+            }
+            for posicion, distancia in zip(posiciones, distancias) if posicion >= 0
+        ]
+    
+    def vecinos(self, resultados, k=5, excluir=None):
+        """
+        Busca las k empresas más parecidas a una empresa analizada.
+        
+        Args:
+            resultados (dict): Resultados de analizar_empresa
+            k (int): Número de empresas a devolver
+            excluir (str, optional): Clave que no debe aparecer (p. ej. la de la propia empresa)
+            
+        Returns:
+            list: Diccionarios con 'clave', 'nombre', 'sector' y 'distancia', de la más
+                parecida a la menos parecida
+        """
+        codigo = self.registro.codigo(resultados['sector'])
+        indicadores = {valor: [dato] for valor, dato in resultados['indicadores'].items()}
+        consulta = self.vectores(np.array([codigo]), indicadores)
+        with self._lock:
+            particion = self._particiones.get(int(codigo) if self.por_sector else None)
+            if particion is None or k <= 0:
+                return []
+            propia = None if excluir is None else [particion.posiciones.get(excluir, -1)]
+            posiciones, distancias = particion.buscar(consulta, k, propia)
+            return self._formatear(particion, posiciones[0], distancias[0])
+    
+    def vecinos_lote(self, resultados_lote, k=5, claves=None):
+        """
+        Busca las k empresas más parecidas a cada fila de un lote.
+        
+        Args:
+            resultados_lote (pandas.DataFrame): Resultado de analizar_empresas_lote
+            k (int): Vecinos por empresa
+            claves (sequence, optional): Clave de cada fila; cada empresa se excluye de
+                sus propios vecinos (útil cuando el lote ya está en el índice)
+                
+        Returns:
+            pandas.DataFrame: Formato largo con 'fila' (índice del lote), 'rango'
+                (1 = más parecida), 'clave', 'nombre' y 'distancia'
+        """
+        codigos = self.registro.codigos_lote(resultados_lote['sector'].to_numpy())
+        consultas = self.vectores(codigos, resultados_lote)
+        claves = None if claves is None else np.asarray(claves, dtype=object)
+        posiciones = np.full((len(consultas), max(k, 0)), -1, dtype=np.intp)
+        distancias = np.full(posiciones.shape, np.inf)
+        particion_fila = np.full(len(consultas), -1, dtype=np.intp)
+        particiones = []
+        
+        with self._lock:
+            grupos = np.unique(codigos) if self.por_sector else [None]
+            for codigo in grupos:
+                particion = self._particiones.get(None if codigo is None else int(codigo))
+                if particion is None or k <= 0:
+                    continue
+                filas = np.arange(len(codigos)) if codigo is None else np.flatnonzero(codigos == codigo)
+                particion_fila[filas] = len(particiones)
+                particiones.append(particion)
+                for inicio in range(0, len(filas), _CONSULTAS_BLOQUE):
+                    bloque = filas[inicio:inicio + _CONSULTAS_BLOQUE]
+                    propias = None
+                    if claves is not None:
+                        propias = [particion.posiciones.get(clave, -1) for clave in claves[bloque]]
+                    posiciones[bloque], distancias[bloque] = particion.buscar(consultas[bloque], k, propias)
+            
+            filas, rangos = np.nonzero(posiciones >= 0)
+            encontradas = posiciones[filas, rangos]
+            claves_vecinos = [particiones[particion_fila[f]].claves[p] for f, p in zip(filas, encontradas)]
+            nombres_vecinos = [particiones[particion_fila[f]].nombres[p] for f, p in zip(filas, encontradas)]
+        
+        return pd.DataFrame({
+            'fila': resultados_lote.index.to_numpy()[filas],
+            'rango': rangos + 1,
+            'clave': claves_vecinos,
+            'nombre': nombres_vecinos,
+            'distancia': distancias[filas, rangos]
+        })
+
+_indice = None
+_indice_lock = threading.Lock()
+
+def obtener_indice_similares():
+    """
+    Devuelve el índice de empresas similares compartido del proceso.
+    
+    Si FINANZBOT_PORTAFOLIO apunta a un CSV o Parquet de empresas, se precarga
+    por bloques la primera vez.
+    
+    Returns:
+        IndiceSimilares: Índice compartido
+    """
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            indice = IndiceSimilares()
+            ruta = os.environ.get(VARIABLE_PORTAFOLIO)
+            if ruta:
+                from .puntuar_cartera import iterar_bloques
+                for inicio, bloque in iterar_bloques(ruta):
+                    # La clave es la fila del archivo: el índice de cada bloque puede reiniciarse
+                    indice.agregar_portafolio(bloque, np.arange(inicio, inicio + len(bloque)))
+            _indice = indice
+        return _indice
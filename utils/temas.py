@@ -0,0 +1,221 @@
+"""
+Índice de temas financieros para clasificar los mensajes del chatbot.
+
+El vocabulario se ajusta una sola vez sobre las descripciones de los temas
+(lemas y palabras originales, sin acentos) y se guarda una matriz dispersa con una fila
+normalizada por tema. La similitud coseno de un mensaje con todos los temas es
+un único producto matriz-vector; la de un lote de mensajes, un producto de
+matrices dispersas. El índice se puede guardar en disco y cargar sin volver a
+lematizar las descripciones.
+"""
+import os
+import threading
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from .nlp_utils import TAM_LOTE_DEFECTO, DocumentoAnalizado, documentos_lote, plegar_acentos
+
+# Variable de entorno con un índice guardado (.npz) para el índice compartido
+VARIABLE_INDICE = 'FINANZBOT_INDICE_TEMAS'
+
+# Descripciones de los temas del chatbot
+TEMAS = {
+    'endeudamiento': "deudas financiación pasivos préstamos créditos obligaciones financieras apalancamiento",
+    'rentabilidad': "beneficios ganancias rentabilidad margen utilidad rendimiento roa roi retorno inversión",
+    'productividad': "empleados trabajadores personal productividad eficiencia rendimiento laboral desempeño",
+    'cartera': "cartera cobros créditos clientes facturas cuentas por cobrar cobranza",
+    'liquidez': "liquidez efectivo caja flujo dinero solvencia corto plazo disponible"
+}
+
+# Similitud mínima para asignar un tema
+UMBRAL_SIMILITUD = 0.1
+
+def _texto_indexable(palabras, lemas):
+    # Lema y forma original de cada token: las descripciones son listas de palabras
+    # sin contexto y spaCy no siempre acierta su lema
+    terminos = []
+    for palabra, lema in zip(palabras, lemas):
+        terminos.append(lema)
+        if palabra != lema:
+            terminos.append(palabra)
+    return plegar_acentos(' '.join(terminos))
+
+def _textos_indexables(textos, batch_size=TAM_LOTE_DEFECTO, n_process=1):
+    docs = documentos_lote(textos, 'lemas_pos', batch_size, n_process)
+    return (_texto_indexable([t.text for t in doc], [t.lemma_ for t in doc]) for doc in docs)
+
+def _indexable_analisis(mensaje):
+    # pos_tags y lemas de DocumentoAnalizado (y de AnalisisTexto, que los copia)
+    # salen del mismo documento 'lemas_pos' del texto en minúsculas que analiza
+    # _textos_indexables, así que un mensaje da el mismo texto por ambos caminos
+    return _texto_indexable([palabra for palabra, _ in mensaje.pos_tags], mensaje.lemas)
+
+def _indexables_mensajes(mensajes, batch_size, n_process):
+    # Los textos se analizan por lotes; los mensajes ya analizados reutilizan su análisis
+    mensajes = list(mensajes)
+    analizados = _textos_indexables(
+        (mensaje for mensaje in mensajes if isinstance(mensaje, str)), batch_size, n_process
+    )
+    for mensaje in mensajes:
+        yield next(analizados) if isinstance(mensaje, str) else _indexable_analisis(mensaje)
+
+class IndiceTemas:
+    """
+    Matriz dispersa de temas con filas normalizadas y su vocabulario fijo.
+    
+    Se crea con IndiceTemas.construir o cargar_indice_temas; matriz debe tener
+    una fila de norma L2 unitaria por tema.
+    """
+    
+    def __init__(self, temas, vocabulario, matriz):
+        self.temas = list(temas)
+        self.vocabulario = dict(vocabulario)
+        self.matriz = sparse.csr_matrix(matriz, dtype=float)
+        self._vectorizador = CountVectorizer(vocabulary=self.vocabulario)
+    
+    @classmethod
+    def construir(cls, temas=None):
+        """
+        Ajusta el vocabulario sobre las descripciones de los temas.
+        
+        Args:
+            temas (dict, optional): Tema -> descripción (por defecto, TEMAS)
+            
+        Returns:
+            IndiceTemas: Índice construido
+        """
+        temas = temas or TEMAS
+        vectorizador = CountVectorizer()
+        matriz = vectorizador.fit_transform(list(_textos_indexables(temas.values())))
+        return cls(temas.keys(), vectorizador.vocabulary_, normalize(matriz.astype(float)))
+    
+    def _vectorizar(self, textos_indexables):
+        return normalize(self._vectorizador.transform(textos_indexables).astype(float))
+    
+    def similitudes(self, mensaje):
+        """
+        Calcula la similitud coseno de un mensaje con cada tema.
+        
+        Args:
+            mensaje (str | DocumentoAnalizado | AnalisisTexto): Mensaje, o su análisis si ya existe
+            
+        Returns:
+            numpy.ndarray: Similitud con cada tema, en el orden de self.temas
+        """
+        if isinstance(mensaje, str):
+            mensaje = DocumentoAnalizado(mensaje)
+        vector = self._vectorizar([_indexable_analisis(mensaje)])
+        return (self.matriz @ vector.T).toarray().ravel()
+    
+    def similitudes_lote(self, mensajes, batch_size=TAM_LOTE_DEFECTO, n_process=1):
+        """
+        Calcula la similitud de cada mensaje de un lote con cada tema.
+        
+        Cada fila es igual a similitudes() del mismo mensaje, tanto si se pasa
+        el texto como su análisis.
+        
+        Args:
+            mensajes (iterable): Mensajes a clasificar (str, DocumentoAnalizado o AnalisisTexto)
+            batch_size (int): Textos por lote de spaCy
+            n_process (int): Procesos de spaCy
+            
+        Returns:
+            numpy.ndarray: Matriz (mensajes x temas) de similitudes
+        """
+        textos = _indexables_mensajes(mensajes, batch_size, n_process)
+        return (self._vectorizar(textos) @ self.matriz.T).toarray()
+    
+    def _mejor_tema(self, similitudes, umbral):
+        mejor = int(np.argmax(similitudes))
+        similitud = float(similitudes[mejor])
+        return (self.temas[mejor] if similitud > umbral else None), similitud
+    
+    def clasificar(self, mensaje, umbral=UMBRAL_SIMILITUD):
+        """
+        Devuelve el tema más similar a un mensaje.
+        
+        Args:
+            mensaje (str | DocumentoAnalizado | AnalisisTexto): Mensaje, o su análisis si ya existe
+            umbral (float): Similitud que debe superar el tema
+            
+        Returns:
+            tuple: (tema o None si ninguno supera el umbral, similitud del mejor tema)
+        """
+        return self._mejor_tema(self.similitudes(mensaje), umbral)
+    
+    def clasificar_lote(self, mensajes, umbral=UMBRAL_SIMILITUD, batch_size=TAM_LOTE_DEFECTO, n_process=1):
+        """
+        Clasifica un lote de mensajes.
+        
+        Args:
+            mensajes (iterable): Mensajes a clasificar (str, DocumentoAnalizado o AnalisisTexto)
+            umbral (float): Similitud que debe superar el tema
+            batch_size (int): Textos por lote de spaCy
+            n_process (int): Procesos de spaCy
+            
+        Returns:
+            list: Tuplas (tema o None, similitud) en el orden de entrada
+        """
+        return [self._mejor_tema(fila, umbral) for fila in self.similitudes_lote(mensajes, batch_size, n_process)]
+    
+    def guardar(self, ruta):
+        """
+        Guarda el índice en un archivo .npz.
+        
+        Args:
+            ruta (str): Ruta del archivo
+        """
+        terminos = sorted(self.vocabulario, key=self.vocabulario.get)
+        np.savez_compressed(
+            ruta,
+            temas=np.array(self.temas),
+            terminos=np.array(terminos),
+            datos=self.matriz.data,
+            indices=self.matriz.indices,
+            punteros=self.matriz.indptr,
+            forma=np.array(self.matriz.shape)
+        )
+
+def cargar_indice_temas(ruta):
+    """
+    Carga un índice de temas guardado con IndiceTemas.guardar.
+    
+    Args:
+        ruta (str): Ruta del archivo .npz
+        
+    Returns:
+        IndiceTemas: Índice cargado
+    """
+    with np.load(ruta, allow_pickle=False) as archivo:
+        matriz = sparse.csr_matrix(
+            (archivo['datos'], archivo['indices'], archivo['punteros']),
+            shape=tuple(archivo['forma'])
+        )
+        vocabulario = {termino: i for i, termino in enumerate(archivo['terminos'].tolist())}
+        return IndiceTemas(archivo['temas'].tolist(), vocabulario, matriz)
+
+_indice = None
+_indice_lock = threading.Lock()
+
+def obtener_indice_temas():
+    """
+    Devuelve el índice de temas compartido del proceso, construyéndolo una sola vez.
+    
+    Usa el archivo indicado en FINANZBOT_INDICE_TEMAS si existe; si no, lo
+    construye a partir de TEMAS.
+    
+    Returns:
+        IndiceTemas: Índice compartido
+    """
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            ruta = os.environ.get(VARIABLE_INDICE)
+            if ruta and os.path.exists(ruta):
+                _indice = cargar_indice_temas(ruta)
+            else:
+                _indice = IndiceTemas.construir()
+        return _indice
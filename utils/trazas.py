@@ -0,0 +1,219 @@
+"""
+Trazas con spans anidados para medir dónde se va el tiempo de cada respuesta.
+
+Un span es un tramo con nombre, duración y atributos. El primer span de un flujo
+(p. ej. chatbot_response) abre una traza y los spans internos quedan como hijos.
+La decisión de muestreo se toma una vez por traza; las trazas muestreadas se
+escriben al terminar, una línea JSON por span, en el archivo configurado.
+
+Se activa con FINANZBOT_TRAZAS (ruta del archivo JSONL) y opcionalmente
+FINANZBOT_TRAZAS_MUESTREO (fracción de trazas a guardar, por defecto 1.0). Sin
+configurar, span() devuelve un objeto nulo compartido y las funciones
+instrumentadas llaman directamente a la original.
+"""
+import contextvars
+import functools
+import itertools
+import json
+import os
+import random
+import threading
+import time
+
+# Variables de entorno de configuración
+VARIABLE_RUTA = 'FINANZBOT_TRAZAS'
+VARIABLE_MUESTREO = 'FINANZBOT_TRAZAS_MUESTREO'
+
+_activo = False
+_ruta = None
+_muestreo = 1.0
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_actual = contextvars.ContextVar('finanzbot_span_actual', default=None)
+
+class _SpanNulo:
+    """Span sin efecto que se usa cuando las trazas están desactivadas."""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, tipo, valor, traceback):
+        return False
+    
+    def anotar(self, **atributos):
+        pass
+
+_NULO = _SpanNulo()
+
+class _TrazaDescartada(_SpanNulo):
+    """Raíz de una traza no muestreada: marca el contexto para que los hijos no abran otra."""
+    
+    __slots__ = ('_token',)
+    
+    def __enter__(self):
+        self._token = _actual.set(self)
+        return self
+    
+    def __exit__(self, tipo, valor, traceback):
+        _actual.reset(self._token)
+        return False
+
+class Span:
+    """
+    Tramo medido de una traza.
+    """
+    
+    __slots__ = ('nombre', 'atributos', 'traza', 'spans', 'id', 'padre', 'inicio', '_t0', 'duracion_ms', '_token')
+    
+    def __init__(self, nombre, atributos, padre=None):
+        self.nombre = nombre
+        self.atributos = atributos
+        self.id = next(_ids)
+        if padre is None:
+            self.traza = os.urandom(8).hex()
+            self.spans = []
+            self.padre = None
+        else:
+            self.traza = padre.traza
+            self.spans = padre.spans
+            self.padre = padre.id
+        self.duracion_ms = None
+    
+    def anotar(self, **atributos):
+        """Agrega atributos al span."""
+        self.atributos.update(atributos)
+    
+    def __enter__(self):
+        self._token = _actual.set(self)
+        self.inicio = time.time()
+        self._t0 = time.perf_counter()
+        return self
+    
+    def __exit__(self, tipo, valor, traceback):
+        self.duracion_ms = (time.perf_counter() - self._t0) * 1000
+        if tipo is not None:
+            self.atributos['error'] = tipo.__name__
+        _actual.reset(self._token)
+        self.spans.append(self)
+        if self.padre is None:
+            _escribir(self.spans)
+        return False
+    
+    def a_dict(self):
+        """
+        Devuelve el span como diccionario serializable.
+        
+        Returns:
+            dict: Traza, identificadores, nombre, inicio, duración y atributos
+        """
+        return {
+            'traza': self.traza,
+            'span': self.id,
+            'padre': self.padre,
+            'nombre': self.nombre,
+            'inicio': self.inicio,
+            'duracion_ms': self.duracion_ms,
+            'atributos': self.atributos
+        }
+
+def _escribir(spans):
+    lineas = [json.dumps(s.a_dict(), ensure_ascii=False, default=str) + '\n' for s in spans]
+    with _lock:
+        if _ruta is None:
+            return
+        with open(_ruta, 'a', encoding='utf-8') as archivo:
+            archivo.writelines(lineas)
+
+def configurar(ruta=None, muestreo=1.0):
+    """
+    Activa o desactiva las trazas del proceso.
+    
+    Args:
+        ruta (str, optional): Archivo JSONL de salida; None desactiva las trazas
+        muestreo (float): Fracción de trazas que se guardan (0 a 1)
+    """
+    global _activo, _ruta, _muestreo
+    if not 0.0 <= muestreo <= 1.0:
+        raise ValueError("El muestreo debe estar entre 0 y 1.")
+    with _lock:
+        _ruta = ruta
+        _muestreo = muestreo
+        _activo = bool(ruta) and muestreo > 0
+
+def activo():
+    """
+    Indica si las trazas están activas.
+    
+    Returns:
+        bool: True si se están registrando trazas
+    """
+    return _activo
+
+def span(nombre, **atributos):
+    """
+    Abre un span; si no hay una traza en curso, abre una nueva (sujeta a muestreo).
+    
+    Uso:
+        with span('similitud_temas', temas=5) as s:
+            ...
+            s.anotar(mejor_tema='liquidez')
+    
+    Args:
+        nombre (str): Nombre del span
+        **atributos: Atributos iniciales
+        
+    Returns:
+        Span: Gestor de contexto (un objeto nulo si no se registra)
+    """
+    if not _activo:
+        return _NULO
+    padre = _actual.get()
+    if padre is None:
+        if random.random() >= _muestreo:
+            return _TrazaDescartada()
+        return Span(nombre, atributos)
+    if isinstance(padre, _SpanNulo):
+        return _NULO
+    return Span(nombre, atributos, padre)
+
+def anotar(**atributos):
+    """
+    Agrega atributos al span en curso, si lo hay.
+    
+    Args:
+        **atributos: Atributos a agregar
+    """
+    if not _activo:
+        return
+    actual = _actual.get()
+    if actual is not None:
+        actual.anotar(**atributos)
+
+def instrumentar(nombre=None):
+    """
+    Decorador que envuelve cada llamada a la función en un span.
+    
+    Con las trazas desactivadas solo añade una comprobación antes de llamar a la
+    función original.
+    
+    Args:
+        nombre (str, optional): Nombre del span (por defecto, el de la función)
+        
+    Returns:
+        callable: Decorador
+    """
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__name__
+        
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _activo:
+                return funcion(*args, **kwargs)
+            with span(etiqueta):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+configurar(os.environ.get(VARIABLE_RUTA) or None, float(os.environ.get(VARIABLE_MUESTREO, 1.0)))